@@ -1,24 +1,29 @@
 import os
 import sys
-import re
-import time
-import requests
-import pandas as pd
 from datetime import datetime, timedelta
 
 from dotenv import load_dotenv
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.common.by import By
-from selenium.common.exceptions import TimeoutException
 
-from oauth2client.service_account import ServiceAccountCredentials
-import gspread
+# Módulos compartidos (carpeta comun/ en la raíz del repo)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comun.navegador import ConfigNavegador
+from comun.esperas import esperar, esperar_productos, esperar_red_inactiva, resumen_esperas
+from comun.slack import NotificadorSlack, transporte_webhook
+from comun.productos import buscar_producto, fila_producto, leer_productos
+from comun.gestor_driver import sesion_viva
+from comun.journal import Journal
+from comun.paises import ejecutar_por_pais, resumen_paises
+from comun.prefetch import navegar, precargar
+from comun.reintentos import PERMANENTE, TRANSITORIA, ColaReintentos, clasificar
+from comun.sheets import LectorIncremental
+from comun import contexto
+from comun.registros import del_dia, leer_desvios
+from comun import grabacion, trazas
+from comun.trazas import tramo
 
 # ================== Entorno ==================
 load_dotenv()
@@ -59,15 +64,12 @@ else:
     BASE_PATH = os.path.dirname(os.path.abspath(__file__))
 
 # ================== Utilidades ==================
+# Con el runner unificado, los jobs del mismo webhook comparten el notificador
+notificador = contexto.actual().notificador(("webhook", SLACK_WEBHOOK_URL), lambda: NotificadorSlack(transporte_webhook(SLACK_WEBHOOK_URL)))
+
 def enviar_notificacion_slack(mensaje: str):
-    try:
-        resp = requests.post(SLACK_WEBHOOK_URL, json={"text": mensaje}, timeout=15)
-        if resp.status_code != 200:
-            print(f"❌ Error Slack: {resp.status_code} - {resp.text}")
-        else:
-            print("Slack OK")
-    except Exception as e:
-        print(f"❌ Excepción enviando mensaje a Slack: {repr(e)}")
+    # No bloquea: el notificador postea en segundo plano (sesión HTTP reutilizada), agrupando en resúmenes
+    notificador.notificar(mensaje)
 
 def get_gservice_credentials_path() -> str:
     """
@@ -90,71 +92,80 @@ def get_gservice_credentials_path() -> str:
 
     raise FileNotFoundError("No se encontró archivo de credenciales ni contenido en env (GSERVICE_CREDENTIALS_JSON_CONTENT).")
 
-def normalizar(texto):
-    """Elimina símbolos, convierte a minúsculas y separa palabras clave."""
-    texto = re.sub(r"[^a-zA-Z0-9áéíóúñü\s]", "", (texto or "").lower())
-    return set(texto.split())
-
-def coincidencia_parcial(nombre_excel, nombre_web, umbral=0.5):
-    palabras_excel = normalizar(nombre_excel)
-    palabras_web = normalizar(nombre_web)
-    if not palabras_excel:
-        return False
-    comunes = palabras_excel & palabras_web
-    return len(comunes) / len(palabras_excel) >= umbral
+def procesar_pedido(driver, datos_pedido, productos, base_url=None):
+    """Abre el pedido una vez, pide el ajuste de todos sus productos y guarda una sola vez.
 
-def click_button(driver, selector, by=By.CSS_SELECTOR, wait_time=10):
+    productos: [(producto, cantidad), ...]. `base_url` es el backoffice del país
+    del pedido (default: el de BACKOFFICE_URL). Devuelve (productos guardados,
+    [(producto, cantidad)] que fallaron de forma transitoria y vale reintentar).
+    """
+    with tramo("pedido", pedido_id=datos_pedido, productos=len(productos)) as t:
+        guardados, reintentables = _procesar_pedido(driver, datos_pedido, productos, base_url or BACKOFFICE_URL.replace('/login', ''))
+        t["exito"] = len(guardados) == len(productos)
+    return guardados, reintentables
+
+def _procesar_pedido(driver, datos_pedido, productos, base_url):
+    pedido_url = f"{base_url}/orders/{datos_pedido}"
+    print(f"\n🔄 Procesando pedido: {datos_pedido} ({len(productos)} productos)")
+    with tramo("carga_pedido", pedido_id=datos_pedido):
+        navegar(driver, pedido_url)
+        esperar_productos(driver)
+    grabacion.capturar_pedido(driver, datos_pedido)
+
+    solicitados, reintentables = [], []
+    for producto_buscado, cantidad_deseada in productos:
+        grabacion.accion("producto", datos_pedido, producto=producto_buscado, cantidad=cantidad_deseada, estado="faltante")
+        with tramo("producto", pedido_id=datos_pedido) as t:
+            falla = solicitar_producto(driver, datos_pedido, producto_buscado, cantidad_deseada)
+            t["exito"] = not falla
+        if not falla:
+            solicitados.append((producto_buscado, cantidad_deseada))
+        elif falla == TRANSITORIA:
+            reintentables.append((producto_buscado, cantidad_deseada))
+
+    if not solicitados:
+        return [], reintentables
     try:
-        button = WebDriverWait(driver, wait_time).until(EC.element_to_be_clickable((by, selector)))
-        button.click()
-        return True
+        with tramo("guardar_cambios", pedido_id=datos_pedido):
+            WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.XPATH, "//button[normalize-space()='Guardar cambios']"))).click()
+            esperar_red_inactiva(driver, nombre="guardado")
+        grabacion.accion("guardar", datos_pedido)
     except Exception as e:
-        print(f"❌ Error al hacer clic en el selector '{selector}'")
-        return False
-
-def procesar_pedido(driver, datos_pedido, producto_buscado, cantidad_deseada):
-    from difflib import SequenceMatcher
+        msg = f"❌ Error guardando el pedido {datos_pedido}"
+        print(msg)
+        if clasificar(e) == PERMANENTE:
+            enviar_notificacion_slack(msg)
+            return [], reintentables
+        return [], reintentables + solicitados
 
-    def similitud(n1, n2):
-        return SequenceMatcher(None, (n1 or "").lower(), (n2 or "").lower()).ratio()
+    print(f"✅ Pedido {datos_pedido} guardado: {len(solicitados)}/{len(productos)} productos solicitados.")
+    return [producto for producto, _ in solicitados], reintentables
 
-    pedido_url = f"{BACKOFFICE_URL.replace('/login','')}/orders/{datos_pedido}"
-    print(f"\n🔄 Procesando pedido: {datos_pedido}")
-    driver.get(pedido_url)
-    time.sleep(5)
+def solicitar_producto(driver, datos_pedido, producto_buscado, cantidad_deseada):
+    """Pide el ajuste de un producto en el pedido ya abierto (sin guardar).
 
+    Devuelve "" si quedó solicitado, o la falla (TRANSITORIA / PERMANENTE).
+    Las transitorias no van a Slack acá: se avisan si siguen fallando tras los reintentos.
+    """
     try:
-        productos = WebDriverWait(driver, 10).until(
-            EC.presence_of_all_elements_located((By.CLASS_NAME, "css-1es96wk"))
-        )
+        # Todos los nombres en un solo viaje al navegador; el matching corre en memoria
+        nombres = leer_productos(driver)
+        coincidencia = buscar_producto(producto_buscado, nombres, alias=contexto.actual().alias_productos())
 
-        mejor_match, mayor_similitud = None, 0.0
-
-        for producto in productos:
-            nombre = producto.find_element(By.TAG_NAME, "span").text.strip()
-            score = similitud(producto_buscado, nombre)
-            if score > mayor_similitud:
-                mayor_similitud = score
-                mejor_match = (producto, nombre)
-
-        if not (mejor_match and mayor_similitud >= 0.8):
-            mejor_match = None
-            for producto in productos:
-                nombre = producto.find_element(By.TAG_NAME, "span").text.strip()
-                if coincidencia_parcial(producto_buscado, nombre):
-                    mejor_match = (producto, nombre)
-                    print(f"🔍 Coincidencia parcial → Producto: {nombre}")
-                    break
-        else:
-            print(f"🔍 Coincidencia por similitud ({mayor_similitud:.2f}) → Producto: {mejor_match[1]}")
-
-        if not mejor_match:
+        if not coincidencia:
             msg = f"❌ Producto '{producto_buscado}' no encontrado en pedido {datos_pedido}"
             print(msg)
             enviar_notificacion_slack(msg)
-            return
+            return PERMANENTE
+
+        if coincidencia.metodo == "alias":
+            print(f"🔍 Coincidencia por alias guardado → Producto: {coincidencia.nombre}")
+        elif coincidencia.metodo == "parcial":
+            print(f"🔍 Coincidencia parcial → Producto: {coincidencia.nombre}")
+        else:
+            print(f"🔍 Coincidencia por similitud ({coincidencia.score:.2f}) → Producto: {coincidencia.nombre}")
 
-        producto, nombre = mejor_match
+        producto = fila_producto(driver, coincidencia.posicion)
         boton_svg = producto.find_element(By.CSS_SELECTOR, 'svg[data-testid="DoNotDisturbOnIcon"]')
         driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", boton_svg)
         try:
@@ -180,110 +191,174 @@ def procesar_pedido(driver, datos_pedido, producto_buscado, cantidad_deseada):
         input_cantidad.send_keys(str(cantidad_deseada))
 
         WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.XPATH, "//button[normalize-space()='Solicitar']"))).click()
-        WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.XPATH, "//button[normalize-space()='Guardar cambios']"))).click()
-
-        print(f"✅ Pedido {datos_pedido} procesado con éxito.")
+        # El diálogo se cierra antes de seguir con el próximo producto del mismo pedido
+        esperar(driver, lambda d: not d.find_elements(By.ID, "quantity"), 10, "dialogo_producto", obligatoria=False)
+        print(f"   ✔️ '{coincidencia.nombre}' x{cantidad_deseada} solicitado.")
+        return ""
     except Exception as e:
-        msg = f"❌ Error procesando el pedido {datos_pedido}"
+        falla = clasificar(e)
+        msg = f"❌ Error procesando '{producto_buscado}' en el pedido {datos_pedido}"
+        print(f"{msg} ({falla}: {type(e).__name__})")
+        if falla == PERMANENTE:
+            enviar_notificacion_slack(msg)
+        return falla
+
+def main():
+    trazas.iniciar("desvios")
+    grabacion.iniciar("desvios")
+    # ================== Inicio ==================
+    enviar_notificacion_slack("🚀 El script de procesamiento de desvíos ha comenzado EN AMBOS PAÍSES.")
+
+    # Selenium: cada país deriva de acá su login (comun/paises.py) y entra con su propio Chrome
+    config = ConfigNavegador(
+        login_url=BACKOFFICE_URL,
+        email=BACKOFFICE_EMAIL,
+        password=BACKOFFICE_PASSWORD,
+        headless=SELENIUM_HEADLESS,
+        window_size=SELENIUM_WINDOW_SIZE,
+    )
+
+    # Google Sheets
+    ruta_json = get_gservice_credentials_path()
+    cliente = contexto.actual().cliente_sheets(ruta_json)
+
+    sheet = cliente.open_by_key(SHEET_ID)
+    worksheet = sheet.worksheet(GSHEET_WORKSHEET_NAME)
+    # Solo desde el primer desvío del día filtrado en la corrida anterior (más un solapamiento)
+    lector = LectorIncremental(worksheet, "desvios")
+    valores, fila_inicio = lector.leer()
+
+    # Obtener la fecha de ayer como objeto datetime sin hora
+    ayer = (datetime.now() - timedelta(days=1)).date()
+    print("Ayer:", ayer)
+
+    # Fila -> Desvio (solo AR/MX, con fecha válida) -> solo los de ayer, en streaming.
+    # `marca` recibe la primera fila de ayer: una re-corrida hoy la vuelve a necesitar
+    marca = []
+    desvios_ayer = del_dia(leer_desvios(valores, fila_inicio, paises=("mx", "ar")), ayer, marca)
+
+    # Lista de trabajo (serializable, queda guardada en el journal de la corrida):
+    # solo pedidos con estado 'faltante' o 'faltante_parcial'
+    items = []
+    encontrados = 0
+    for desvio in desvios_ayer:
+        encontrados += 1
+        if desvio.tipo not in ("faltante", "faltante_parcial"):
+            continue
+        if not desvio.pedido_id:
+            print(f"⚠️ Fila {desvio.fila}: sin id de pedido, se omite")
+            continue
+        items.append({
+            "fila": desvio.fila,
+            "pais": desvio.pais,
+            "datos_pedido": desvio.pedido_id,
+            "producto_afectado": desvio.producto,
+            "cantidad_deseada": desvio.cantidad_deseada,
+        })
+    marca_hoja = marca[0] if marca else lector.ultima_fila + 1
+
+    print(f"📆 Fecha actual: {datetime.now().strftime('%d/%m/%Y')}")
+    print(f"📆 Fecha filtrada (ayer): {ayer}")
+    print(f"🔎 Filas encontradas: {encontrados}")
+
+    # Journal: saltea lo confirmado en corridas anteriores (o retoma la corrida cortada)
+    journal = Journal("desvios")
+    items = journal.iniciar_corrida(items)
+
+    if not items:
+        print("⚠️ No se encontraron pedidos del día anterior.")
+        journal.terminar_corrida()
+        journal.cerrar()
+        lector.confirmar(marca_hoja)
+        contexto.actual().terminar()
+        trazas.finalizar()
+        grabacion.finalizar()
+        return
+
+    # Procesar pedidos
+    # Por país (cada uno en su backoffice) y agrupados por pedido en el orden de la hoja:
+    # una visita y un guardado por pedido
+    particiones = {}
+    for item in items:
+        datos_pedido, producto_afectado = item["datos_pedido"], item["producto_afectado"]
+        if journal.ya_procesado(datos_pedido, producto_afectado):
+            print(f"⏭️ Pedido {datos_pedido} / '{producto_afectado}' ya procesado en una corrida anterior. Saltando...")
+            continue
+        # Corridas guardadas antes del reparto por país no traen "pais": iban todas por el backoffice de AR
+        grupos = particiones.setdefault(item.get("pais", "ar"), {})
+        grupos.setdefault(datos_pedido, []).append(item)
+    contexto.actual().alias_productos()  # se crea antes de los hilos; después lo comparten
+
+    def procesar(driver, config_p, reintentos, datos_pedido, productos):
+        """Devuelve si quedaron guardados todos los productos pendientes del pedido."""
+        try:
+            guardados, reintentables = procesar_pedido(driver, datos_pedido, productos, base_url=config_p.base_url)
+        except Exception as e:
+            print(f"⚠️ Error en pedido {datos_pedido}: {e}")
+            guardados, reintentables = [], (productos if clasificar(e) == TRANSITORIA else [])
+        for producto_afectado in guardados:
+            journal.registrar(datos_pedido, producto_afectado)
+        if reintentables and not reintentos.agregar(datos_pedido, (datos_pedido, reintentables), TRANSITORIA):
+            avisar_sin_salir(datos_pedido, reintentables)
+        return len(guardados) == len(productos)
+
+    def avisar_sin_salir(datos_pedido, productos):
+        msg = f"❌ Pedido {datos_pedido}: sin solicitar tras los reintentos: {', '.join(p for p, _ in productos)}"
         print(msg)
         enviar_notificacion_slack(msg)
 
-# ================== Inicio ==================
-enviar_notificacion_slack("🚀 El script de procesamiento de desvíos ha comenzado EN AMBOS PAÍSES.")
-
-# Selenium
-opts = Options()
-opts.add_argument(f"--window-size={SELENIUM_WINDOW_SIZE}")
-if SELENIUM_HEADLESS:
-    opts.add_argument("--headless=new")
-driver = webdriver.Chrome(service=ChromeService(ChromeDriverManager().install()), options=opts)
-
-# Login
-driver.get(BACKOFFICE_URL)
-time.sleep(5)
-driver.find_element(By.ID, "email").send_keys(BACKOFFICE_EMAIL)
-driver.find_element(By.ID, "password").send_keys(BACKOFFICE_PASSWORD)
-click_button(driver, "//button[text()='INGRESAR']", By.XPATH)
-time.sleep(10)
-
-# Google Sheets
-ruta_json = get_gservice_credentials_path()
-scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-credenciales = ServiceAccountCredentials.from_json_keyfile_name(ruta_json, scope)
-cliente = gspread.authorize(credenciales)
-
-sheet = cliente.open_by_key(SHEET_ID)
-worksheet = sheet.worksheet(GSHEET_WORKSHEET_NAME)
-valores = worksheet.get_all_values()
-filas = valores[1:]  # Saltar encabezado
-
-# Filtrar filas con país AR/MX (columna 1 -> índice 1)
-filas_mx = [fila for fila in filas if len(fila) > 1 and str(fila[1]).strip().lower() in ["mx", "ar"]]
-
-df = pd.DataFrame([
-    [fila[0], fila[2], fila[7], fila[9], fila[11], (fila[12] if len(fila) > 12 else "0")]
-    for fila in filas_mx if len(fila) >= 12
-], columns=["fecha", "type_desvio", "datos_pedido", "producto_afectado", "cantidad_original", "cantidad_modificada"])
-
-# Limpieza y fechas
-df["fecha"] = pd.to_datetime(df["fecha"].astype(str).str.strip(), dayfirst=True, errors="coerce")
-df.dropna(subset=["fecha"], inplace=True)
-
-def extraer_id(texto):
-    match = re.search(r"\b[a-f0-9]{32}\b", str(texto))
-    return match.group(0) if match else None
-
-df["datos_pedido"] = df["datos_pedido"].apply(extraer_id)
-
-# Limpieza de datos nulos primero
-df.dropna(subset=["fecha"], inplace=True)
-
-# Convierte la columna fecha a datetime real
-df["fecha"] = pd.to_datetime(df["fecha"], dayfirst=True, errors="coerce")
-
-# Obtener la fecha de ayer como objeto datetime sin hora
-ayer = (datetime.now() - timedelta(days=1)).date()
-print("Ayer:", ayer)
-print("Fechas únicas en df:", df["fecha"].dt.date.unique())
-
-# Filtrar por fecha usando .dt.date
-df_ayer = df[df["fecha"].dt.date == ayer]
-
-print(f"📆 Fecha actual: {datetime.now().strftime('%d/%m/%Y')}")
-print(f"📆 Fecha filtrada (ayer): {ayer}")
-print(f"🔎 Filas encontradas: {len(df_ayer)}")
-
-# Filtrar solo pedidos con estado 'faltante' o 'faltante_parcial'
-df_ayer = df_ayer[df_ayer["type_desvio"].isin(["faltante", "faltante_parcial"])]
-
-if df_ayer.empty:
-    print("⚠️ No se encontraron pedidos del día anterior.")
-    driver.quit()
-    exit()
-
-# Procesar pedidos
-for i, row in df_ayer.iterrows():
-    try:
-        datos_pedido = str(row["datos_pedido"]).strip()
-        producto_afectado = str(row["producto_afectado"]).strip()
-
-        try:
-            original = int(row.get("cantidad_original", 0) or 0)
-        except ValueError:
-            original = 0
-
-        try:
-            modificada = int(row["cantidad_modificada"]) if str(row["cantidad_modificada"]).strip().isdigit() else 0
-        except Exception:
-            modificada = 0
-
-        tipo_desvio = str(row.get("type_desvio", "")).strip().lower()
-        cantidad_deseada = max(original - modificada, 0) if tipo_desvio == "faltante_parcial" else original
-
-        procesar_pedido(driver, datos_pedido, producto_afectado, cantidad_deseada)
-    except Exception as e:
-        print(f"⚠️ Error en fila {i}: {e}")
-
-time.sleep(5)
-driver.quit()
-print("✅ Proceso finalizado y navegador cerrado.")
+    def trabajar(pais, config_p, grupos):
+        """Todos los pedidos de un país con su Chrome; corre en su propio hilo."""
+        obtener = lambda: contexto.actual().driver(config_p)
+        # Lo que falle de forma transitoria se reintenta al final, solo con esos productos (cada país con su cola)
+        reintentos = ColaReintentos()
+        completos = 0
+        ultimo = None  # último Chrome usado: el cierre espera su red, sin pedir uno nuevo al gestor
+
+        # Con NAVEGADOR_PREFETCH los próximos pedidos se cargan en pestañas de fondo mientras se edita el actual
+        recorrido = precargar(list(grupos.items()), obtener, lambda item: f"{config_p.base_url}/orders/{item[0]}",
+                              config_p.prefetch, config_p.bloqueos)
+        for n, (driver, (datos_pedido, grupo)) in enumerate(recorrido, start=1):
+            print(f"🌎 [{pais.upper()}] pedido {n}/{len(grupos)}")
+            ultimo = driver
+            completos += procesar(driver, config_p, reintentos, datos_pedido, [(i["producto_afectado"], i["cantidad_deseada"]) for i in grupo])
+
+        def reintentar(item):
+            nonlocal completos, ultimo
+            ultimo = obtener()
+            # Un pedido reintentado cuenta si en este intento se completó lo que le faltaba
+            completos += procesar(ultimo, config_p, reintentos, *item)
+
+        pendientes = reintentos.drenar(reintentar, renovar_driver=lambda: contexto.actual().renovar_driver(config_p))
+        for datos_pedido, productos in pendientes:
+            avisar_sin_salir(datos_pedido, productos)
+        if ultimo is not None and sesion_viva(ultimo):
+            esperar_red_inactiva(ultimo, nombre="cierre")
+        return completos
+
+    # AR y MX en paralelo: uno lento no frena al otro
+    resultados = ejecutar_por_pais(particiones, config, trabajar)
+    resumen = resumen_paises(resultados)
+    print(resumen)
+    enviar_notificacion_slack(resumen)
+
+    cortados = [pais for pais, r in resultados.items() if r["error"]]
+    if cortados:
+        # Sin cerrar la corrida ni mover la marca de la hoja: la próxima corrida retoma lo que faltó
+        enviar_notificacion_slack(f"❌ Desvíos: se cortó el procesamiento de {', '.join(p.upper() for p in cortados)}")
+    else:
+        journal.terminar_corrida()
+        lector.confirmar(marca_hoja)
+    journal.cerrar()
+
+    print(contexto.actual().alias_productos().resumen())
+    print(resumen_esperas())
+    print("✅ Proceso finalizado y navegador cerrado.")
+    # Cierra navegador y notificador (con el runner unificado los cierra el runner al final)
+    contexto.actual().terminar()
+    trazas.finalizar()
+    grabacion.finalizar()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,28 @@
 import os
 import sys
-import time
 import re
-import requests
-import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
 
 from dotenv import load_dotenv
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.common.by import By
-from selenium.common.exceptions import TimeoutException
 
-from oauth2client.service_account import ServiceAccountCredentials
-import gspread
-from zoneinfo import ZoneInfo
-hoy_art = datetime.now(ZoneInfo("America/Argentina/Buenos_Aires")).date()
+# Módulos compartidos (carpeta comun/ en la raíz del repo)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comun.navegador import ConfigNavegador
+from comun.esperas import esperar_productos, esperar_red_inactiva, resumen_esperas
+from comun.slack import NotificadorSlack, transporte_webhook
+from comun.productos import buscar_producto, fila_producto, leer_productos
+from comun.sheets import EscrituraPorLotes, LectorIncremental
+from comun.gestor_driver import sesion_viva
+from comun.prefetch import navegar, precargar
+from comun.reintentos import PERMANENTE, TRANSITORIA, ColaReintentos, clasificar
+from comun import contexto
+from comun.registros import del_dia, leer_reclamos
+from comun import grabacion, trazas
+from comun.trazas import tramo
 
 # =============== Entorno ===============
 load_dotenv()
@@ -49,6 +51,10 @@ GSERVICE_CREDENTIALS_JSON = get_env("GSERVICE_CREDENTIALS_JSON", required=True)
 SELENIUM_HEADLESS = get_env("SELENIUM_HEADLESS", default="true").strip().lower() == "true"
 SELENIUM_WINDOW_SIZE = get_env("SELENIUM_WINDOW_SIZE", default="1920,1080")
 
+# Columna M: marca ✅ de pedido ya procesado
+COLUMNA_PROCESADO = 13
+SHEETS_LOTE_ESCRITURA = int(get_env("SHEETS_LOTE_ESCRITURA", default="20"))
+
 # Base path para rutas relativas
 BASE_PATH = os.path.dirname(os.path.abspath(__file__))
 
@@ -56,132 +62,27 @@ def resolver_ruta(p: str) -> str:
     return p if os.path.isabs(p) else os.path.join(BASE_PATH, p)
 
 # =============== Slack ===============
-def enviar_notificacion_slack(mensaje: str):
-    payload = {"text": mensaje}
-    try:
-        resp = requests.post(SLACK_WEBHOOK_URL, json=payload, timeout=15)
-        if resp.status_code != 200:
-            print(f"❌ Error Slack: {resp.status_code} - {resp.text}")
-        else:
-            print("Slack OK")
-    except Exception as e:
-        print(f"❌ Excepción Slack: {repr(e)}")
+# Con el runner unificado, los jobs del mismo webhook comparten el notificador
+notificador = contexto.actual().notificador(("webhook", SLACK_WEBHOOK_URL), lambda: NotificadorSlack(transporte_webhook(SLACK_WEBHOOK_URL)))
 
-enviar_notificacion_slack("🚀 El script de RECLAMOS ha comenzado.")
-
-# =============== Utilidades ===============
-def normalizar(texto):
-    """Elimina símbolos, convierte a minúsculas y separa palabras clave."""
-    texto = re.sub(r"[^a-zA-Z0-9áéíóúñü\s]", "", (texto or "").lower())
-    return set(texto.split())
-
-def coincidencia_parcial(nombre_excel, nombre_web, umbral=0.5):
-    palabras_excel = normalizar(nombre_excel)
-    palabras_web = normalizar(nombre_web)
-    if not palabras_excel:
-        return False
-    comunes = palabras_excel & palabras_web
-    return len(comunes) / len(palabras_excel) >= umbral
-
-def click_button(driver, selector, by=By.CSS_SELECTOR, wait_time=10):
-    try:
-        button = WebDriverWait(driver, wait_time).until(
-            EC.element_to_be_clickable((by, selector))
-        )
-        button.click()
-        return True
-    except Exception as e:
-        print(f"❌ Error al hacer clic en el selector '{selector}': {e}")
-        return False
-
-# =============== Google Sheets ===============
-ruta_json = resolver_ruta(GSERVICE_CREDENTIALS_JSON)
-scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-credenciales = ServiceAccountCredentials.from_json_keyfile_name(ruta_json, scope)
-cliente = gspread.authorize(credenciales)
-
-sheet = cliente.open_by_key(SHEET_ID)
-worksheet = sheet.worksheet(GSHEET_WORKSHEET_NAME)
-valores = worksheet.get_all_values()
-
-filas = valores[1:]  # Saltar encabezado
-datos_limpios = []
-for fila in filas:
-    # Ajusta índices según tus columnas reales
-    if len(fila) >= 15 and (fila[0] or "").strip():
-        datos_limpios.append([
-            (fila[0] or "").strip(),     # fecha
-            (fila[8] or "").strip(),     # Estado
-            (fila[15] or "").strip(),    # url
-            (fila[9] or "").strip(),     # Producto_Reclamado
-            (fila[10] if len(fila) > 15 else "0").strip()  # Cantidad
-        ])
-
-df = pd.DataFrame(datos_limpios, columns=["fecha", "Estado", "url", "Producto_Reclamado", "Cantidad"])
-df["Estado"] = df["Estado"].fillna("").astype(str).str.strip()
-
-# Fechas
-df.dropna(subset=["fecha"], inplace=True)
-df["fecha"] = pd.to_datetime(df["fecha"], dayfirst=True, errors="coerce")
-hoy_date = (datetime.now() - timedelta(days=0)).date()
-df_hoy = df[df["fecha"].dt.date == hoy_date]
-
-print(f"📆 Fecha actual: {datetime.now().strftime('%d/%m/%Y')}")
-print(f"🔎 Filas encontradas hoy: {len(df_hoy)}")
-
-# Filtrar estados relevantes
-df_hoy = df_hoy[
-    df_hoy["Estado"].str.lower().str.contains("faltante|mal estado", na=False) |
-    df_hoy["Estado"].isna() |
-    (df_hoy["Estado"].str.strip() == "")
-]
-
-# =============== Selenium ===============
-opts = Options()
-opts.add_argument(f"--window-size={SELENIUM_WINDOW_SIZE}")
-if SELENIUM_HEADLESS:
-    opts.add_argument("--headless=new")
-driver = webdriver.Chrome(service=ChromeService(ChromeDriverManager().install()), options=opts)
-
-# Login
-driver.get(BACKOFFICE_URL)
-time.sleep(5)
-driver.find_element(By.ID, "email").send_keys(BACKOFFICE_EMAIL)
-driver.find_element(By.ID, "password").send_keys(BACKOFFICE_PASSWORD)
-click_button(driver, "//button[text()='INGRESAR']", By.XPATH)
-time.sleep(5)
+def enviar_notificacion_slack(mensaje: str):
+    # No bloquea: el notificador postea en segundo plano (sesión HTTP reutilizada), agrupando en resúmenes
+    notificador.notificar(mensaje)
 
 def procesar_producto_en_pedido(driver, producto_buscado, cantidad_deseada, estado):
-    from difflib import SequenceMatcher
-    def similitud(nombre1, nombre2):
-        return SequenceMatcher(None, (nombre1 or "").lower(), (nombre2 or "").lower()).ratio()
-
+    """Solicita el reclamo de un producto; devuelve "" si salió o la falla (TRANSITORIA / PERMANENTE)."""
     try:
-        productos = WebDriverWait(driver, 10).until(
-            EC.presence_of_all_elements_located((By.CLASS_NAME, "css-1es96wk"))
-        )
+        # Todos los nombres en un solo viaje al navegador; el matching corre en memoria
+        nombres = leer_productos(driver)
+        coincidencia = buscar_producto(producto_buscado, nombres, aceptar_mejor=True, alias=contexto.actual().alias_productos())
 
-        mejor_match, mayor_similitud = None, 0.0
-        for producto in productos:
-            nombre = producto.find_element(By.TAG_NAME, "span").text.strip()
-            score = similitud(producto_buscado, nombre)
-            if score > mayor_similitud:
-                mayor_similitud = score
-                mejor_match = (producto, nombre)
-
-        if not (mejor_match and mayor_similitud >= 0.8):
-            for producto in productos:
-                nombre = producto.find_element(By.TAG_NAME, "span").text.strip()
-                if coincidencia_parcial(producto_buscado, nombre):
-                    mejor_match = (producto, nombre)
-                    break
-
-        if not mejor_match:
+        if not coincidencia:
             print(f"❌ Producto '{producto_buscado}' no encontrado por ningún método.")
             enviar_notificacion_slack(f"❌ Producto '{producto_buscado}' no encontrado en pedido.")
-            return
+            return PERMANENTE
 
-        producto, nombre = mejor_match
+        nombre = coincidencia.nombre
+        producto = fila_producto(driver, coincidencia.posicion)
         boton_svg = producto.find_element(By.CSS_SELECTOR, 'svg[data-testid="DoNotDisturbOnIcon"]')
         driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", boton_svg)
         try:
@@ -216,44 +117,151 @@ def procesar_producto_en_pedido(driver, producto_buscado, cantidad_deseada, esta
 
         WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.XPATH, "//button[normalize-space()='Solicitar']"))).click()
         print(f"✅ Producto '{nombre}' procesado en pedido.")
+        return ""
     except Exception as e:
+        falla = clasificar(e)
         mensaje_error = f"❌ Error procesando producto '{producto_buscado}': {str(e)}"
         print(mensaje_error)
-        enviar_notificacion_slack(mensaje_error)
-
-# Procesar por URL
-grupos = df_hoy.groupby("url")
-for url, grupo in grupos:
-    try:
-        fila_real = grupo.index[0] + 65
-        valor_celda = worksheet.cell(fila_real, 13).value
-        if valor_celda and valor_celda.strip():
+        # Las transitorias se reintentan al final; a Slack solo si no salen
+        if falla == PERMANENTE:
+            enviar_notificacion_slack(mensaje_error)
+        return falla
+
+def procesar_pedido(driver, url, grupo):
+    """Aplica todos los reclamos de un pedido y guarda una sola vez (lanza si no pudo guardar).
+
+    Devuelve los reclamos que fallaron de forma transitoria (para reintentarlos).
+    """
+    pedido_url = f"{BACKOFFICE_URL.replace('/login','')}/orders/{url}"
+    print(f"\n🔄 Procesando pedido: {url}")
+    with tramo("pedido", pedido_id=url, productos=len(grupo)) as t:
+        with tramo("carga_pedido", pedido_id=url):
+            navegar(driver, pedido_url)
+            esperar_productos(driver)
+        grabacion.capturar_pedido(driver, url)
+
+        reintentables = []
+        for reclamo in grupo:
+            grabacion.accion("producto", url, producto=reclamo.producto, cantidad=reclamo.cantidad, estado=reclamo.estado)
+            with tramo("producto", pedido_id=url) as tp:
+                falla = procesar_producto_en_pedido(driver, reclamo.producto, reclamo.cantidad, reclamo.estado)
+                tp["exito"] = not falla
+            if falla == TRANSITORIA:
+                reintentables.append(reclamo)
+
+        with tramo("guardar_cambios", pedido_id=url):
+            WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.XPATH, "//button[normalize-space()='Guardar cambios']"))).click()
+            esperar_red_inactiva(driver, nombre="guardado")
+        grabacion.accion("guardar", url)
+        t["exito"] = not reintentables
+    return reintentables
+
+def main():
+    trazas.iniciar("reclamos")
+    grabacion.iniciar("reclamos")
+    enviar_notificacion_slack("🚀 El script de RECLAMOS ha comenzado.")
+
+    # =============== Google Sheets ===============
+    ruta_json = resolver_ruta(GSERVICE_CREDENTIALS_JSON)
+    cliente = contexto.actual().cliente_sheets(ruta_json)
+
+    sheet = cliente.open_by_key(SHEET_ID)
+    worksheet = sheet.worksheet(GSHEET_WORKSHEET_NAME)
+    # Solo desde el primer reclamo del día de la corrida anterior (más un solapamiento)
+    lector = LectorIncremental(worksheet, "reclamos")
+    valores, fila_inicio = lector.leer()
+
+    # Fila -> Reclamo -> solo los de hoy; `marca` recibe la primera fila de hoy para la próxima lectura
+    hoy_date = datetime.now().date()
+    marca = []
+    reclamos_hoy = del_dia(leer_reclamos(valores, fila_inicio, COLUMNA_PROCESADO), hoy_date, marca)
+
+    # Filtrar estados relevantes y agrupar por URL (los productos de un pedido se guardan juntos)
+    grupos = {}
+    encontrados = 0
+    for reclamo in reclamos_hoy:
+        encontrados += 1
+        estado = reclamo.estado.lower()
+        if "faltante" in estado or "mal estado" in estado or not estado:
+            grupos.setdefault(reclamo.url, []).append(reclamo)
+
+    print(f"📆 Fecha actual: {datetime.now().strftime('%d/%m/%Y')}")
+    print(f"🔎 Filas encontradas hoy: {encontrados}")
+
+    # =============== Selenium ===============
+    # Login (reutiliza la sesión en cache si el backoffice la acepta)
+    config = ConfigNavegador(
+        login_url=BACKOFFICE_URL,
+        email=BACKOFFICE_EMAIL,
+        password=BACKOFFICE_PASSWORD,
+        headless=SELENIUM_HEADLESS,
+        window_size=SELENIUM_WINDOW_SIZE,
+        espera_login=5,
+    )
+    contexto.actual().driver(config)
+
+    # Procesar por URL (el "ya procesado" sale de la foto de get_all_values, sin llamadas extra)
+    escritura = EscrituraPorLotes(worksheet, tam_lote=SHEETS_LOTE_ESCRITURA)
+    # Fallas transitorias: al final se reintentan solo esos reclamos; sin ✅ la próxima corrida los retoma
+    reintentos = ColaReintentos()
+    ultimo = None  # último Chrome usado: el cierre espera su red, sin pedir uno nuevo al gestor
+
+    def procesar(driver, url, grupo):
+        nonlocal ultimo
+        ultimo = driver
+        try:
+            reintentables = procesar_pedido(driver, url, grupo)
+        except Exception as e:
+            print(f"⚠️ Error en pedido {url}: {e}")
+            if clasificar(e) != TRANSITORIA:
+                return
+            reintentables = grupo
+        for reclamo in grupo:
+            if reclamo not in reintentables:
+                escritura.marcar(reclamo.fila, COLUMNA_PROCESADO, "✅")
+        if reintentables and not reintentos.agregar(url, (url, reintentables), TRANSITORIA):
+            avisar_sin_salir(url, reintentables)
+
+    def avisar_sin_salir(url, reclamos):
+        msg = f"❌ Pedido {url}: sin procesar tras los reintentos: {', '.join(r.producto for r in reclamos)}"
+        print(msg)
+        enviar_notificacion_slack(msg)
+
+    a_procesar = []
+    for url, grupo in sorted(grupos.items()):
+        pendientes = [reclamo for reclamo in grupo if not reclamo.procesado]
+        if not pendientes:
             print(f"⏭️ Pedido {url} ya procesado. Saltando...")
             continue
-
-        pedido_url = f"{BACKOFFICE_URL.replace('/login','')}/orders/{url}"
-        print(f"\n🔄 Procesando pedido: {url}")
-        driver.get(pedido_url)
-        time.sleep(5)
-
-        for _, row in grupo.iterrows():
-            producto_reclamado = str(row["Producto_Reclamado"]).strip()
-            estado = row["Estado"]
-            try:
-                modificada = int(row["Cantidad"]) if str(row["Cantidad"]).strip().isdigit() else 0
-            except:
-                modificada = 0
-            cantidad_deseada = modificada
-            procesar_producto_en_pedido(driver, producto_reclamado, cantidad_deseada, estado)
-
-        WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.XPATH, "//button[normalize-space()='Guardar cambios']"))).click()
-
-        for idx in grupo.index:
-            worksheet.update_cell(idx + 65, 13, "✅")
-    except Exception as e:
-        print(f"⚠️ Error en pedido {url}: {e}")
-
-time.sleep(5)
-driver.quit()
-print("✅ Proceso finalizado y navegador cerrado.")
-enviar_notificacion_slack("✅ Proceso de RECLAMOS finalizado correctamente.")
+        a_procesar.append((url, pendientes))
+
+    # Con NAVEGADOR_PREFETCH los próximos pedidos se cargan en pestañas de fondo mientras se edita el actual
+    base_pedidos = f"{BACKOFFICE_URL.replace('/login','')}/orders"
+    for driver, (url, pendientes) in precargar(a_procesar, lambda: contexto.actual().driver(config),
+                                               lambda item: f"{base_pedidos}/{item[0]}", config.prefetch, config.bloqueos):
+        procesar(driver, url, pendientes)
+
+    def reintentar(item):
+        procesar(contexto.actual().driver(config), *item)
+
+    for url, reclamos in reintentos.drenar(reintentar, renovar_driver=lambda: contexto.actual().renovar_driver(config)):
+        avisar_sin_salir(url, reclamos)
+
+    escritura.flush()
+    # Las corridas siguientes de hoy (y la de mañana) arrancan desde el primer reclamo de hoy
+    lector.confirmar(marca[0] if marca else lector.ultima_fila + 1)
+    print(contexto.actual().alias_productos().resumen())
+
+    if ultimo is not None and sesion_viva(ultimo):
+        esperar_red_inactiva(ultimo, nombre="cierre")
+    print(resumen_esperas())
+    print("✅ Proceso finalizado y navegador cerrado.")
+    enviar_notificacion_slack("✅ Proceso de RECLAMOS finalizado correctamente.")
+    # Cierra navegador y notificador (con el runner unificado los cierra el runner al final)
+    contexto.actual().terminar()
+    trazas.finalizar()
+    grabacion.finalizar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Utilidades compartidas por los scripts del backoffice (HomeDelivery, Prevención, Reclamos, Desvíos)."""
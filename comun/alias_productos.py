@@ -0,0 +1,124 @@
+"""Cache en disco de alias: nombre de producto en la hoja -> nombre que muestra el backoffice.
+
+Los mismos textos de "Producto_Reclamado" / "producto_afectado" se comparan
+todos los días contra los mismos nombres del catálogo. Con el alias guardado
+el match es un lookup directo y no hace falta la búsqueda difusa. Tamaño
+acotado con desalojo LRU.
+
+Uso desde la terminal:
+    python -m comun.alias_productos --listar
+    python -m comun.alias_productos --invalidar "leche entera 1l"
+    python -m comun.alias_productos --limpiar
+"""
+import argparse
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+
+from comun.sesion import CACHE_DIR_DEFAULT
+
+RUTA_DEFAULT = os.path.join(CACHE_DIR_DEFAULT, "alias_productos.json")
+
+
+def clave_alias(texto) -> str:
+    """Minúsculas, sin símbolos y con espacios colapsados (el orden de las palabras se respeta)."""
+    return " ".join(re.sub(r"[^a-z0-9áéíóúñü\s]", "", (texto or "").lower()).split())
+
+
+class AliasProductos:
+    def __init__(self, ruta=None, max_entradas=None):
+        self.ruta = ruta or os.getenv("ALIAS_CACHE_PATH") or RUTA_DEFAULT
+        self.max_entradas = int(max_entradas or os.getenv("ALIAS_CACHE_MAX", "5000"))
+        self._entradas = OrderedDict()  # clave -> {"nombre", "score", "visto"}
+        self._cambios = False
+        self.aciertos = 0
+        self.fallos = 0
+        self._cargar()
+
+    def _cargar(self):
+        try:
+            with open(self.ruta, encoding="utf-8") as f:
+                datos = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Cache de alias ilegible, se empieza de cero: {e!r}")
+            return
+        # Se guardan del menos al más reciente: el orden del archivo es el orden LRU
+        for clave, entrada in datos.items():
+            self._entradas[clave] = entrada
+
+    def obtener(self, texto_hoja):
+        """(nombre_backoffice, score) o None."""
+        clave = clave_alias(texto_hoja)
+        entrada = self._entradas.get(clave)
+        if entrada is None:
+            self.fallos += 1
+            return None
+        self._entradas.move_to_end(clave)
+        self.aciertos += 1
+        return entrada["nombre"], entrada["score"]
+
+    def guardar(self, texto_hoja, nombre_backoffice, score):
+        clave = clave_alias(texto_hoja)
+        if not clave:
+            return
+        self._entradas[clave] = {"nombre": nombre_backoffice, "score": round(score, 4), "visto": int(time.time())}
+        self._entradas.move_to_end(clave)
+        while len(self._entradas) > self.max_entradas:
+            self._entradas.popitem(last=False)
+        self._cambios = True
+
+    def invalidar(self, texto_hoja) -> bool:
+        if self._entradas.pop(clave_alias(texto_hoja), None) is None:
+            return False
+        self._cambios = True
+        return True
+
+    def limpiar(self):
+        self._entradas.clear()
+        self._cambios = True
+
+    def entradas(self):
+        return dict(self._entradas)
+
+    def persistir(self):
+        if not self._cambios:
+            return
+        os.makedirs(os.path.dirname(self.ruta) or ".", exist_ok=True)
+        tmp = f"{self.ruta}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._entradas, f, ensure_ascii=False)
+        os.replace(tmp, self.ruta)
+        self._cambios = False
+
+    def resumen(self) -> str:
+        return f"🗂️ Alias de productos: {self.aciertos} aciertos, {self.fallos} sin alias, {len(self._entradas)} guardados"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Administrar el cache de alias de productos")
+    parser.add_argument("--ruta", default=None)
+    grupo = parser.add_mutually_exclusive_group(required=True)
+    grupo.add_argument("--listar", action="store_true")
+    grupo.add_argument("--invalidar", metavar="TEXTO_HOJA", action="append")
+    grupo.add_argument("--limpiar", action="store_true")
+    args = parser.parse_args()
+
+    alias = AliasProductos(args.ruta)
+    if args.listar:
+        for clave, entrada in alias.entradas().items():
+            print(f"{clave!r} -> {entrada['nombre']!r} ({entrada['score']:.2f})")
+        return
+    if args.limpiar:
+        alias.limpiar()
+    else:
+        for texto in args.invalidar:
+            print(("🗑️ Invalidado: " if alias.invalidar(texto) else "No existe: ") + repr(texto))
+    alias.persistir()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""Camino rápido por HTTP para cambiar el estado de un pedido, con el flujo de Selenium como respaldo.
+
+Repite la misma llamada XHR que hace el backoffice al guardar el cambio de
+estado, con un `requests.Session` (pool de conexiones) que reutiliza las
+cookies y el localStorage de la sesión del navegador. El endpoint se configura
+por entorno porque depende de lo que muestre la pestaña Network del backoffice:
+
+    BACKOFFICE_API=true
+    BACKOFFICE_API_URL=https://.../api
+    BACKOFFICE_API_ESTADO_PATH=/orders/{pedido_id}/status
+    BACKOFFICE_API_ESTADO_METODO=PATCH
+    BACKOFFICE_API_ESTADO_CANCELADO=canceled
+    BACKOFFICE_API_TOKEN_KEY=<clave de localStorage con el JWT, opcional>
+
+Los pedidos que fallen por API se devuelven para que el script los procese
+con el navegador, uno por uno.
+
+Prechequeo de estados (activo si hay BACKOFFICE_API_URL, aunque el camino
+rápido esté apagado): antes del navegador se consulta el estado de todos los
+pedidos del día y se sacan los ya cancelados, los que no existen y los que
+están en un estado no cancelable, con un solo resumen al final.
+
+    BACKOFFICE_PRECHEQUEO=true
+    BACKOFFICE_API_PEDIDO_PATH=/orders/{pedido_id}      (GET, uno por pedido, en paralelo)
+    BACKOFFICE_API_LISTA_PATH=/orders?ids={ids}         (opcional: de a lotes, si el backoffice lo tiene)
+    BACKOFFICE_API_ESTADO_CAMPO=status                  (admite ruta con puntos: data.status)
+    BACKOFFICE_API_NO_CANCELABLES=delivered,...         (además de los ya cancelados)
+"""
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote
+from dataclasses import dataclass, field
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from comun import grabacion
+from comun.cancelacion import ResultadoPedido
+from comun.navegador import crear_driver_logueado
+from comun.sesion import cargar_sesion
+from comun.trazas import tramo
+
+
+@dataclass
+class ConfigApi:
+    api_url: str
+    ruta_estado: str = "/orders/{pedido_id}/status"
+    metodo: str = "PATCH"
+    estado_cancelado: str = "canceled"
+    token_key: str = ""
+    concurrencia: int = 16
+    timeout: int = 10
+    motivos: dict = field(default_factory=dict)  # texto de la UI -> código de la API
+    ruta_pedido: str = "/orders/{pedido_id}"
+    ruta_lista: str = ""
+    campo_estado: str = "status"
+    no_cancelables: tuple = ()
+    tam_lote_lista: int = 100
+
+    @classmethod
+    def desde_env(cls, prechequeo=False):
+        """Devuelve None si el modo API (o con `prechequeo`, el prechequeo de estados) no está activado o falta la URL."""
+        variable, default = ("BACKOFFICE_PRECHEQUEO", "true") if prechequeo else ("BACKOFFICE_API", "false")
+        if os.getenv(variable, default).strip().lower() != "true":
+            return None
+        api_url = os.getenv("BACKOFFICE_API_URL", "").rstrip("/")
+        if not api_url:
+            if not prechequeo:
+                print("⚠️ BACKOFFICE_API=true pero falta BACKOFFICE_API_URL, se usa solo el navegador")
+            return None
+        return cls(
+            api_url=api_url,
+            ruta_estado=os.getenv("BACKOFFICE_API_ESTADO_PATH", cls.ruta_estado),
+            metodo=os.getenv("BACKOFFICE_API_ESTADO_METODO", cls.metodo).upper(),
+            estado_cancelado=os.getenv("BACKOFFICE_API_ESTADO_CANCELADO", cls.estado_cancelado),
+            token_key=os.getenv("BACKOFFICE_API_TOKEN_KEY", ""),
+            concurrencia=int(os.getenv("BACKOFFICE_API_CONCURRENCIA", str(cls.concurrencia))),
+            motivos=json.loads(os.getenv("BACKOFFICE_API_MOTIVOS", "{}")),
+            ruta_pedido=os.getenv("BACKOFFICE_API_PEDIDO_PATH", cls.ruta_pedido),
+            ruta_lista=os.getenv("BACKOFFICE_API_LISTA_PATH", ""),
+            campo_estado=os.getenv("BACKOFFICE_API_ESTADO_CAMPO", cls.campo_estado),
+            no_cancelables=tuple(e.strip().lower() for e in os.getenv("BACKOFFICE_API_NO_CANCELABLES", "").split(",") if e.strip()),
+        )
+
+
+class ClienteApiBackoffice:
+    def __init__(self, config: ConfigApi, cookies, local_storage=None):
+        self.config = config
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=config.concurrencia, pool_maxsize=config.concurrencia)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        for cookie in cookies:
+            self.session.cookies.set(cookie["name"], cookie["value"], domain=cookie.get("domain", ""), path=cookie.get("path", "/"))
+        token = (local_storage or {}).get(config.token_key) if config.token_key else None
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token.strip(chr(34))}"
+        self.session.headers["Accept"] = "application/json"
+
+    def cambiar_estado(self, pedido_id, estado, motivo=None):
+        """Devuelve (ok, detalle). Nunca lanza: cualquier falla se resuelve con el navegador."""
+        url = self.config.api_url + self.config.ruta_estado.format(pedido_id=pedido_id)
+        cuerpo = {"status": estado}
+        if motivo:
+            cuerpo["reason_of_canceled"] = self.config.motivos.get(motivo, motivo)
+        try:
+            resp = self.session.request(self.config.metodo, url, json=cuerpo, timeout=self.config.timeout)
+        except requests.RequestException as e:
+            return False, repr(e)
+        if 200 <= resp.status_code < 300:
+            return True, str(resp.status_code)
+        return False, f"{resp.status_code} - {resp.text[:200]}"
+
+    def _estado_de(self, datos):
+        for parte in self.config.campo_estado.split("."):
+            datos = datos.get(parte) if isinstance(datos, dict) else None
+        return str(datos).lower() if datos is not None else None
+
+    def consultar_estado(self, pedido_id):
+        """Estado del pedido según la API, NO_EXISTE si el 404 lo confirma, o None si no se pudo saber."""
+        url = self.config.api_url + self.config.ruta_pedido.format(pedido_id=pedido_id)
+        try:
+            resp = self.session.get(url, timeout=self.config.timeout)
+            if resp.status_code == 404:
+                return NO_EXISTE if _confirma_inexistente(resp) else None
+            if resp.status_code != 200:
+                return None
+            return self._estado_de(resp.json())
+        except (requests.RequestException, ValueError):
+            return None
+
+    def consultar_lote(self, pedido_ids) -> dict:
+        """{pedido_id: estado} con el listado del backoffice; los que no vuelven quedan sin dato."""
+        url = self.config.api_url + self.config.ruta_lista.format(ids=",".join(quote(str(p), safe="") for p in pedido_ids))
+        try:
+            resp = self.session.get(url, timeout=self.config.timeout)
+            resp.raise_for_status()
+            datos = resp.json()
+        except (requests.RequestException, ValueError) as e:
+            print(f"⚠️ No se pudo consultar el listado de pedidos ({e!r}); siguen sin prechequeo")
+            return {}
+        if isinstance(datos, dict):  # {"orders": [...]} o parecido
+            datos = next((v for v in datos.values() if isinstance(v, list)), [])
+        return {str(item.get("id")): self._estado_de(item) for item in datos if isinstance(item, dict)}
+
+    def consultar_estados(self, pedido_ids) -> dict:
+        """{pedido_id: estado | NO_EXISTE | None} para todos, por listado o en paralelo de a uno."""
+        if self.config.ruta_lista:
+            estados = {}
+            tam = max(1, self.config.tam_lote_lista)
+            for i in range(0, len(pedido_ids), tam):
+                estados.update(self.consultar_lote(pedido_ids[i:i + tam]))
+            return {p: estados.get(str(p)) for p in pedido_ids}
+        with ThreadPoolExecutor(max_workers=self.config.concurrencia) as executor:
+            return dict(zip(pedido_ids, executor.map(self.consultar_estado, pedido_ids)))
+
+    def cerrar(self):
+        self.session.close()
+
+
+def crear_cliente_api(config_api: ConfigApi, config_navegador) -> ClienteApiBackoffice:
+    """Toma la sesión del cache de disco; si no hay, hace un login con Chrome solo para obtenerla."""
+    datos = None
+    if config_navegador.usa_cache:
+        datos = cargar_sesion(config_navegador.ruta_cache, config_navegador.clave_cache)
+    if not datos:
+        driver = crear_driver_logueado(config_navegador)
+        try:
+            datos = {
+                "cookies": driver.get_cookies(),
+                "local_storage": driver.execute_script("return Object.assign({}, window.localStorage);") or {},
+            }
+        finally:
+            driver.quit()
+    return ClienteApiBackoffice(config_api, datos["cookies"], datos.get("local_storage"))
+
+
+NO_EXISTE = "no_existe"
+_CANCELADOS = {"canceled", "cancelled", "cancelado"}
+
+
+def _confirma_inexistente(resp):
+    """El 404 habla del pedido (p. ej. {"error": "order_not_found"}) y no de una ruta que no existe."""
+    try:
+        cuerpo = json.dumps(resp.json()).lower()
+    except ValueError:
+        return False  # HTML o vacío: es la página de error del servidor, no una respuesta de la API
+    return any(palabra in cuerpo for palabra in ("order", "pedido"))
+
+
+def prechequear_estados(trabajos, cliente: ClienteApiBackoffice, notificar, ya_cancelado=None):
+    """Saca de [(indice, pedido_id)] los pedidos que no hace falta (o no se puede) cancelar.
+
+    Los que la API no supo responder siguen al proceso normal. `ya_cancelado(pedido_id)`
+    se llama por cada pedido que ya estaba cancelado (p. ej. para el journal).
+    Si más de la mitad da "no existe" se desconfía de la configuración (ruta mal
+    puesta) y ninguno se omite por eso. Devuelve los trabajos que siguen, en el mismo orden.
+    """
+    ids = [pedido_id for _, pedido_id in trabajos if pedido_id]
+    if not ids:
+        return trabajos
+    with tramo("prechequeo", pedidos=len(ids)) as t:
+        estados = cliente.consultar_estados(ids)
+        inexistentes = sum(1 for pedido_id in ids if estados.get(pedido_id) == NO_EXISTE)
+        if len(ids) > 1 and inexistentes > len(ids) / 2:
+            msg = (f"⚠️ Prechequeo: {inexistentes}/{len(ids)} pedidos dieron 404; parece mal configurado "
+                   "BACKOFFICE_API_PEDIDO_PATH, esos pedidos siguen al navegador")
+            print(msg)
+            notificar(msg)
+            estados = {pedido_id: (None if estado == NO_EXISTE else estado) for pedido_id, estado in estados.items()}
+        cancelados = _CANCELADOS | {cliente.config.estado_cancelado.lower()}
+        omitidos = {"ya cancelados": [], "no cancelables": [], "inexistentes": []}
+        pendientes = []
+        for indice, pedido_id in trabajos:
+            estado = estados.get(pedido_id)
+            if estado in cancelados:
+                omitidos["ya cancelados"].append(pedido_id)
+                if ya_cancelado:
+                    ya_cancelado(pedido_id)
+            elif estado == NO_EXISTE:
+                omitidos["inexistentes"].append(pedido_id)
+            elif estado in cliente.config.no_cancelables:
+                omitidos["no cancelables"].append(f"{pedido_id} ({estado})")
+            else:
+                pendientes.append((indice, pedido_id))
+        t["omitidos"] = len(trabajos) - len(pendientes)
+        t["sin_dato"] = sum(1 for pedido_id in ids if estados.get(pedido_id) is None)
+
+    partes = [f"{len(v)} {nombre}" for nombre, v in omitidos.items() if v]
+    print(f"🧾 Prechequeo: {len(ids)} pedidos consultados, " + (", ".join(partes) if partes else "ninguno para omitir")
+          + f", {t['sin_dato']} sin dato; {len(pendientes)} siguen")
+    if partes:
+        detalle = "\n".join(f"• {nombre}: {', '.join(v[:20])}" + (f" y {len(v) - 20} más" if len(v) > 20 else "")
+                           for nombre, v in omitidos.items() if v)
+        notificar(f"🧾 Prechequeo: se omiten {', '.join(partes)}\n{detalle}")
+    return pendientes
+
+
+def cancelar_por_api(trabajos, cliente: ClienteApiBackoffice, motivo, al_resultado, notificar_exito=False):
+    """Cancela por API en paralelo y emite los resultados en orden.
+
+    Devuelve los (indice, pedido_id) que fallaron, para el respaldo con Selenium.
+    """
+    validos = [(indice, pedido_id) for indice, pedido_id in trabajos if pedido_id]
+    pendientes = [(indice, pedido_id) for indice, pedido_id in trabajos if not pedido_id]
+
+    def _cancelar(trabajo):
+        with tramo("pedido_api", pedido_id=trabajo[1]) as t:
+            ok, detalle = cliente.cambiar_estado(trabajo[1], cliente.config.estado_cancelado, motivo)
+            t["exito"] = ok
+        grabacion.accion("cancelar", trabajo[1], motivo=motivo, ok=ok, via="api")
+        return ok, detalle
+
+    cancelados = 0
+    with ThreadPoolExecutor(max_workers=cliente.config.concurrencia) as executor:
+        for (indice, pedido_id), (ok, detalle) in zip(validos, executor.map(_cancelar, validos)):
+            if not ok:
+                print(f"⚠️ API falló para el pedido {pedido_id} ({detalle}), se procesa con el navegador")
+                pendientes.append((indice, pedido_id))
+                continue
+            cancelados += 1
+            resultado = ResultadoPedido(indice, pedido_id, ok=True)
+            resultado.registrar(f"✅ Pedido {pedido_id} cancelado con motivo '{motivo}' (API)", notificar=notificar_exito)
+            al_resultado(resultado)
+
+    print(f"⚡ API: {cancelados} pedidos cancelados, {len(pendientes)} al navegador")
+    return sorted(pendientes)
@@ -0,0 +1,446 @@
+"""Benchmark offline de los jobs contra el backoffice de mentira (comun/mock_backoffice.py).
+
+Cada job corre su unidad de trabajo (la misma función que usa su script)
+sobre N pedidos del mock, con un Chrome real:
+  - homedelivery / prevencion: cancelar_pedido, por el pool si se pide --workers;
+  - reclamos: procesar_pedido del script (varios productos y un guardado por pedido);
+  - desvios: procesar_pedido del script (todos los faltantes del pedido y un guardado).
+Las métricas salen de las trazas (comun/trazas.py): pedidos por minuto y
+p50/p95 por tramo. Además el mock cuenta cuántos pedidos cambiaron de verdad,
+así una regresión que "termina bien" sin guardar nada también se ve.
+
+Con --grabacion se reproduce una corrida real grabada (comun/grabacion.py):
+mismos pedidos, mismos productos y las páginas reales, limpias, servidas por el
+mock. Así se comparan esperas, matching y paralelismo con una carga realista.
+
+Con --scripts, en lugar de la unidad de trabajo se corre el `main()` completo
+de cada script (HomeDELIVERYID.py, Prevencion.py, Reclamos1.3.py, Desvios.py)
+contra el mock: BACKOFFICE_URL apunta al mock, la hoja es una planilla en
+memoria armada con los pedidos de la carga (mismas columnas que la real) y
+Slack va al webhook /slack del mock. Así entran en la medición la lectura de la
+hoja, el journal, el prechequeo, los reintentos y las escrituras de vuelta.
+
+Todo queda en trazas/benchmark-<fecha>.json; con --base se compara job por job
+contra un benchmark anterior.
+
+    python -m comun.benchmark --pedidos 40
+    python -m comun.benchmark homedelivery --workers 3 --latencia-ms 150 --tasa-error 0.05
+    python -m comun.benchmark --grabacion grabaciones/reclamos-20260101-090000
+    python -m comun.benchmark --grabacion grabaciones/reclamos-20260101-090000 --scripts
+    python -m comun.benchmark --base trazas/benchmark-20260101-120000.json
+    python -m comun.benchmark --navegador ambos --peso-kb 40   # antes/después del modo liviano
+    python -m comun.benchmark --latencia-ms 300 --prefetch 2   # precarga en pestañas de fondo
+    python -m comun.benchmark homedelivery --ya-cancelados 0.3  # prechequeo de estados por API
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from functools import partial
+
+from comun import contexto, grabacion, trazas
+from comun.api_backoffice import ConfigApi, crear_cliente_api, prechequear_estados
+from comun.cancelacion import cancelar_pedido, url_pedido
+from comun.jobs import cargar_job
+from comun.mock_backoffice import EMAIL_MOCK, PASSWORD_MOCK, ConfigMock, generar_pedidos, iniciar_mock
+from comun.navegador import ConfigNavegador
+from comun.paises import LOCALES
+from comun.pool import ejecutar_pedidos
+from comun.prefetch import precargar
+from comun.registros import Reclamo
+from comun.slack import NotificadorSlack, transporte_webhook
+
+JOBS = ("homedelivery", "prevencion", "reclamos", "desvios")
+# Los mismos MOTIVO_CANCELACION de HomeDELIVERYID.py y Prevencion.py
+MOTIVOS = {"homedelivery": "Cliente prófugo", "prevencion": "Pago anticipado"}
+
+
+def carga_sintetica(nombre, args) -> dict:
+    """Pedidos generados por el mock, con el mismo formato que grabacion.cargar()."""
+    pedidos, productos = generar_pedidos(args.pedidos, semilla=args.semilla)
+    por_pedido = args.productos if nombre in ("reclamos", "desvios") else 0
+    trabajos = [(pedido_id, [(p, 1, "faltante") for p, _ in productos[pedido_id][:por_pedido]]) for pedido_id in pedidos]
+    return {"trabajo": nombre, "trabajos": trabajos, "productos": productos, "paginas": {}, "origen": "sintética"}
+
+
+def carga_grabada(carpeta) -> dict:
+    carga = grabacion.cargar(carpeta)
+    # Pedidos sin página grabada (p. ej. cancelados por API): el mock arma una sintética con sus productos
+    carga["productos"] = {pedido_id: [(p, c) for p, c, _ in productos] for pedido_id, productos in carga["trabajos"]}
+    carga["origen"] = carpeta
+    return carga
+
+
+def _correr_cancelacion(nombre, config, trabajos, args):
+    unidad = partial(cancelar_pedido, base_url=config.base_url, motivo=MOTIVOS[nombre])
+    resultados = []
+    pedidos = [(indice, pedido_id) for indice, (pedido_id, _) in enumerate(trabajos)]
+    # Como los scripts: el prechequeo (contra /api del mock) saca los ya cancelados antes del navegador
+    omitidos = 0
+    config_prechequeo = ConfigApi.desde_env(prechequeo=True)
+    if config_prechequeo:
+        cliente = crear_cliente_api(config_prechequeo, config)
+        restantes = prechequear_estados(pedidos, cliente, lambda _: None)
+        cliente.cerrar()
+        omitidos, pedidos = len(pedidos) - len(restantes), restantes
+    ejecutar_pedidos(pedidos, config, unidad, args.workers, resultados.append, obtener_driver=contexto.actual().driver,
+                     url_de=partial(url_pedido, config.base_url))
+    return omitidos + sum(r.ok for r in resultados)
+
+
+def _recorrer(config, trabajos):
+    """(driver, trabajo) como en los scripts: con NAVEGADOR_PREFETCH, los próximos pedidos precargados."""
+    return precargar(trabajos, partial(contexto.actual().driver, config), lambda t: url_pedido(config.base_url, t[0]),
+                     config.prefetch, config.bloqueos)
+
+
+def _correr_reclamos(nombre, config, trabajos, args):
+    modulo = cargar_job(nombre)
+    hoy = datetime.now().date()
+    ok = 0
+    for driver, (pedido_id, productos) in _recorrer(config, trabajos):
+        grupo = [
+            Reclamo(fila=0, fecha=hoy, estado=estado, url=pedido_id, producto=producto, cantidad=cantidad, procesado="")
+            for producto, cantidad, estado in productos
+        ]
+        try:
+            # Cuenta si no quedaron reclamos para reintentar (el benchmark mide la primera pasada)
+            ok += not modulo.procesar_pedido(driver, pedido_id, grupo)
+        except Exception as e:
+            print(f"⚠️ Error en pedido {pedido_id}: {e}")
+    return ok
+
+
+def _correr_desvios(nombre, config, trabajos, args):
+    modulo = cargar_job(nombre)
+    ok = 0
+    for driver, (pedido_id, productos) in _recorrer(config, trabajos):
+        # Como el script: el pedido cuenta si se guardaron todos sus productos
+        try:
+            guardados, _ = modulo.procesar_pedido(driver, pedido_id, [(producto, cantidad) for producto, cantidad, _ in productos])
+            ok += len(guardados) == len(productos)
+        except Exception as e:
+            print(f"⚠️ Error en pedido {pedido_id}: {e}")
+    return ok
+
+
+CORRIDAS = {
+    "homedelivery": _correr_cancelacion,
+    "prevencion": _correr_cancelacion,
+    "reclamos": _correr_reclamos,
+    "desvios": _correr_desvios,
+}
+
+
+class HojaEnMemoria:
+    """Lo que los scripts usan de un gspread.Worksheet (y de su planilla), sobre una lista de filas."""
+
+    title = "benchmark"
+
+    def __init__(self, filas):
+        self.filas = [list(fila) for fila in filas]
+        self.spreadsheet = self
+        self.id = "benchmark"
+
+    # ---- planilla y cliente: cualquier clave o pestaña es esta hoja ----
+    def open_by_key(self, _clave):
+        return self
+
+    def worksheet(self, _nombre):
+        return self
+
+    # ---- hoja ----
+    @property
+    def row_count(self):
+        return len(self.filas)
+
+    def get_all_values(self):
+        ancho = max((len(fila) for fila in self.filas), default=0)
+        return [fila + [""] * (ancho - len(fila)) for fila in self.filas]
+
+    def batch_get(self, rangos):
+        lecturas = []
+        for rango in rangos:
+            desde, hasta = (int(n) for n in rango.split(":"))
+            lecturas.append([list(fila) for fila in self.filas[desde - 1:hasta]])
+        return lecturas
+
+    def update_cell(self, fila, columna, valor):
+        while len(self.filas) < fila:
+            self.filas.append([])
+        celdas = self.filas[fila - 1]
+        celdas.extend([""] * (columna - len(celdas)))
+        celdas[columna - 1] = valor
+
+    def batch_update(self, datos):
+        from gspread.utils import a1_to_rowcol
+        for dato in datos:
+            self.update_cell(*a1_to_rowcol(dato["range"]), dato["values"][0][0])
+
+
+def filas_hoja(nombre, trabajos, hoy=None) -> list:
+    """La pestaña que lee cada script, con los pedidos de la carga en sus columnas (ver comun/registros.py)."""
+    hoy = hoy or datetime.now().date()
+    if nombre in MOTIVOS:
+        return [["fecha", "pedido"]] + [[f"{hoy:%d/%m/%Y}", pedido_id] for pedido_id, _ in trabajos]
+    filas = []
+    for pedido_id, productos in trabajos:
+        for producto, cantidad, estado in productos:
+            fila = [""] * 16
+            if nombre == "reclamos":
+                # Reclamos toma los de hoy: A fecha, I estado, J producto, K cantidad, P pedido (M queda para el ✅)
+                fila[0], fila[8], fila[9], fila[10], fila[15] = f"{hoy:%d/%m/%Y}", estado, producto, str(cantidad), pedido_id
+            else:
+                # Desvíos toma los de ayer: A fecha, B país, C tipo, H pedido, J producto, L cantidad original
+                fila[0], fila[1], fila[2], fila[7], fila[9], fila[11] = (
+                    f"{hoy - timedelta(days=1):%d/%m/%Y}", "ar", "faltante", pedido_id, producto, str(cantidad))
+            filas.append(fila)
+    return [["encabezado"] * 16] + filas
+
+
+class ContextoScript(contexto.Contexto):
+    """Contexto de un script corrido por el benchmark: la hoja en memoria y Slack al webhook del mock."""
+
+    def __init__(self, hoja, url_slack):
+        super().__init__()
+        self.hoja = hoja
+        self.url_slack = url_slack
+
+    def cliente_sheets(self, ruta_credenciales):
+        return self.hoja
+
+    def notificador(self, clave, fabrica):
+        # Ni el token de Slack ni el webhook real: todo al /slack del mock
+        return super().notificador("mock", lambda: NotificadorSlack(transporte_webhook(self.url_slack)))
+
+
+def _correr_script(nombre, hoja, base, directorio, etiqueta):
+    """Corre el main() del script del job; devuelve si terminó bien."""
+    import certifi
+
+    credenciales = os.path.join(directorio, "credenciales-benchmark.json")
+    with open(credenciales, "w", encoding="utf-8") as f:
+        f.write("{}")
+    os.environ.update({
+        # Lo que cada script exige al importarse, sin secretos reales; el .env local no pisa nada de esto
+        "SLACK_TOKEN": "benchmark",
+        "SLACK_CHANNEL_ID_NOTIFICACIONES": "benchmark",
+        "SSL_CERT_PATH": certifi.where(),
+        "GSERVICE_CREDENTIALS_JSON": credenciales,
+        "JOURNAL_PATH": os.path.join(directorio, f"journal-{etiqueta}.sqlite"),
+        "SHEETS_MARCAS_PATH": os.path.join(directorio, f"marcas-{etiqueta}.json"),
+        "GRABACION_DIR": "",
+        **{f"BACKOFFICE_URL_{pais.upper()}": f"{base}/{locale}/login" for pais, locale in LOCALES.items()},
+        **{f"BACKOFFICE_EMAIL_{pais.upper()}": EMAIL_MOCK for pais in LOCALES},
+        **{f"BACKOFFICE_PASSWORD_{pais.upper()}": PASSWORD_MOCK for pais in LOCALES},
+    })
+    contexto.instalar(ContextoScript(hoja, f"{base}/slack"))
+    try:
+        cargar_job(nombre).main()
+        return True
+    except SystemExit as e:
+        return e.code in (None, 0)
+    except Exception as e:
+        print(f"❌ El script de {nombre} falló: {e!r}")
+        return False
+    finally:
+        contexto.actual().cerrar()
+
+
+def _verificados(nombre, estado):
+    """Pedidos que el mock efectivamente vio cambiar."""
+    if nombre in MOTIVOS:
+        return sum(valor == "canceled" for valor in estado.pedidos.values())
+    return len({pedido_id for pedido_id, *_ in estado.solicitudes})
+
+
+def correr_job(carga, args, directorio, etiqueta=None, entorno=None):
+    """Levanta un mock nuevo con la carga, corre el job contra él y devuelve su resultado (con el resumen de trazas)."""
+    nombre, trabajos = carga["trabajo"], carga["trabajos"]
+    etiqueta = etiqueta or nombre
+    pedidos = {pedido_id: "pending" for pedido_id, _ in trabajos}
+    if nombre in MOTIVOS and args.ya_cancelados:
+        # Los que el día real ya llegan cancelados (el bot antes los descubría por timeout)
+        for pedido_id in random.Random(args.semilla).sample(sorted(pedidos), round(len(pedidos) * args.ya_cancelados)):
+            pedidos[pedido_id] = "canceled"
+    config_mock = ConfigMock(
+        latencia_ms=args.latencia_ms,
+        jitter_ms=args.jitter_ms,
+        render_ms=args.render_ms,
+        tasa_error=args.tasa_error,
+        combobox=args.combobox,
+        peso_kb=args.peso_kb,
+        semilla=args.semilla,
+    )
+    server, estado = iniciar_mock(pedidos, productos=carga["productos"], config=config_mock, paginas=carga["paginas"])
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    original = dict(os.environ)
+    # Lo que los scripts leen al importarse, apuntado al mock; caches aparte para no tocar los reales
+    os.environ.update({
+        "BACKOFFICE_URL": f"{base}/es-AR/login",
+        "BACKOFFICE_EMAIL": EMAIL_MOCK,
+        "BACKOFFICE_PASSWORD": PASSWORD_MOCK,
+        "SLACK_WEBHOOK_URL": f"{base}/slack",
+        "BACKOFFICE_API_URL": f"{base}/api",
+        "SHEET_ID": "benchmark",
+        "GSERVICE_CREDENTIALS_JSON": "no-se-usa.json",
+        "SESSION_CACHE_PATH": os.path.join(directorio, f"sesion-{etiqueta}.bin"),
+        "ALIAS_CACHE_PATH": os.path.join(directorio, f"alias-{etiqueta}.json"),
+        "TRAZAS": "true",
+        **(entorno or {}),
+    })
+    contexto.instalar(contexto.Contexto())
+    modo = "script completo" if args.scripts else "unidad de trabajo"
+    print(f"\n▶️ Benchmark {etiqueta} ({modo}): {len(trabajos)} pedidos ({carga['origen']}, {len(carga['paginas'])} páginas grabadas) contra {base}")
+    hoja = None
+    try:
+        if args.scripts:
+            # El script abre y cierra sus propias trazas: quedan en una carpeta aparte para leer su resumen
+            os.environ.update({"TRAZAS_DIR": os.path.join(directorio, f"trazas-{etiqueta}"),
+                               "SELENIUM_HEADLESS": "false" if args.ver else "true", "SELENIUM_WORKERS": str(args.workers)})
+            hoja = HojaEnMemoria(filas_hoja(nombre, trabajos))
+            termino_bien = _correr_script(nombre, hoja, base, directorio, etiqueta)
+            resumen = trazas.finalizar() or _resumen_guardado(os.environ["TRAZAS_DIR"])
+            ok = _verificados(nombre, estado) if termino_bien else 0
+        else:
+            config = ConfigNavegador(login_url=f"{base}/es-AR/login", email=EMAIL_MOCK, password=PASSWORD_MOCK, headless=not args.ver)
+            trazas.iniciar(f"bench-{etiqueta}")
+            try:
+                ok = CORRIDAS[nombre](nombre, config, trabajos, args)
+            finally:
+                contexto.actual().cerrar()
+                resumen = trazas.finalizar()
+    finally:
+        os.environ.clear()
+        os.environ.update(original)
+        server.shutdown()
+
+    resultado = {
+        "origen": carga["origen"],
+        "pedidos": len(trabajos),
+        "ok": ok,
+        "verificados": _verificados(nombre, estado),
+        "errores_inyectados": estado.errores_inyectados,
+        "mensajes_slack": len(estado.slack),
+        "resumen": resumen,
+    }
+    if hoja is not None and nombre == "reclamos":
+        resultado["marcados_hoja"] = sum(len(fila) > 12 and fila[12] == "✅" for fila in hoja.filas[1:])
+    return resultado
+
+
+def _resumen_guardado(directorio):
+    """Resumen que dejó trazas.finalizar() dentro del script (None si no llegó a escribirlo)."""
+    try:
+        nombre = max(n for n in os.listdir(directorio) if n.endswith(".resumen.json"))
+    except (OSError, ValueError):
+        return None
+    with open(os.path.join(directorio, nombre), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def formatear_resultado(nombre, r) -> str:
+    resumen = r["resumen"] or {"pedidos_por_minuto": None, "tramos": {}}
+    pedido = resumen["tramos"].get("pedido", {})
+    linea = f"🏁 {nombre}: {r['ok']}/{r['pedidos']} ok, {r['verificados']} verificados en el mock"
+    if resumen["pedidos_por_minuto"]:
+        linea += f", {resumen['pedidos_por_minuto']:.1f} pedidos/min"
+    if pedido:
+        linea += f", pedido p50 {pedido['p50_ms']:.0f}ms / p95 {pedido['p95_ms']:.0f}ms"
+    if r["errores_inyectados"]:
+        linea += f" ({r['errores_inyectados']} errores inyectados)"
+    return linea
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de los jobs contra el backoffice de mentira")
+    parser.add_argument("jobs", nargs="*", metavar="JOB", help=f"jobs a medir ({', '.join(JOBS)}); por defecto todos")
+    parser.add_argument("--pedidos", type=int, default=20)
+    parser.add_argument("--productos", type=int, default=2, help="productos reclamados o faltantes por pedido (reclamos y desvios)")
+    parser.add_argument("--workers", type=int, default=1, help="Chrome en paralelo para homedelivery/prevencion")
+    parser.add_argument("--latencia-ms", type=int, default=0)
+    parser.add_argument("--jitter-ms", type=int, default=0)
+    parser.add_argument("--render-ms", type=int, default=0)
+    parser.add_argument("--tasa-error", type=float, default=0.0)
+    parser.add_argument("--combobox", choices=("email", "status", "alternado"), default="email")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--peso-kb", type=int, default=0, help="miniaturas, fuente y analítica simuladas en cada pedido (KB c/u)")
+    parser.add_argument("--navegador", choices=("actual", "completo", "liviano", "ambos"), default="actual",
+                        help="modo del Chrome: el del entorno (NAVEGADOR_LIVIANO), uno fijo, o ambos para comparar")
+    parser.add_argument("--ya-cancelados", type=float, default=0.0,
+                        help="fracción de pedidos que ya están cancelados en el mock (homedelivery/prevencion)")
+    parser.add_argument("--prefetch", type=int, help="pedidos a precargar en pestañas (default: NAVEGADOR_PREFETCH)")
+    parser.add_argument("--ver", action="store_true", help="Chrome con ventana (sin headless)")
+    parser.add_argument("--grabacion", action="append", default=[], metavar="DIR",
+                        help="reproducir una corrida grabada (se puede repetir); el job sale de la grabación")
+    parser.add_argument("--scripts", action="store_true",
+                        help="correr el main() de cada script contra el mock (hoja en memoria, Slack al mock)")
+    parser.add_argument("--base", help="benchmark-*.json anterior para comparar")
+    args = parser.parse_args()
+
+    nombres = args.jobs or list(JOBS)
+    desconocidos = [n for n in nombres if n not in JOBS]
+    if desconocidos:
+        parser.error(f"jobs desconocidos: {', '.join(desconocidos)}")
+
+    if args.grabacion:
+        cargas = [carga_grabada(carpeta) for carpeta in args.grabacion]
+        cargas = [c for c in cargas if not args.jobs or c["trabajo"] in nombres]
+    else:
+        cargas = [carga_sintetica(nombre, args) for nombre in nombres]
+
+    modos = {"actual": [None], "completo": ["completo"], "liviano": ["liviano"], "ambos": ["completo", "liviano"]}[args.navegador]
+    resultados = {}
+    with tempfile.TemporaryDirectory(prefix="benchmark-") as directorio:
+        for carga in cargas:
+            for modo in modos:
+                clave = carga["trabajo"] + (f"-{modo}" if modo else "")
+                if clave in resultados:
+                    clave = f"{clave}-{len(resultados)}"
+                entorno = {"NAVEGADOR_LIVIANO": "true" if modo == "liviano" else "false"} if modo else {}
+                if args.prefetch is not None:
+                    entorno["NAVEGADOR_PREFETCH"] = str(args.prefetch)
+                resultados[clave] = correr_job(carga, args, directorio, clave, entorno)
+
+    informe = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "parametros": {k: v for k, v in vars(args).items() if k not in ("jobs", "base", "ver", "grabacion")},
+        "jobs": resultados,
+    }
+    carpeta = os.getenv("TRAZAS_DIR") or "trazas"
+    os.makedirs(carpeta, exist_ok=True)
+    ruta = os.path.join(carpeta, f"benchmark-{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump(informe, f, ensure_ascii=False, indent=2)
+
+    print()
+    for nombre, r in resultados.items():
+        print(formatear_resultado(nombre, r))
+    print(f"💾 Benchmark guardado en {ruta}")
+
+    if args.navegador == "ambos":
+        for nombre in dict.fromkeys(c["trabajo"] for c in cargas):
+            completo, liviano = resultados.get(f"{nombre}-completo"), resultados.get(f"{nombre}-liviano")
+            if completo and liviano and completo["resumen"] and liviano["resumen"]:
+                print(f"\n📊 {nombre} (navegador completo -> liviano)\n{trazas.comparar(completo['resumen'], liviano['resumen'])}")
+
+    if args.base:
+        with open(args.base, encoding="utf-8") as f:
+            base = json.load(f)
+        for nombre, r in resultados.items():
+            anterior = base["jobs"].get(nombre)
+            if anterior and anterior["resumen"] and r["resumen"]:
+                print(f"\n📊 {nombre} (base -> nueva)\n{trazas.comparar(anterior['resumen'], r['resumen'])}")
+
+    # Con carga sintética y sin fallas inyectadas, todo pedido tiene que llegar al mock
+    if not args.grabacion and not args.tasa_error and any(r["verificados"] < r["pedidos"] for r in resultados.values()):
+        print("❌ Hay pedidos que no cambiaron en el mock")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""Unidad de trabajo de HomeDelivery y Prevención: pasar un pedido a "Cancelado" con un motivo.
+
+La función no imprime ni notifica directamente: acumula los mensajes en un
+ResultadoPedido para que un único colector los emita en el orden original,
+tanto en la corrida secuencial como en el pool de workers.
+"""
+from dataclasses import dataclass, field
+
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import TimeoutException
+
+from comun import grabacion
+from comun.prefetch import navegar
+from comun.reintentos import PERMANENTE, TRANSITORIA, clasificar
+from comun.esperas import FILAS_PRODUCTO, esperar_listbox, esperar_listbox_cerrado, esperar_modal_cerrado
+from comun.trazas import tramo
+
+
+@dataclass
+class ResultadoPedido:
+    indice: int
+    pedido_id: str
+    ok: bool = False
+    falla: str = ""  # TRANSITORIA o PERMANENTE si no salió (ver comun/reintentos.py)
+    mensajes: list = field(default_factory=list)  # [(texto, notificar_slack)]
+
+    def registrar(self, mensaje: str, notificar: bool = False):
+        self.mensajes.append((mensaje, notificar))
+
+
+def emitir_resultado(resultado: ResultadoPedido, notificar, contar=None):
+    """Imprime los mensajes del pedido, manda a Slack los marcados y suma el pedido al resumen."""
+    for mensaje, enviar in resultado.mensajes:
+        print(mensaje)
+        if enviar:
+            notificar(mensaje)
+    if contar and resultado.pedido_id:
+        contar(resultado.pedido_id, resultado.ok)
+
+
+def guardar_cambios(driver, resultado: ResultadoPedido, wait_time=10):
+    with tramo("guardar_cambios", pedido_id=resultado.pedido_id) as t:
+        t["exito"] = _guardar_cambios(driver, resultado, wait_time)
+    return t["exito"]
+
+
+def _guardar_cambios(driver, resultado, wait_time):
+    try:
+        # Esperar el modal visible
+        modal = WebDriverWait(driver, wait_time).until(
+            EC.visibility_of_element_located((By.XPATH, "//h2[contains(text(), 'Cambiar el estado del pedido')]/ancestor::div[@role='dialog']"))
+        )
+
+        # Buscar el botón dentro del modal
+        guardar_btn = modal.find_element(By.XPATH, ".//button[normalize-space(text())='Guardar cambios']")
+
+        # Scroll y clic
+        driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", guardar_btn)
+        driver.execute_script("arguments[0].click();", guardar_btn)
+        esperar_modal_cerrado(driver)
+
+        resultado.registrar("✅ 'Guardar cambios' se clickeó correctamente.")
+        return True
+
+    except Exception as e:
+        resultado.falla = clasificar(e)
+        resultado.registrar(f"❌ No se pudo hacer clic en el botón correcto: {e}")
+        return False
+
+
+def url_pedido(base_url, pedido_id):
+    return f"{base_url}/orders/{pedido_id}"
+
+
+def cancelar_pedido(driver, indice, pedido_id, base_url, motivo, notificar_exito=False) -> ResultadoPedido:
+    with tramo("pedido", pedido_id=pedido_id) as t:
+        resultado = _cancelar_pedido(driver, indice, pedido_id, base_url, motivo, notificar_exito)
+        t["exito"] = resultado.ok
+    if pedido_id:
+        grabacion.accion("cancelar", pedido_id, motivo=motivo, ok=resultado.ok)
+    return resultado
+
+
+def _cancelar_pedido(driver, indice, pedido_id, base_url, motivo, notificar_exito):
+    resultado = ResultadoPedido(indice, pedido_id)
+
+    if not pedido_id:
+        resultado.falla = PERMANENTE
+        resultado.registrar(f"❌ No se encontró un ID válido en: {pedido_id}", notificar=True)
+        return resultado
+
+    resultado.registrar(f"🔄 Procesando pedido {pedido_id} con motivo {motivo}")
+    try:
+        with tramo("carga_pedido", pedido_id=pedido_id):
+            navegar(driver, url_pedido(base_url, pedido_id))
+    except Exception as e:
+        resultado.falla = clasificar(e)
+        resultado.registrar(f"⚠️ Error al abrir el pedido {pedido_id}: {e}", notificar=True)
+        return resultado
+    grabacion.capturar_pedido(driver, pedido_id)
+
+    # Seleccionar estado cancelado
+    try:
+        with tramo("combobox_estado", pedido_id=pedido_id) as t:
+            t["via"] = _abrir_combobox_estado(driver, resultado)
+        if not t["via"]:
+            resultado.falla = _falla_sin_combobox(driver, resultado)
+            return resultado
+
+        # Seleccionar la opción "Cancelado"
+        cancelado_opcion = WebDriverWait(driver, 10).until(
+            EC.element_to_be_clickable((By.XPATH, "//li[@role='option' and contains(text(), 'Cancelado')]"))
+        )
+        cancelado_opcion.click()
+        esperar_listbox_cerrado(driver)
+
+        # Seleccionar el motivo de cancelación
+        motivo_combo = WebDriverWait(driver, 10).until(
+            EC.element_to_be_clickable((By.ID, "reason_of_canceled"))
+        )
+        motivo_combo.click()
+        esperar_listbox(driver)
+        try:
+            motivo_opcion = WebDriverWait(driver, 10).until(
+                EC.element_to_be_clickable((By.XPATH, f"//li[@role='option' and contains(text(), '{motivo}')]"))
+            )
+            motivo_opcion.click()
+        except Exception:
+            resultado.registrar(f"❌ No se pudo seleccionar el motivo por defecto para el pedido {pedido_id}", notificar=True)
+
+        # Guardar cambios
+        resultado.ok = guardar_cambios(driver, resultado)
+        if resultado.ok:
+            resultado.registrar(f"✅ Pedido {pedido_id} cancelado con motivo '{motivo}'", notificar=notificar_exito)
+    except Exception as e:
+        resultado.falla = clasificar(e)
+        resultado.registrar(f"❌ Error procesando pedido {pedido_id}: TAL VEZ YA ESTA ANULADO", notificar=True)
+    return resultado
+
+
+def _falla_sin_combobox(driver, resultado):
+    """Ningún combobox clickeable a tiempo: PERMANENTE si la página del pedido se ve armada
+    (ya cancelado o no editable: reintentar no cambia nada), TRANSITORIA si no llegó a renderizar."""
+    try:
+        combos = driver.find_elements(By.XPATH, "//div[@role='combobox' and (@id='email' or @id='status')]")
+        estado = combos[0].text.strip() if combos else None
+        renderizada = bool(combos) or bool(driver.find_elements(*FILAS_PRODUCTO))
+    except Exception:
+        return TRANSITORIA  # navegador caído: otro intento con un Chrome nuevo puede salir
+    if not renderizada:
+        return TRANSITORIA
+    resultado.registrar(f"⛔ Pedido {resultado.pedido_id} no editable (estado visible: {estado or 'sin dato'}), no se reintenta")
+    return PERMANENTE
+
+
+def _abrir_combobox_estado(driver, resultado):
+    """Abre el combobox de estado; devuelve el id que funcionó ('email' o 'status') o None."""
+    pedido_id = resultado.pedido_id
+    # Intentar hacer clic en el combobox con id='email'
+    try:
+        cambiar_estado = WebDriverWait(driver, 5).until(
+            EC.element_to_be_clickable((By.XPATH, "//div[@role='combobox' and @id='email']"))
+        )
+        cambiar_estado.click()
+        return "email"
+    except TimeoutException:
+        resultado.registrar("⚠️ No se pudo hacer clic en cambiar estado intento 1. Intentando con id='status'...")
+
+    # Intentar hacer clic en el combobox con id='status'
+    try:
+        cambiar_estado = WebDriverWait(driver, 5).until(
+            EC.element_to_be_clickable((By.XPATH, "//div[@role='combobox' and @id='status']"))
+        )
+        cambiar_estado.click()
+        return "status"
+    except TimeoutException:
+        resultado.registrar(
+            f"❌ No se pudo hacer clic en cambiar estado intento 2 {pedido_id}. Continuando con el siguiente pedido...",
+            notificar=True,
+        )
+        return None
+
+
+def correr_job(nombre, worksheet, config, motivo, notificador, n_workers=1, notificar_exito=False):
+    """Corrida completa de HomeDelivery o Prevención sobre su pestaña (columna 1 = id de pedido).
+
+    Lee la cola nueva de la hoja, saltea lo que el journal ya tiene o que otro
+    job tomó hoy, prechequea estados, prueba la API (si está configurada),
+    cancela el resto con el navegador, reintenta las fallas transitorias al
+    final y confirma la marca de la hoja (las fallas permanentes no la frenan). `nombre` identifica al job en el
+    journal y en la marca de la hoja.
+    """
+    # Importes diferidos: pool y api_backoffice importan ResultadoPedido de este módulo
+    from datetime import datetime
+    from functools import partial
+
+    from comun import contexto
+    from comun.api_backoffice import ConfigApi, cancelar_por_api, crear_cliente_api, prechequear_estados
+    from comun.journal import Journal
+    from comun.pool import ejecutar_pedidos
+    from comun.registros import pedidos_de_columna
+    from comun.reintentos import ColaReintentos
+    from comun.sheets import LectorIncremental
+
+    # Solo la cola nueva desde la última corrida (más un solapamiento), no la hoja entera
+    lector = LectorIncremental(worksheet, nombre)
+    valores, fila_inicio = lector.leer()
+    print(f"📌 Pedidos de hoy ({datetime.now():%d/%m/%Y}):")
+
+    trabajos = list(pedidos_de_columna(valores, columna=1))  # columna 1 (índice 1); la fila 0 es el encabezado
+    fila_de = {pedido_id: fila_inicio + n for n, pedido_id in trabajos if pedido_id}
+    filas_con_error = []
+    unidad = partial(cancelar_pedido, base_url=config.base_url, motivo=motivo, notificar_exito=notificar_exito)
+
+    # Journal: saltea lo confirmado en corridas anteriores (o retoma la corrida cortada)
+    journal = Journal(nombre)
+    trabajos = journal.filtrar_pedidos([tuple(t) for t in journal.iniciar_corrida(trabajos)])
+    # Un id repetido (en esta hoja o en la del otro job de cancelación) se procesa una sola vez
+    trabajos = journal.deduplicar(trabajos)
+
+    # Fallas transitorias: se guardan para una segunda pasada al final (sin Slack ni resumen hasta entonces)
+    reintentos = ColaReintentos()
+
+    def emitir(resultado):
+        if not resultado.ok and reintentos.agregar(resultado.pedido_id, resultado, resultado.falla):
+            emitir_resultado(resultado, lambda _: None)
+            return
+        cerrar_pedido(resultado)
+
+    def cerrar_pedido(resultado):
+        emitir_resultado(resultado, notificador.notificar, notificador.contar)
+        if resultado.ok:
+            journal.registrar(resultado.pedido_id)
+        elif resultado.falla != PERMANENTE and resultado.pedido_id in fila_de:
+            # Solo lo transitorio frena la marca: un ya cancelado o no editable falla igual la próxima vez
+            filas_con_error.append(fila_de[resultado.pedido_id])
+
+    # Prechequeo: los ya cancelados (o inexistentes / no cancelables) no llegan al navegador
+    config_prechequeo = ConfigApi.desde_env(prechequeo=True)
+    if config_prechequeo:
+        cliente_estados = crear_cliente_api(config_prechequeo, config)
+        trabajos = prechequear_estados(trabajos, cliente_estados, notificador.notificar,
+                                       ya_cancelado=lambda pedido_id: journal.registrar(pedido_id, estado="ya_cancelado"))
+        cliente_estados.cerrar()
+
+    # Camino rápido por API (opcional); lo que falle sigue por el navegador
+    config_api = ConfigApi.desde_env()
+    if config_api:
+        cliente_api = crear_cliente_api(config_api, config)
+        trabajos = cancelar_por_api(trabajos, cliente_api, motivo, emitir, notificar_exito=notificar_exito)
+        cliente_api.cerrar()
+
+    # Con NAVEGADOR_PREFETCH los próximos pedidos se cargan en pestañas de fondo mientras se edita el actual
+    ejecutar_pedidos(trabajos, config, unidad, n_workers, emitir, obtener_driver=contexto.actual().driver,
+                     url_de=partial(url_pedido, config.base_url))
+
+    def reintentar(previo):
+        try:
+            resultado = unidad(contexto.actual().driver(config), previo.indice, previo.pedido_id)
+        except Exception as e:
+            # Resultado nuevo: los mensajes del primer intento ya se imprimieron al encolarlo
+            resultado = ResultadoPedido(previo.indice, previo.pedido_id, falla=clasificar(e))
+            resultado.registrar(f"❌ Falló el reintento del pedido {previo.pedido_id}: {e}", notificar=True)
+        emitir(resultado)
+
+    for resultado in reintentos.drenar(reintentar, renovar_driver=lambda: contexto.actual().renovar_driver(config)):
+        cerrar_pedido(resultado)
+    journal.terminar_corrida()
+    journal.cerrar()
+    # La próxima corrida relee desde el primer pedido con falla transitoria (se reintenta como antes)
+    lector.confirmar(min(filas_con_error, default=lector.ultima_fila + 1))
@@ -0,0 +1,110 @@
+"""Resolución de chromedriver sin ir a la red en el camino normal.
+
+`ChromeDriverManager().install()` consulta la versión por red (y a veces
+descarga) en cada arranque, y falla si la red anda mal. Acá se busca, en orden:
+  1) CHROMEDRIVER_PATH (ruta fijada), si coincide con la versión mayor de Chrome;
+  2) el cache local <cache>/chromedriver/<versión mayor>/chromedriver;
+  3) recién ahí webdriver_manager, y lo descargado se copia al cache.
+El cache vive en ~/.cache/nilus-backoffice, que los workflows ya guardan entre
+corridas. La ruta queda memorizada por proceso y los workers la reciben resuelta.
+"""
+import os
+import re
+import shutil
+import stat
+import subprocess
+import time
+
+from comun.esperas import registrar_tiempo
+from comun.sesion import CACHE_DIR_DEFAULT
+
+RUTA_CACHE = os.path.join(CACHE_DIR_DEFAULT, "chromedriver")
+BINARIO = "chromedriver.exe" if os.name == "nt" else "chromedriver"
+
+_resuelto = None
+
+
+def _mayor(version):
+    m = re.match(r"\s*(\d+)", version or "")
+    return m.group(1) if m else None
+
+
+def version_chrome():
+    """Versión del Chrome instalado (sin red), o None si no se pudo detectar."""
+    try:
+        from webdriver_manager.core.os_manager import ChromeType, OperationSystemManager
+        return OperationSystemManager().get_browser_version_from_os(ChromeType.GOOGLE)
+    except Exception:
+        return None
+
+
+def version_driver(ruta):
+    try:
+        salida = subprocess.run([ruta, "--version"], capture_output=True, text=True, timeout=10).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    m = re.search(r"ChromeDriver\s+(\d[\d.]*)", salida)
+    return m.group(1) if m else None
+
+
+def ruta_chromedriver():
+    """Ruta a un chromedriver compatible con el Chrome instalado (memorizada por proceso)."""
+    global _resuelto
+    if _resuelto:
+        return _resuelto
+    inicio = time.perf_counter()
+    ruta, origen = _resolver()
+    segundos = time.perf_counter() - inicio
+    registrar_tiempo("resolver_chromedriver", segundos)
+    print(f"🚗 chromedriver desde {origen} en {segundos * 1000:.0f} ms: {ruta}")
+    _resuelto = ruta
+    return ruta
+
+
+def _resolver():
+    chrome = _mayor(version_chrome())
+    directorio = os.getenv("CHROMEDRIVER_CACHE_DIR") or RUTA_CACHE
+
+    fijada = os.getenv("CHROMEDRIVER_PATH")
+    if fijada and os.path.isfile(fijada):
+        if chrome is None or _mayor(version_driver(fijada)) == chrome:
+            return fijada, "ruta fijada"
+        print(f"⚠️ CHROMEDRIVER_PATH no coincide con Chrome {chrome}, se busca otro")
+
+    if chrome:
+        candidata = os.path.join(directorio, chrome, BINARIO)
+        if os.path.isfile(candidata):
+            return candidata, "cache"
+    else:
+        # Sin versión de Chrome detectable: el más nuevo del cache antes que ir a la red
+        mayores = sorted((d for d in _listar(directorio) if d.isdigit() and os.path.isfile(os.path.join(directorio, d, BINARIO))), key=int)
+        if mayores:
+            return os.path.join(directorio, mayores[-1], BINARIO), "cache (Chrome sin versión detectable)"
+
+    from webdriver_manager.chrome import ChromeDriverManager
+    descargado = ChromeDriverManager().install()
+    mayor = _mayor(version_driver(descargado)) or chrome
+    if not mayor:
+        return descargado, "red"
+    try:
+        return _guardar_en_cache(descargado, os.path.join(directorio, mayor)), "red (guardado en cache)"
+    except OSError as e:
+        print(f"⚠️ No se pudo guardar chromedriver en cache: {e!r}")
+        return descargado, "red"
+
+
+def _listar(directorio):
+    try:
+        return os.listdir(directorio)
+    except OSError:
+        return []
+
+
+def _guardar_en_cache(origen, directorio):
+    os.makedirs(directorio, exist_ok=True)
+    destino = os.path.join(directorio, BINARIO)
+    tmp = f"{destino}.{os.getpid()}.tmp"
+    shutil.copy2(origen, tmp)
+    os.chmod(tmp, os.stat(tmp).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    os.replace(tmp, destino)
+    return destino
@@ -0,0 +1,94 @@
+"""Recursos que los jobs comparten cuando corren en el mismo proceso.
+
+Cada script pide su cliente de Sheets, su Chrome logueado, su notificador de
+Slack y el cache de alias a `actual()`. Corriendo solo, el contexto es suyo y
+`terminar()` cierra todo como antes. Bajo `python -m comun.jobs` el contexto
+es compartido: el segundo job reutiliza lo que abrió el primero (mismas
+credenciales, misma cuenta del backoffice, mismo canal de Slack) y el cierre
+lo hace el runner al final.
+"""
+import threading
+
+from comun.gestor_driver import GestorDriver
+
+_actual = None
+
+
+class Contexto:
+    def __init__(self, compartido=False):
+        self.compartido = compartido
+        self._sheets = {}  # ruta de credenciales -> cliente gspread
+        self._gestores = {}  # (login_url, email) -> GestorDriver
+        self._notificadores = {}  # clave del transporte -> NotificadorSlack
+        self._alias = None
+        self._lock = threading.Lock()  # los hilos por país (comun/paises.py) piden sus Chrome a la vez
+
+    def cliente_sheets(self, ruta_credenciales):
+        if ruta_credenciales not in self._sheets:
+            from oauth2client.service_account import ServiceAccountCredentials
+            from comun.cuota_sheets import autorizar
+
+            scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
+            credenciales = ServiceAccountCredentials.from_json_keyfile_name(ruta_credenciales, scope)
+            # Todas las llamadas a Sheets pasan por la cuota compartida (comun/cuota_sheets.py)
+            self._sheets[ruta_credenciales] = autorizar(credenciales)
+        return self._sheets[ruta_credenciales]
+
+    def driver(self, config):
+        """Chrome logueado para `config`, pedido una vez por pedido: si murió se levanta otro
+        y cada tanto se recicla (ver comun/gestor_driver.py)."""
+        return self._gestor(config).obtener()
+
+    def renovar_driver(self, config):
+        """Cierra el Chrome de `config` (si había) y levanta uno nuevo; p. ej. antes de reintentar."""
+        return self._gestor(config).renovar()
+
+    def _gestor(self, config):
+        clave = (config.login_url, config.email)
+        with self._lock:
+            if clave not in self._gestores:
+                self._gestores[clave] = GestorDriver(config)
+            return self._gestores[clave]
+
+    def notificador(self, clave, fabrica):
+        """Un NotificadorSlack por destino (`clave`), creado con `fabrica()` la primera vez."""
+        if clave not in self._notificadores:
+            self._notificadores[clave] = fabrica()
+        return self._notificadores[clave]
+
+    def alias_productos(self):
+        if self._alias is None:
+            from comun.alias_productos import AliasProductos
+            self._alias = AliasProductos()
+        return self._alias
+
+    def terminar(self):
+        """Fin de un script: cierra todo si el contexto es suyo; si es compartido, lo deja al runner."""
+        if self._alias is not None:
+            self._alias.persistir()
+        if not self.compartido:
+            self.cerrar()
+
+    def cerrar(self):
+        if self._sheets:
+            from comun.cuota_sheets import resumen_cuota
+            print(resumen_cuota())
+        for gestor in self._gestores.values():
+            gestor.cerrar()
+        self._gestores.clear()
+        for notificador in self._notificadores.values():
+            notificador.cerrar()
+        if self._alias is not None:
+            self._alias.persistir()
+
+
+def actual() -> Contexto:
+    global _actual
+    if _actual is None:
+        _actual = Contexto()
+    return _actual
+
+
+def instalar(contexto: Contexto):
+    global _actual
+    _actual = contexto
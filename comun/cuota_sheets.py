@@ -0,0 +1,177 @@
+"""Cuota de la API de Google Sheets compartida entre jobs y procesos.
+
+Todos los clientes gspread salen de `autorizar()` (vía contexto.cliente_sheets)
+y hablan con la API a través de ClienteConCuota, que:
+  - toma un token de un balde compartido antes de cada llamada: uno para
+    lecturas y otro para escrituras, por cuenta de servicio, guardados en un
+    SQLite local, así varios jobs o procesos en la misma máquina se reparten
+    la cuota por minuto en vez de sumarla;
+  - junta lecturas idénticas: el mismo GET (p. ej. la metadata que piden
+    open_by_key y worksheet) se responde de memoria hasta la próxima escritura
+    o por SHEETS_COALESCER_S segundos;
+  - reintenta 429, 408 y 5xx (y el 403 de usageLimits) con espera exponencial,
+    respetando Retry-After si la API lo manda;
+  - cuenta llamadas, reintentos y tiempo frenado por la cuota (`resumen_cuota()`).
+
+    SHEETS_CUOTA_LECTURAS    lecturas por minuto (default 60, la cuota por usuario de Google)
+    SHEETS_CUOTA_ESCRITURAS  escrituras por minuto (default 60)
+    SHEETS_RAFAGA            llamadas seguidas permitidas sin esperar (default 10)
+    SHEETS_REINTENTOS        reintentos por llamada ante 429/5xx (default 5)
+    SHEETS_COALESCER_S       vigencia de una lectura repetida (default 30; 0 = no junta)
+    SHEETS_CUOTA_PATH        base SQLite del balde (default: en el cache local)
+"""
+import os
+import random
+import sqlite3
+import time
+
+from comun.sesion import CACHE_DIR_DEFAULT
+from comun.trazas import tramo
+
+try:
+    from gspread.exceptions import APIError
+    from gspread.http_client import HTTPClient
+except ImportError:  # gspread < 6: sin cliente HTTP intercambiable, se usa el de siempre
+    HTTPClient = None
+
+_REINTENTABLES = {408, 429, 500, 502, 503, 504}
+_ESPERA_MAX_S = 64
+
+# Contadores del proceso (todos los clientes)
+estadisticas = {"llamadas": 0, "lecturas_juntadas": 0, "reintentos": 0, "espera_cuota_s": 0.0, "espera_reintentos_s": 0.0}
+
+
+class BaldeCompartido:
+    """Token bucket en SQLite: `tomar()` espera hasta que haya un token libre para `clave`."""
+
+    def __init__(self, ruta, por_minuto, rafaga):
+        self.ruta = ruta
+        self.por_segundo = por_minuto / 60.0
+        self.capacidad = max(1.0, float(rafaga))
+        os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+        db = self._conectar()
+        try:
+            db.execute("CREATE TABLE IF NOT EXISTS balde (clave TEXT PRIMARY KEY, tokens REAL, actualizado REAL)")
+        finally:
+            db.close()
+
+    def _conectar(self):
+        return sqlite3.connect(self.ruta, timeout=30, isolation_level=None)
+
+    def tomar(self, clave) -> float:
+        """Consume un token; devuelve los segundos que hubo que esperar."""
+        if self.por_segundo <= 0:
+            return 0.0
+        espera = self._intentar(clave)
+        if espera <= 0:
+            return 0.0
+        inicio = time.perf_counter()
+        with tramo("sheets_espera_cuota", balde=clave):
+            while espera > 0:
+                time.sleep(espera)
+                espera = self._intentar(clave)
+        return time.perf_counter() - inicio
+
+    def _intentar(self, clave) -> float:
+        db = self._conectar()
+        try:
+            db.execute("BEGIN IMMEDIATE")  # lock de escritura: un proceso a la vez lee y descuenta
+            fila = db.execute("SELECT tokens, actualizado FROM balde WHERE clave = ?", (clave,)).fetchone()
+            ahora = time.time()
+            tokens, actualizado = fila if fila else (self.capacidad, ahora)
+            tokens = min(self.capacidad, tokens + max(0.0, ahora - actualizado) * self.por_segundo)
+            espera = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                espera = (1 - tokens) / self.por_segundo
+            db.execute("INSERT OR REPLACE INTO balde (clave, tokens, actualizado) VALUES (?, ?, ?)", (clave, tokens, ahora))
+            db.execute("COMMIT")
+            return espera
+        finally:
+            db.close()
+
+
+def _baldes():
+    ruta = os.getenv("SHEETS_CUOTA_PATH") or os.path.join(CACHE_DIR_DEFAULT, "cuota_sheets.sqlite")
+    rafaga = int(os.getenv("SHEETS_RAFAGA", "10"))
+    return {
+        "lectura": BaldeCompartido(ruta, float(os.getenv("SHEETS_CUOTA_LECTURAS", "60")), rafaga),
+        "escritura": BaldeCompartido(ruta, float(os.getenv("SHEETS_CUOTA_ESCRITURAS", "60")), rafaga),
+    }
+
+
+def _retry_after(error):
+    try:
+        return float(error.response.headers.get("Retry-After"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def _reintentable(error):
+    if error.code in _REINTENTABLES:
+        return True
+    # La Drive API avisa el límite de uso con 403
+    detalle = error.error if isinstance(error.error, dict) else {}
+    return error.code == 403 and any(e.get("domain") == "usageLimits" for e in detalle.get("errors", []))
+
+
+if HTTPClient is not None:
+    class ClienteConCuota(HTTPClient):
+        """HTTPClient de gspread con balde compartido, lecturas juntadas y reintentos."""
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.baldes = _baldes()
+            self.cuenta = getattr(self.auth, "service_account_email", "") or "default"
+            self.reintentos = int(os.getenv("SHEETS_REINTENTOS", "5"))
+            self.vigencia = float(os.getenv("SHEETS_COALESCER_S", "30"))
+            self._lecturas = {}  # (endpoint, params) -> (momento, respuesta)
+
+        def request(self, method, endpoint, params=None, *args, **kwargs):
+            es_lectura = method.upper() == "GET"
+            clave = (endpoint, repr(sorted((params or {}).items())))
+            if es_lectura and self.vigencia > 0:
+                guardada = self._lecturas.get(clave)
+                if guardada and time.monotonic() - guardada[0] < self.vigencia:
+                    estadisticas["lecturas_juntadas"] += 1
+                    return guardada[1]
+            elif not es_lectura:
+                self._lecturas.clear()  # después de escribir, nada leído antes sirve
+
+            tipo = "lectura" if es_lectura else "escritura"
+            for intento in range(self.reintentos + 1):
+                estadisticas["espera_cuota_s"] += self.baldes[tipo].tomar(f"{self.cuenta}/{tipo}")
+                estadisticas["llamadas"] += 1
+                try:
+                    respuesta = super().request(method, endpoint, params, *args, **kwargs)
+                    break
+                except APIError as e:
+                    if intento == self.reintentos or not _reintentable(e):
+                        raise
+                    espera = _retry_after(e) or min(_ESPERA_MAX_S, 2 ** intento + random.random())
+                    print(f"⏳ Sheets respondió {e.code}; reintento {intento + 1}/{self.reintentos} en {espera:.1f}s")
+                    estadisticas["reintentos"] += 1
+                    estadisticas["espera_reintentos_s"] += espera
+                    time.sleep(espera)
+
+            if es_lectura and self.vigencia > 0:
+                self._lecturas[clave] = (time.monotonic(), respuesta)
+            return respuesta
+else:
+    ClienteConCuota = None
+
+
+def autorizar(credenciales):
+    """gspread.authorize con el cliente de cuota (si la versión de gspread lo permite)."""
+    import gspread
+
+    if ClienteConCuota is None:
+        return gspread.authorize(credenciales)
+    return gspread.authorize(credenciales, http_client=ClienteConCuota)
+
+
+def resumen_cuota() -> str:
+    e = estadisticas
+    return (f"📊 Sheets: {e['llamadas']} llamadas, {e['lecturas_juntadas']} lecturas juntadas, "
+            f"{e['reintentos']} reintentos ({e['espera_reintentos_s']:.1f}s), {e['espera_cuota_s']:.1f}s frenado por cuota")
@@ -0,0 +1,98 @@
+"""Esperas por señales concretas de la página en lugar de `time.sleep` fijos.
+
+Cada espera registra cuánto tardó realmente (por nombre) para poder ver en el
+resumen final dónde se va el tiempo de cada pedido.
+"""
+import time
+from collections import defaultdict
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+# Intervalo de sondeo: el default de Selenium (0.5 s) se come buena parte de lo que se gana
+POLL = 0.05
+
+LISTBOX = (By.CSS_SELECTOR, "ul[role='listbox']")
+DIALOGO = (By.XPATH, "//div[@role='dialog']")
+FILAS_PRODUCTO = (By.CLASS_NAME, "css-1es96wk")
+
+_JS_RED = """
+const recursos = performance.getEntriesByType('resource');
+let ultimo = 0;
+for (const r of recursos) { if (r.responseEnd > ultimo) ultimo = r.responseEnd; }
+return [document.readyState, performance.now() - ultimo];
+"""
+
+# nombre -> [segundos, ...]
+_registro = defaultdict(list)
+_timeouts = defaultdict(int)
+
+
+def esperar(driver, condicion, timeout=10, nombre="espera", obligatoria=True):
+    """WebDriverWait.until con medición. Si no es obligatoria devuelve None en vez de lanzar TimeoutException."""
+    inicio = time.perf_counter()
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency=POLL).until(condicion)
+    except TimeoutException:
+        _timeouts[nombre] += 1
+        if obligatoria:
+            raise
+        return None
+    finally:
+        _registro[nombre].append(time.perf_counter() - inicio)
+
+
+def red_inactiva(quietud_ms=300):
+    """Documento completo y sin respuestas de red nuevas durante `quietud_ms`."""
+    def _condicion(driver):
+        estado, desde_ultimo = driver.execute_script(_JS_RED)
+        return estado == "complete" and desde_ultimo >= quietud_ms
+    return _condicion
+
+
+def esperar_red_inactiva(driver, timeout=10, quietud_ms=300, nombre="red_inactiva"):
+    return esperar(driver, red_inactiva(quietud_ms), timeout, nombre, obligatoria=False)
+
+
+def esperar_listbox(driver, timeout=10, nombre="listbox_visible"):
+    """El menú desplegable de MUI quedó abierto (reemplaza el sleep tras clickear un combobox)."""
+    return esperar(driver, EC.visibility_of_element_located(LISTBOX), timeout, nombre, obligatoria=False)
+
+
+def esperar_listbox_cerrado(driver, timeout=10, nombre="listbox_cerrado"):
+    """El menú se cerró tras elegir una opción; MUI lo desmonta al terminar la animación."""
+    return esperar(driver, EC.invisibility_of_element_located(LISTBOX), timeout, nombre, obligatoria=False)
+
+
+def esperar_modal_cerrado(driver, timeout=10, nombre="modal_cerrado"):
+    """Tras 'Guardar cambios' el diálogo desaparece cuando el backoffice confirmó el guardado."""
+    return esperar(driver, EC.invisibility_of_element_located(DIALOGO), timeout, nombre, obligatoria=False)
+
+
+def esperar_productos(driver, timeout=10, nombre="productos_pedido"):
+    """La página del pedido terminó de renderizar la lista de productos."""
+    return esperar(driver, EC.presence_of_all_elements_located(FILAS_PRODUCTO), timeout, nombre, obligatoria=False)
+
+
+def registrar_tiempo(nombre, segundos):
+    """Suma al resumen un tiempo medido fuera de `esperar` (p. ej. el arranque de Chrome)."""
+    _registro[nombre].append(segundos)
+
+
+def tiempos_esperas():
+    return {nombre: list(tiempos) for nombre, tiempos in _registro.items()}
+
+
+def resumen_esperas() -> str:
+    if not _registro:
+        return "⏱️ Sin esperas registradas."
+    lineas = ["⏱️ Esperas (n / total / promedio / máx / timeouts):"]
+    for nombre, tiempos in sorted(_registro.items()):
+        total = sum(tiempos)
+        lineas.append(
+            f"   {nombre}: {len(tiempos)} / {total:.2f}s / {total / len(tiempos) * 1000:.0f}ms"
+            f" / {max(tiempos) * 1000:.0f}ms / {_timeouts.get(nombre, 0)}"
+        )
+    return "\n".join(lineas)
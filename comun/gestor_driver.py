@@ -0,0 +1,126 @@
+"""Ciclo de vida de un Chrome logueado a lo largo de una corrida larga.
+
+`GestorDriver.obtener()` se pide una vez por pedido y devuelve un driver vivo:
+  - si la sesión de WebDriver murió (Chrome se cayó o se colgó), levanta otro;
+  - cada NAVEGADOR_RECICLAR_CADA pedidos, o si Chrome pasa NAVEGADOR_MEMORIA_MB,
+    lo cierra y abre uno nuevo antes de que la memoria de la SPA lo vuelva lento.
+El Chrome nuevo entra con la sesión en cache (comun/sesion.py), así que
+reciclar no repite el login por formulario.
+
+    NAVEGADOR_RECICLAR_CADA   pedidos por Chrome (default 200; 0 = nunca)
+    NAVEGADOR_MEMORIA_MB      tope de memoria de chromedriver + Chrome (default 1500; 0 = no se mide)
+"""
+import os
+
+from comun.navegador import crear_driver_logueado
+from comun.trazas import tramo
+
+_MEDIR_CADA = 10  # leer /proc en cada pedido no vale la pena
+
+
+def sesion_viva(driver) -> bool:
+    try:
+        driver.current_url
+        return True
+    except Exception:
+        return False
+
+
+def _procesos_hijos():
+    hijos = {}
+    for entrada in os.listdir("/proc"):
+        if not entrada.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entrada}/stat", encoding="utf-8") as f:
+                # "pid (comm) estado ppid ...": comm puede tener espacios, se corta en el último ')'
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        hijos.setdefault(ppid, []).append(int(entrada))
+    return hijos
+
+
+def _rss_kb(pid):
+    try:
+        with open(f"/proc/{pid}/status", encoding="utf-8") as f:
+            for linea in f:
+                if linea.startswith("VmRSS:"):
+                    return int(linea.split()[1])
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+def memoria_mb(driver):
+    """Memoria residente de chromedriver y todos sus Chrome (suma de RSS, aproximada); None si no se puede medir."""
+    try:
+        raiz = driver.service.process.pid
+    except AttributeError:
+        return None
+    if not os.path.isdir("/proc"):
+        return None
+    hijos = _procesos_hijos()
+    total_kb, pendientes = 0, [raiz]
+    while pendientes:
+        pid = pendientes.pop()
+        total_kb += _rss_kb(pid)
+        pendientes.extend(hijos.get(pid, ()))
+    return total_kb / 1024
+
+
+class GestorDriver:
+    """Un Chrome logueado para `config` que se recicla y se levanta solo si muere."""
+
+    def __init__(self, config, reciclar_cada=None, memoria_max_mb=None):
+        self.config = config
+        self.reciclar_cada = int(os.getenv("NAVEGADOR_RECICLAR_CADA", "200")) if reciclar_cada is None else reciclar_cada
+        self.memoria_max_mb = float(os.getenv("NAVEGADOR_MEMORIA_MB", "1500")) if memoria_max_mb is None else memoria_max_mb
+        self.driver = None
+        self.pedidos = 0  # pedidos atendidos por el Chrome actual
+        self.reinicios = 0
+
+    def obtener(self):
+        """Driver vivo para el próximo pedido (recicla o reemplaza el actual si hace falta)."""
+        if self.driver is not None:
+            motivo = self._motivo_reinicio()
+            if motivo:
+                print(f"♻️ Reiniciando Chrome: {motivo}")
+                with tramo("reciclar_chrome", motivo=motivo, pedidos=self.pedidos):
+                    self.cerrar()
+                    self.reinicios += 1
+                    self._abrir()
+        if self.driver is None:
+            self._abrir()
+        self.pedidos += 1
+        return self.driver
+
+    def renovar(self):
+        """Chrome nuevo ya mismo (p. ej. antes de una ronda de reintentos)."""
+        self.cerrar()
+        self.reinicios += 1
+        return self.obtener()
+
+    def _abrir(self):
+        self.driver = crear_driver_logueado(self.config)
+        self.pedidos = 0
+
+    def _motivo_reinicio(self):
+        if not sesion_viva(self.driver):
+            return "la sesión no responde"
+        if self.reciclar_cada and self.pedidos >= self.reciclar_cada:
+            return f"reciclado tras {self.pedidos} pedidos"
+        if self.memoria_max_mb and self.pedidos and self.pedidos % _MEDIR_CADA == 0:
+            mb = memoria_mb(self.driver)
+            if mb and mb > self.memoria_max_mb:
+                return f"memoria alta ({mb:.0f} MB > {self.memoria_max_mb:.0f} MB)"
+        return None
+
+    def cerrar(self):
+        if self.driver is None:
+            return
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+        self.driver = None
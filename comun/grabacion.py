@@ -0,0 +1,210 @@
+"""Grabación de corridas reales para reproducirlas offline (`python -m comun.benchmark --grabacion DIR`).
+
+Con GRABACION_DIR definido, cada job deja en <GRABACION_DIR>/<job>-<fecha>/:
+  - paginas/<pedido>.html: el DOM del pedido tal como lo vio el bot, limpio;
+  - acciones.jsonl: lo que hizo con cada pedido, en orden (cancelar con tal
+    motivo, qué producto y cuánto, guardar);
+  - grabacion.json: job y fecha.
+
+La limpieza no intenta adivinar qué texto es un dato personal: enmascara todo
+salvo lo que los bots leen (filas de producto, botones, labels, opciones y
+combobox), borra scripts, estilos y recursos externos, y saca los atributos con
+valores (value, title, alt, aria-label, href/src absolutos). Al final pasa un
+filtro de emails y números largos por las dudas. Cookies, localStorage y
+credenciales no se graban nunca.
+"""
+import html
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from html.parser import HTMLParser
+
+from selenium.webdriver.common.by import By
+
+from comun.esperas import esperar
+
+_ENV_CARPETA = "GRABACION_ACTUAL"  # así los workers graban en la misma carpeta
+_lock = threading.Lock()
+
+_VACIOS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+_DESCARTAR = {"script", "style", "noscript", "iframe", "template", "object", "link", "base"}
+_ATRIBUTOS_FUERA = {"value", "title", "alt", "aria-label", "aria-description", "placeholder", "data-value", "srcset"}
+_ATRIBUTOS_URL = {"href", "src", "action", "poster", "data-src"}
+_ROLES_VISIBLES = {"combobox", "button", "option", "listbox", "tab"}
+_TAGS_VISIBLES = {"button", "label"}
+CLASE_FILA = "css-1es96wk"
+
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+(\.[\w-]+)+")
+_NUMERO_LARGO = re.compile(r"(?<![0-9A-Za-z])\+?\d[\d\s().-]{7,}\d(?![0-9A-Za-z])")
+
+
+def _enmascarar(texto):
+    return re.sub(r"[^\W\d_]", "x", re.sub(r"\d", "0", texto))
+
+
+def _conserva_texto(tag, atributos):
+    return (
+        tag in _TAGS_VISIBLES
+        or atributos.get("role") in _ROLES_VISIBLES
+        or CLASE_FILA in (atributos.get("class") or "").split()
+    )
+
+
+def _atributos(attrs):
+    partes = []
+    for nombre, valor in attrs:
+        if nombre in _ATRIBUTOS_FUERA or nombre.startswith("on"):
+            continue
+        if nombre in _ATRIBUTOS_URL:
+            # Solo anclas y rutas del mismo sitio: nada que salga a producción ni a terceros
+            url = valor or ""
+            if not url.startswith(("#", "/")) or url.startswith("//"):
+                continue
+        partes.append(nombre if valor is None else f'{nombre}="{html.escape(valor, quote=True)}"')
+    return "".join(" " + p for p in partes)
+
+
+class _Limpiador(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.salida = []
+        self.pila = []  # (tag, conserva_texto, descartado)
+
+    def _descartando(self):
+        return any(descartado for _, _, descartado in self.pila)
+
+    def _conserva(self):
+        return any(conserva for _, conserva, _ in self.pila)
+
+    def handle_decl(self, decl):
+        self.salida.append(f"<!{decl}>")
+
+    def handle_starttag(self, tag, attrs):
+        descartado = tag in _DESCARTAR or self._descartando()
+        if not descartado:
+            self.salida.append(f"<{tag}{_atributos(attrs)}>")
+        if tag not in _VACIOS:
+            self.pila.append((tag, _conserva_texto(tag, dict(attrs)), descartado))
+
+    def handle_startendtag(self, tag, attrs):
+        if tag not in _DESCARTAR and not self._descartando():
+            self.salida.append(f"<{tag}{_atributos(attrs)}/>")
+
+    def handle_endtag(self, tag):
+        for posicion in range(len(self.pila) - 1, -1, -1):
+            if self.pila[posicion][0] == tag:
+                break
+        else:
+            return  # cierre sin apertura: se ignora
+        while len(self.pila) > posicion:
+            cerrado, _, descartado = self.pila.pop()
+            if not descartado:
+                self.salida.append(f"</{cerrado}>")
+
+    def handle_data(self, data):
+        if self._descartando():
+            return
+        self.salida.append(data if self._conserva() else _enmascarar(data))
+
+    def handle_entityref(self, name):
+        if not self._descartando():
+            self.salida.append(f"&{name};" if self._conserva() else "x")
+
+    def handle_charref(self, name):
+        if not self._descartando():
+            self.salida.append(f"&#{name};" if self._conserva() else "x")
+
+
+def limpiar_html(fuente: str) -> str:
+    """HTML sin scripts, recursos externos ni texto fuera de lo que usan los bots (ver docstring del módulo)."""
+    limpiador = _Limpiador()
+    limpiador.feed(fuente)
+    limpiador.close()
+    while limpiador.pila:
+        limpiador.handle_endtag(limpiador.pila[-1][0])
+    limpio = "".join(limpiador.salida)
+    limpio = _EMAIL.sub("correo@ejemplo.com", limpio)
+    return _NUMERO_LARGO.sub(lambda m: re.sub(r"\d", "0", m.group(0)), limpio)
+
+
+def archivo_pagina(pedido_id) -> str:
+    return re.sub(r"[^\w-]", "_", str(pedido_id))[:100] + ".html"
+
+
+def iniciar(trabajo):
+    """Abre la carpeta de grabación de la corrida si GRABACION_DIR está definido; devuelve su ruta o None."""
+    base = os.getenv("GRABACION_DIR")
+    if not base:
+        return None
+    carpeta = os.path.abspath(os.path.join(base, f"{trabajo}-{datetime.now():%Y%m%d-%H%M%S}"))
+    os.makedirs(os.path.join(carpeta, "paginas"), exist_ok=True)
+    with open(os.path.join(carpeta, "grabacion.json"), "w", encoding="utf-8") as f:
+        json.dump({"trabajo": trabajo, "inicio": datetime.now().isoformat(timespec="seconds")}, f)
+    os.environ[_ENV_CARPETA] = carpeta
+    print(f"🎞️ Grabando la corrida en {carpeta}")
+    return carpeta
+
+
+def capturar_pedido(driver, pedido_id, timeout=10):
+    """Guarda el DOM limpio del pedido abierto (una vez que muestra el combobox o los productos)."""
+    carpeta = os.environ.get(_ENV_CARPETA)
+    if not carpeta or not pedido_id:
+        return
+    esperar(driver, lambda d: d.find_elements(By.CSS_SELECTOR, f"[role='combobox'], .{CLASE_FILA}"), timeout, "grabacion", obligatoria=False)
+    try:
+        limpio = limpiar_html(driver.page_source)
+        ruta = os.path.join(carpeta, "paginas", archivo_pagina(pedido_id))
+        tmp = f"{ruta}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(limpio)
+        os.replace(tmp, ruta)
+    except Exception as e:
+        print(f"⚠️ No se pudo grabar la página del pedido {pedido_id}: {e!r}")
+
+
+def accion(tipo, pedido_id, **datos):
+    """Agrega una acción a acciones.jsonl ('cancelar', 'producto', 'guardar')."""
+    carpeta = os.environ.get(_ENV_CARPETA)
+    if not carpeta:
+        return
+    linea = json.dumps({"tipo": tipo, "pedido_id": pedido_id, **datos}, ensure_ascii=False) + "\n"
+    with _lock, open(os.path.join(carpeta, "acciones.jsonl"), "a", encoding="utf-8") as f:
+        f.write(linea)
+
+
+def finalizar():
+    carpeta = os.environ.pop(_ENV_CARPETA, None)
+    if carpeta:
+        paginas = len(os.listdir(os.path.join(carpeta, "paginas")))
+        print(f"🎞️ Grabación terminada: {paginas} páginas de pedido en {carpeta}")
+    return carpeta
+
+
+def cargar(carpeta) -> dict:
+    """Grabación lista para reproducir: trabajo, pedidos en orden con sus productos, y páginas.
+
+    trabajos: [(pedido_id, [(producto, cantidad, estado), ...])]
+    """
+    with open(os.path.join(carpeta, "grabacion.json"), encoding="utf-8") as f:
+        manifiesto = json.load(f)
+    trabajos = {}
+    ruta_acciones = os.path.join(carpeta, "acciones.jsonl")
+    if os.path.exists(ruta_acciones):
+        with open(ruta_acciones, encoding="utf-8") as f:
+            for linea in f:
+                if not linea.strip():
+                    continue
+                a = json.loads(linea)
+                productos = trabajos.setdefault(a["pedido_id"], [])
+                if a["tipo"] == "producto":
+                    productos.append((a["producto"], a.get("cantidad", 1), a.get("estado", "")))
+
+    paginas = {}
+    for pedido_id in trabajos:
+        ruta = os.path.join(carpeta, "paginas", archivo_pagina(pedido_id))
+        if os.path.exists(ruta):
+            with open(ruta, encoding="utf-8") as f:
+                paginas[pedido_id] = f.read()
+    return {"trabajo": manifiesto["trabajo"], "trabajos": list(trabajos.items()), "paginas": paginas}
@@ -0,0 +1,106 @@
+"""Runner unificado: corre varios jobs (HomeDelivery, Prevención, Reclamos, Desvíos) en un solo proceso.
+
+Los jobs comparten el cliente de Sheets, el Chrome logueado y el notificador de
+Slack a través de `comun.contexto`, así Chrome/chromedriver, gspread y el login
+al backoffice se pagan una sola vez en lugar de una por workflow.
+
+Cada script sigue siendo el plugin de su job (su `main()`), y sigue pudiendo
+correrse solo. El entorno propio de cada job (el .env de su workflow) se da con:
+  - un archivo `.env.<job>` en la raíz del repo (p. ej. `.env.reclamos`), y/o
+  - variables con prefijo `<JOB>__` (p. ej. `RECLAMOS__SHEET_ID=...`),
+que pisan a las globales solo mientras corre ese job.
+
+Uso:
+    python -m comun.jobs                      # todos, en el orden de JOBS
+    python -m comun.jobs reclamos desvios
+"""
+import argparse
+import importlib.util
+import os
+import sys
+import time
+
+from dotenv import dotenv_values
+
+from comun import contexto
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# nombre del job -> script (relativo a la raíz del repo)
+JOBS = {
+    "homedelivery": os.path.join("HomeDelivery", "HomeDELIVERYID.py"),
+    "prevencion": os.path.join("Prevención", "Prevencion.py"),
+    "reclamos": os.path.join("ReclamosAI", "Reclamos1.3.py"),
+    "desvios": os.path.join("Desvios-operativos", "Desvios.py"),
+}
+
+
+def entorno_del_job(nombre) -> dict:
+    """Variables propias del job: `.env.<job>` y después las `<JOB>__VAR` del entorno."""
+    variables = {}
+    ruta = os.path.join(RAIZ, f".env.{nombre}")
+    if os.path.exists(ruta):
+        variables.update({k: v for k, v in dotenv_values(ruta).items() if v is not None})
+    prefijo = f"{nombre.upper()}__"
+    variables.update({k[len(prefijo):]: v for k, v in os.environ.items() if k.startswith(prefijo)})
+    return variables
+
+
+def cargar_job(nombre):
+    """Importa el script del job (lee su configuración del entorno al importarse)."""
+    spec = importlib.util.spec_from_file_location(f"job_{nombre}", os.path.join(RAIZ, JOBS[nombre]))
+    modulo = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = modulo
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def ejecutar_job(nombre) -> bool:
+    """Corre un job con su entorno superpuesto; True si terminó bien."""
+    original = dict(os.environ)
+    os.environ.update(entorno_del_job(nombre))
+    inicio = time.perf_counter()
+    print(f"\n▶️ Job {nombre}")
+    try:
+        cargar_job(nombre).main()
+        ok = True
+    except SystemExit as e:
+        # Los scripts terminan con sys.exit(); también salen así si falta una variable requerida
+        ok = e.code in (None, 0)
+    except Exception as e:
+        print(f"❌ El job {nombre} falló: {e!r}")
+        ok = False
+    finally:
+        os.environ.clear()
+        os.environ.update(original)
+    print(f"⏱️ Job {nombre}: {time.perf_counter() - inicio:.1f} s ({'ok' if ok else 'con error'})")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Correr varios jobs del backoffice en un solo proceso")
+    parser.add_argument("jobs", nargs="*", metavar="JOB", help=f"jobs a correr, en orden ({', '.join(JOBS)}); por defecto todos")
+    args = parser.parse_args()
+
+    nombres = args.jobs or list(JOBS)
+    desconocidos = [n for n in nombres if n not in JOBS]
+    if desconocidos:
+        parser.error(f"jobs desconocidos: {', '.join(desconocidos)}")
+
+    compartido = contexto.Contexto(compartido=True)
+    contexto.instalar(compartido)
+    inicio = time.perf_counter()
+    resultados = {}
+    try:
+        for nombre in nombres:
+            resultados[nombre] = ejecutar_job(nombre)
+    finally:
+        compartido.cerrar()
+
+    print(f"\n🏁 {len(nombres)} jobs en {time.perf_counter() - inicio:.1f} s: "
+          + ", ".join(f"{n} {'✅' if ok else '❌'}" for n, ok in resultados.items()))
+    sys.exit(0 if all(resultados.values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
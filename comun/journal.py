@@ -0,0 +1,172 @@
+"""Journal SQLite de lo ya procesado, para que las re-corridas no repitan pedidos.
+
+Cada guardado confirmado se escribe en su propia transacción, con clave
+(trabajo, pedido_id, producto). Los scripts lo consultan antes de abrir el
+navegador. Además cada corrida guarda su lista de trabajo: con
+JOURNAL_REANUDAR=true se retoma exactamente la lista de la última corrida que
+no llegó a terminar (por ejemplo, un job cancelado a mitad), salteando lo que
+ya quedó confirmado.
+
+También lleva el índice de pedidos del día entre jobs (`deduplicar`): el mismo
+id cargado dos veces en una pestaña, o en Order_ids y en Cancelar, lo procesa
+solo el primer job que lo toma; los demás lo registran como duplicado sin abrir
+el navegador. Los workflows de HomeDelivery y Prevención (y el unificado) apuntan
+JOURNAL_PATH a un cache de Actions común (nilus-journal-*) y corren de a uno.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import date
+
+from comun.sesion import CACHE_DIR_DEFAULT
+
+RUTA_DEFAULT = os.path.join(CACHE_DIR_DEFAULT, "journal.sqlite")
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS procesados (
+    trabajo   TEXT NOT NULL,
+    pedido_id TEXT NOT NULL,
+    producto  TEXT NOT NULL DEFAULT '',
+    estado    TEXT NOT NULL,
+    corrida   INTEGER,
+    ts        REAL NOT NULL,
+    PRIMARY KEY (trabajo, pedido_id, producto)
+);
+CREATE TABLE IF NOT EXISTS duenos_pedido (
+    fecha     TEXT NOT NULL,
+    pedido_id TEXT NOT NULL,
+    trabajo   TEXT NOT NULL,
+    ts        REAL NOT NULL,
+    PRIMARY KEY (fecha, pedido_id)
+);
+CREATE TABLE IF NOT EXISTS corridas (
+    id      INTEGER PRIMARY KEY AUTOINCREMENT,
+    trabajo TEXT NOT NULL,
+    inicio  REAL NOT NULL,
+    fin     REAL,
+    items   TEXT NOT NULL
+);
+"""
+
+
+class Journal:
+    def __init__(self, trabajo, ruta=None, reanudar=None, retencion_dias=None):
+        self.trabajo = trabajo
+        self.ruta = ruta or os.getenv("JOURNAL_PATH") or RUTA_DEFAULT
+        self.reanudar = (os.getenv("JOURNAL_REANUDAR", "false").strip().lower() == "true") if reanudar is None else reanudar
+        dias = float(retencion_dias if retencion_dias is not None else os.getenv("JOURNAL_RETENCION_DIAS", "30"))
+        os.makedirs(os.path.dirname(self.ruta) or ".", exist_ok=True)
+        # timeout: con workers o varios jobs a la vez el archivo puede estar bloqueado un momento.
+        # Los hilos por país (comun/paises.py) comparten la conexión: ya_procesado y registrar van con lock
+        self.conn = sqlite3.connect(self.ruta, timeout=30, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_ESQUEMA)
+        with self.conn:
+            limite = time.time() - dias * 86400
+            self.conn.execute("DELETE FROM procesados WHERE ts < ?", (limite,))
+            self.conn.execute("DELETE FROM corridas WHERE inicio < ?", (limite,))
+            self.conn.execute("DELETE FROM duenos_pedido WHERE ts < ?", (limite,))
+        self.corrida = None
+        self.salteados = 0
+
+    def iniciar_corrida(self, items):
+        """Registra la corrida y devuelve la lista a procesar.
+
+        En modo reanudar devuelve la lista de la última corrida sin terminar de
+        este trabajo (si la hay) en lugar de `items`.
+        """
+        if self.reanudar:
+            fila = self.conn.execute(
+                "SELECT id, items FROM corridas WHERE trabajo = ? AND fin IS NULL ORDER BY id DESC LIMIT 1",
+                (self.trabajo,),
+            ).fetchone()
+            if fila:
+                self.corrida = fila[0]
+                items = json.loads(fila[1])
+                print(f"⏯️ Reanudando corrida {self.corrida} de {self.trabajo} ({len(items)} ítems)")
+                return items
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO corridas (trabajo, inicio, items) VALUES (?, ?, ?)",
+                (self.trabajo, time.time(), json.dumps(items, ensure_ascii=False)),
+            )
+        self.corrida = cursor.lastrowid
+        return items
+
+    def ya_procesado(self, pedido_id, producto="") -> bool:
+        with self._lock:
+            fila = self.conn.execute(
+                "SELECT 1 FROM procesados WHERE trabajo = ? AND pedido_id = ? AND producto = ?",
+                (self.trabajo, str(pedido_id), producto or ""),
+            ).fetchone()
+            if fila:
+                self.salteados += 1
+        return fila is not None
+
+    def filtrar_pedidos(self, trabajos):
+        """Saca de [(indice, pedido_id)] los pedidos ya confirmados, sin abrir el navegador."""
+        pendientes = []
+        for indice, pedido_id in trabajos:
+            if pedido_id and self.ya_procesado(pedido_id):
+                print(f"⏭️ Pedido {pedido_id} ya procesado en una corrida anterior. Saltando...")
+                continue
+            pendientes.append((indice, pedido_id))
+        return pendientes
+
+    def deduplicar(self, trabajos, fecha=None):
+        """Saca de [(indice, pedido_id)] los repetidos en la lista y los que otro job ya tomó hoy.
+
+        El primer job que registra un id en el día es su dueño; re-corridas del
+        mismo job lo siguen procesando. Los ids vacíos pasan tal cual.
+        """
+        fecha = (fecha or date.today()).isoformat()
+        pendientes, vistos = [], set()
+        repetidos, de_otros = 0, {}
+        with self.conn:
+            for indice, pedido_id in trabajos:
+                if not pedido_id:
+                    pendientes.append((indice, pedido_id))
+                    continue
+                if pedido_id in vistos:
+                    repetidos += 1
+                    print(f"🔁 Pedido {pedido_id} repetido en la hoja, se omite")
+                    continue
+                vistos.add(pedido_id)
+                self.conn.execute(
+                    "INSERT OR IGNORE INTO duenos_pedido (fecha, pedido_id, trabajo, ts) VALUES (?, ?, ?, ?)",
+                    (fecha, pedido_id, self.trabajo, time.time()),
+                )
+                dueno = self.conn.execute(
+                    "SELECT trabajo FROM duenos_pedido WHERE fecha = ? AND pedido_id = ?", (fecha, pedido_id)
+                ).fetchone()[0]
+                if dueno != self.trabajo:
+                    de_otros[dueno] = de_otros.get(dueno, 0) + 1
+                    print(f"🔁 Pedido {pedido_id} duplicado: hoy lo procesa {dueno}, se omite")
+                    continue
+                pendientes.append((indice, pedido_id))
+        if repetidos or de_otros:
+            otros = ", ".join(f"{n} de {dueno}" for dueno, n in de_otros.items())
+            print(f"🧮 Duplicados omitidos: {repetidos} repetidos en la hoja" + (f", {otros}" if otros else ""))
+        return pendientes
+
+    def registrar(self, pedido_id, producto="", estado="ok"):
+        """Llamar solo después de un guardado confirmado."""
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO procesados (trabajo, pedido_id, producto, estado, corrida, ts) VALUES (?, ?, ?, ?, ?, ?)",
+                (self.trabajo, str(pedido_id), producto or "", estado, self.corrida, time.time()),
+            )
+
+    def terminar_corrida(self):
+        if self.corrida is None:
+            return
+        with self.conn:
+            self.conn.execute("UPDATE corridas SET fin = ? WHERE id = ?", (time.time(), self.corrida))
+        if self.salteados:
+            print(f"📒 Journal: {self.salteados} ítems ya procesados en corridas anteriores, salteados")
+
+    def cerrar(self):
+        self.conn.close()
@@ -0,0 +1,535 @@
+"""Backoffice local de mentira para probar y medir sin tocar backoffice.nilus.co.
+
+Sirve las mismas piezas de las que dependen los scripts:
+  - /<locale>/login con #email, #password y el botón INGRESAR (deja la cookie de sesión);
+  - /<locale>/orders/<id> con el combobox de estado (`role='combobox'`, id 'email'
+    o 'status'), la opción "Cancelado", el diálogo "Cambiar el estado del pedido"
+    con `reason_of_canceled` y 'Guardar cambios', y las filas de producto
+    `css-1es96wk` con `DoNotDisturbOnIcon`, "Selecciona un motivo", `#quantity`
+    y 'Solicitar';
+  - el endpoint de cambio de estado del camino rápido (comun/api_backoffice.py):
+
+    PATCH /api/orders/<id>/status   {"status": "canceled", "reason_of_canceled": "..."}
+
+  - las consultas del prechequeo de estados: GET /api/orders/<id> -> {"id", "status"}
+    y GET /api/orders?ids=a,b,c -> {"orders": [...]} (los que no existen no vuelven);
+
+  - POST /slack, que hace de Incoming Webhook;
+  - /static/..., el "peso" de la SPA real (miniaturas, fuentes, analítica) si se pide.
+
+Con `paginas` (id -> HTML grabado por comun/grabacion.py) sirve esas páginas
+reales en lugar de las sintéticas y les agrega el mismo comportamiento.
+
+Pide la cookie `session=<token>` como el backoffice real pide la suya, responde
+404 si el pedido no existe y 409 si ya estaba cancelado. Con ConfigMock se
+agrega latencia (servidor y render en el navegador) y fallas al azar (500).
+
+Uso:
+    python -m comun.mock_backoffice --puerto 8765 --pedidos 1000 --latencia-ms 120 --tasa-error 0.05
+"""
+import argparse
+import html
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+TOKEN_SESION = "mock-session"
+EMAIL_MOCK = "bot@mock.local"
+PASSWORD_MOCK = "mock"
+
+_RUTA_ESTADO = re.compile(r"^/api/orders/([^/]+)/status$")
+_RUTA_PRODUCTOS = re.compile(r"^/api/orders/([^/]+)/productos$")
+_RUTA_API_PEDIDO = re.compile(r"^/api/orders/([^/]+)$")
+_RUTA_LOGIN = re.compile(r"^/([a-z]{2}-[A-Z]{2})/login$")
+_RUTA_PEDIDO = re.compile(r"^/([a-z]{2}-[A-Z]{2})/orders/([^/]+)$")
+_RUTA_INICIO = re.compile(r"^/([a-z]{2}-[A-Z]{2})/?$")
+
+ESTADOS = {"pending": "Pendiente", "delivered": "Entregado", "canceled": "Cancelado"}
+MOTIVOS_CANCELACION = ["Cliente prófugo", "Pago anticipado", "Dirección incorrecta", "Pedido duplicado"]
+MOTIVOS_PRODUCTO = [
+    "Support - DTC - Delivery Point - Missing Product",
+    "Support - DTC - Delivery Point - Product in bad condition",
+    "Support - DTC - Operations - Missing Product",
+]
+CATALOGO = [
+    "Aceite de girasol 1.5 L", "Arroz largo fino 1 kg", "Azúcar común 1 kg", "Fideos spaghetti 500 g",
+    "Harina 000 1 kg", "Leche entera 1 L", "Yerba mate 1 kg", "Café molido 250 g", "Atún al natural 170 g",
+    "Lentejas secas 500 g", "Puré de tomate 520 g", "Galletitas de agua 300 g", "Detergente 750 ml",
+    "Jabón en polvo 800 g", "Papel higiénico x4", "Dulce de leche 400 g", "Mermelada de durazno 454 g",
+    "Arvejas en lata 300 g", "Polenta instantánea 500 g", "Sal fina 500 g",
+]
+
+
+@dataclass
+class ConfigMock:
+    latencia_ms: int = 0  # demora de cada respuesta del servidor
+    jitter_ms: int = 0  # +/- al azar sobre la latencia
+    render_ms: int = 0  # demora del "front" antes de mostrar el pedido (ejercita las esperas)
+    tasa_error: float = 0.0  # probabilidad de 500 al abrir un pedido o al guardar
+    combobox: str = "email"  # id del combobox de estado: "email", "status" o "alternado"
+    peso_kb: int = 0  # miniatura por producto + fuente + analítica de este tamaño cada una (0 = sin recursos)
+    semilla: int = None
+
+
+class EstadoMock:
+    """Pedidos del mock (id -> estado), sus productos y registro de lo que llegó."""
+
+    def __init__(self, pedidos=None, productos=None, config=None, paginas=None):
+        self.pedidos = dict(pedidos or {})
+        self.productos = dict(productos or {})  # id -> [(nombre, cantidad)]
+        self.paginas = dict(paginas or {})  # id -> HTML grabado
+        self.config = config or ConfigMock()
+        self.llamadas = []
+        self.solicitudes = []  # (pedido_id, producto, motivo, cantidad) guardados
+        self.slack = []
+        self.errores_inyectados = 0
+        self.lock = threading.Lock()
+        self._azar = random.Random(self.config.semilla)
+
+    def demorar(self):
+        c = self.config
+        if c.latencia_ms or c.jitter_ms:
+            with self.lock:
+                extra = self._azar.uniform(-c.jitter_ms, c.jitter_ms)
+            time.sleep(max(c.latencia_ms + extra, 0) / 1000)
+
+    def falla(self) -> bool:
+        with self.lock:
+            if self._azar.random() < self.config.tasa_error:
+                self.errores_inyectados += 1
+                return True
+        return False
+
+    def id_combobox(self, pedido_id) -> str:
+        if self.config.combobox == "alternado":
+            return "email" if int(pedido_id[-1], 16) % 2 else "status"
+        return self.config.combobox
+
+
+def generar_pedidos(cantidad, productos_por_pedido=3, semilla=0):
+    """(pedidos, productos) con `cantidad` pedidos 'pending' de ids de 32 hex, como los del backoffice."""
+    azar = random.Random(semilla)
+    pedidos, productos = {}, {}
+    for n in range(1, cantidad + 1):
+        pedido_id = f"{n:032x}"
+        pedidos[pedido_id] = "pending"
+        nombres = azar.sample(CATALOGO, min(productos_por_pedido, len(CATALOGO)))
+        productos[pedido_id] = [(nombre, azar.randint(1, 6)) for nombre in nombres]
+    return pedidos, productos
+
+
+_ESTILO = """
+body { font-family: sans-serif; margin: 24px; }
+.MuiFormControl-root { display: inline-block; margin: 8px 0; }
+[role=combobox], [role=button] { display: inline-block; min-width: 260px; padding: 6px; border: 1px solid #999; cursor: pointer; }
+.css-1es96wk { display: flex; gap: 16px; align-items: center; padding: 8px; border-bottom: 1px solid #ddd; }
+.css-1es96wk svg { width: 24px; height: 24px; cursor: pointer; }
+ul[role=listbox] { position: absolute; z-index: 20; margin: 0; padding: 0; list-style: none; background: #fff; border: 1px solid #999; }
+li[role=option] { padding: 6px 12px; cursor: pointer; }
+div[role=dialog] { position: fixed; top: 15%; left: 30%; z-index: 10; width: 520px; padding: 16px; background: #fff; border: 1px solid #333; }
+"""
+
+_JS_PEDIDO = """
+const P = JSON.parse(document.getElementById('datos').textContent);
+const pendientes = [];
+
+function el(tag, attrs, texto) {
+  const e = document.createElement(tag);
+  for (const [k, v] of Object.entries(attrs || {})) e.setAttribute(k, v);
+  if (texto !== undefined) e.textContent = texto;
+  return e;
+}
+function cerrarListbox() { document.querySelectorAll('ul[role=listbox]').forEach(u => u.remove()); }
+function abrirListbox(ancla, opciones, alElegir) {
+  cerrarListbox();
+  const r = ancla.getBoundingClientRect();
+  const ul = el('ul', {role: 'listbox'});
+  ul.style.top = (r.bottom + window.scrollY) + 'px';
+  ul.style.left = (r.left + window.scrollX) + 'px';
+  for (const texto of opciones) {
+    const li = el('li', {role: 'option'}, texto);
+    li.addEventListener('click', () => { ul.remove(); alElegir(texto); });
+    ul.appendChild(li);
+  }
+  document.body.appendChild(ul);
+}
+function selector(etiqueta, attrs) {
+  const control = el('div', {class: 'MuiFormControl-root'});
+  control.appendChild(el('label', {}, etiqueta));
+  control.appendChild(el('br'));
+  const combo = el('div', Object.assign({tabindex: '0'}, attrs), '—');
+  control.appendChild(combo);
+  return [control, combo];
+}
+async function enviar(metodo, url, cuerpo) {
+  const resp = await fetch(url, {method: metodo, headers: {'Content-Type': 'application/json'}, body: JSON.stringify(cuerpo)});
+  return resp.ok;
+}
+
+function dialogoEstado(nuevo, comboEstado) {
+  const d = el('div', {role: 'dialog'});
+  d.appendChild(el('h2', {}, 'Cambiar el estado del pedido'));
+  d.appendChild(el('p', {}, 'Nuevo estado: ' + nuevo));
+  const [control, motivo] = selector('Motivo', {role: 'combobox', id: 'reason_of_canceled'});
+  motivo.addEventListener('click', () => abrirListbox(motivo, P.motivos_cancelacion, t => { motivo.textContent = t; }));
+  d.appendChild(control);
+  const aviso = el('p', {class: 'aviso'});
+  d.appendChild(aviso);
+  const guardar = el('button', {type: 'button'}, 'Guardar cambios');
+  guardar.addEventListener('click', async () => {
+    const razon = motivo.textContent === '—' ? null : motivo.textContent;
+    if (await enviar('PATCH', '/api/orders/' + P.id + '/status', {status: P.codigos[nuevo], reason_of_canceled: razon})) {
+      comboEstado.textContent = nuevo;
+      d.remove();
+    } else {
+      aviso.textContent = 'No se pudo guardar el cambio de estado';
+    }
+  });
+  d.appendChild(guardar);
+  document.body.appendChild(d);
+}
+
+function dialogoProducto(nombre, cantidad, fila) {
+  const d = el('div', {role: 'dialog'});
+  d.appendChild(el('h3', {}, nombre));
+  const [control, motivo] = selector('Selecciona un motivo', {role: 'button'});
+  motivo.addEventListener('click', () => abrirListbox(motivo, P.motivos_producto, t => { motivo.textContent = t; }));
+  d.appendChild(control);
+  d.appendChild(el('br'));
+  d.appendChild(el('input', {id: 'quantity', type: 'number', min: '1', max: String(cantidad), value: String(cantidad)}));
+  const solicitar = el('button', {type: 'button'}, 'Solicitar');
+  solicitar.addEventListener('click', () => {
+    const n = parseInt(document.getElementById('quantity').value, 10);
+    if (motivo.textContent === '—' || !(n > 0 && n <= cantidad)) return;
+    pendientes.push({producto: nombre, motivo: motivo.textContent, cantidad: n});
+    const marca = fila.querySelector('.pendiente');
+    if (marca) marca.textContent = '-' + n;
+    d.remove();
+  });
+  d.appendChild(solicitar);
+  document.body.appendChild(d);
+}
+
+// Pedido sintético: arma el DOM con la forma del backoffice
+function render() {
+  const app = document.getElementById('app');
+  const [control, estado] = selector('Estado', {role: 'combobox', id: P.combobox});
+  estado.textContent = P.estado;
+  app.appendChild(control);
+
+  P.productos.forEach(([nombre, cantidad], i) => {
+    const fila = el('div', {class: 'css-1es96wk'});
+    fila.appendChild(el('span', {}, nombre));
+    if (P.miniaturas) fila.appendChild(el('img', {src: '/static/miniaturas/' + P.id + '-' + i + '.png', width: '48', height: '48'}));
+    fila.appendChild(el('b', {}, 'x' + cantidad));
+    fila.appendChild(el('i', {class: 'pendiente'}));
+    const svg = document.createElementNS('http://www.w3.org/2000/svg', 'svg');
+    svg.setAttribute('data-testid', 'DoNotDisturbOnIcon');
+    svg.setAttribute('viewBox', '0 0 24 24');
+    svg.innerHTML = '<circle cx="12" cy="12" r="10" fill="#c62828"></circle><rect x="6" y="11" width="12" height="2" fill="#fff"></rect>';
+    fila.appendChild(svg);
+    app.appendChild(fila);
+  });
+  app.appendChild(el('button', {type: 'button', id: 'guardar-pedido'}, 'Guardar cambios'));
+}
+
+// Comportamiento sobre el DOM, sea el sintético o el de una página grabada
+function enlazar() {
+  const estado = document.querySelector('div[role=combobox]#email, div[role=combobox]#status');
+  if (estado) {
+    estado.addEventListener('click', () => {
+      const opciones = Object.keys(P.codigos).filter(t => t !== estado.textContent.trim());
+      abrirListbox(estado, opciones, t => dialogoEstado(t, estado));
+    });
+  }
+
+  const cantidades = new Map(P.productos);
+  document.querySelectorAll('.css-1es96wk').forEach(fila => {
+    const svg = fila.querySelector("svg[data-testid='DoNotDisturbOnIcon']");
+    const span = fila.querySelector('span');
+    const nombre = span ? span.innerText.trim() : '';
+    if (svg) svg.addEventListener('click', () => dialogoProducto(nombre, cantidades.get(nombre) || 99, fila));
+  });
+
+  let guardar = Array.from(document.querySelectorAll('button'))
+    .find(b => b.textContent.trim() === 'Guardar cambios' && !b.closest('[role=dialog]'));
+  if (!guardar) {
+    guardar = el('button', {type: 'button'}, 'Guardar cambios');
+    document.body.appendChild(guardar);
+  }
+  guardar.addEventListener('click', async ev => {
+    ev.preventDefault();  // en las páginas grabadas el botón puede estar dentro de un <form>
+    if (pendientes.length && await enviar('POST', '/api/orders/' + P.id + '/productos', {cambios: pendientes})) {
+      pendientes.length = 0;
+    }
+  });
+}
+
+setTimeout(() => { if (!P.grabada) render(); enlazar(); }, P.render_ms);
+"""
+
+
+def _pagina(titulo, cuerpo, cabecera=""):
+    return (f"<!doctype html><html><head><meta charset='utf-8'><title>{html.escape(titulo)}</title>"
+            f"<style>{_ESTILO}</style>{cabecera}</head><body>{cuerpo}</body></html>")
+
+
+def _pagina_login(aviso=""):
+    return _pagina("Ingresar", (
+        "<h1>Backoffice (mock)</h1>"
+        "<form method='post'>"
+        "<input id='email' name='email' type='email' placeholder='Email'><br>"
+        "<input id='password' name='password' type='password' placeholder='Contraseña'><br>"
+        "<button type='submit'>INGRESAR</button>"
+        f"<p>{html.escape(aviso)}</p></form>"
+    ))
+
+
+def _pagina_pedido(estado: EstadoMock, pedido_id):
+    grabada = estado.paginas.get(pedido_id)
+    datos = {
+        "id": pedido_id,
+        "grabada": grabada is not None,
+        "estado": ESTADOS.get(estado.pedidos[pedido_id], estado.pedidos[pedido_id]),
+        "codigos": {texto: codigo for codigo, texto in ESTADOS.items()},
+        "combobox": estado.id_combobox(pedido_id),
+        "productos": estado.productos.get(pedido_id, []),
+        "motivos_cancelacion": MOTIVOS_CANCELACION,
+        "motivos_producto": MOTIVOS_PRODUCTO,
+        "render_ms": estado.config.render_ms,
+        "miniaturas": estado.config.peso_kb > 0,
+    }
+    # "</" escapado para que un nombre no pueda cerrar el <script> de datos
+    datos_json = json.dumps(datos, ensure_ascii=False).replace("</", "<\\/")
+    scripts = f"<script type='application/json' id='datos'>{datos_json}</script><script>{_JS_PEDIDO}</script>"
+    if grabada is not None:
+        # La página grabada ya no tiene scripts (comun/grabacion.py los saca): se le agrega el comportamiento
+        cierre = grabada.lower().rfind("</body>")
+        return grabada + scripts if cierre < 0 else grabada[:cierre] + scripts + grabada[cierre:]
+    cabecera = ""
+    if estado.config.peso_kb:
+        # Lo que trae la SPA real y los bots no usan (el modo liviano del navegador lo bloquea)
+        cabecera = "<link rel='stylesheet' href='/static/fuentes.css'><script async src='/static/googletagmanager.com/gtm.js'></script>"
+    return _pagina(f"Pedido {pedido_id}", (
+        f"<h1>Pedido {html.escape(pedido_id)}</h1><div id='app'></div>{scripts}"
+    ), cabecera)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, para que el cliente reutilice sus conexiones
+    estado: EstadoMock = None
+
+    def log_message(self, *args):
+        pass
+
+    def _enviar(self, codigo, datos, tipo, encabezados=()):
+        self.send_response(codigo)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(datos)))
+        for nombre, valor in encabezados:
+            self.send_header(nombre, valor)
+        self.end_headers()
+        self.wfile.write(datos)
+
+    def _responder(self, codigo, cuerpo):
+        self._enviar(codigo, json.dumps(cuerpo).encode(), "application/json")
+
+    def _html(self, codigo, texto, encabezados=()):
+        self._enviar(codigo, texto.encode(), "text/html; charset=utf-8", encabezados)
+
+    def _redirigir(self, destino, encabezados=()):
+        self._enviar(303, b"", "text/plain", (("Location", destino), *encabezados))
+
+    def _autenticado(self):
+        return f"session={TOKEN_SESION}" in (self.headers.get("Cookie") or "")
+
+    def _leer_cuerpo(self):
+        largo = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(largo) if largo else b""
+
+    def do_GET(self):
+        self.estado.demorar()
+        ruta = urlsplit(self.path).path
+        match = _RUTA_INICIO.match(ruta)
+        if ruta == "/" or match:
+            if not self._autenticado():
+                return self._redirigir(f"/{match.group(1) if match else 'es-AR'}/login")
+            return self._html(200, _pagina("Inicio", "<h1>Backoffice (mock)</h1><p>Sesión iniciada.</p>"))
+
+        match = _RUTA_LOGIN.match(ruta)
+        if match:
+            return self._html(200, _pagina_login())
+
+        if ruta.startswith("/static/"):
+            return self._estatico(ruta)
+
+        if ruta == "/api/orders" or _RUTA_API_PEDIDO.match(ruta):
+            return self._consultar_estados(ruta)
+
+        match = _RUTA_PEDIDO.match(ruta)
+        if match:
+            locale, pedido_id = match.groups()
+            if not self._autenticado():
+                return self._redirigir(f"/{locale}/login")
+            if pedido_id not in self.estado.pedidos:
+                return self._html(404, _pagina("No encontrado", "<h1>Pedido no encontrado</h1>"))
+            if self.estado.falla():
+                return self._html(500, _pagina("Error", "<h1>Error interno</h1>"))
+            return self._html(200, _pagina_pedido(self.estado, pedido_id))
+
+        self._responder(404, {"error": "not_found"})
+
+    def _consultar_estados(self, ruta):
+        if not self._autenticado():
+            return self._responder(401, {"error": "unauthorized"})
+        match = _RUTA_API_PEDIDO.match(ruta)
+        with self.estado.lock:
+            if match:
+                estado = self.estado.pedidos.get(match.group(1))
+                if estado is None:
+                    return self._responder(404, {"error": "order_not_found"})
+                return self._responder(200, {"id": match.group(1), "status": estado})
+            ids = [i for i in (parse_qs(urlsplit(self.path).query).get("ids") or [""])[0].split(",") if i]
+            pedidos = [{"id": i, "status": self.estado.pedidos[i]} for i in ids if i in self.estado.pedidos]
+        return self._responder(200, {"orders": pedidos})
+
+    def _estatico(self, ruta):
+        if ruta.endswith(".css"):
+            datos = b"@font-face{font-family:Mock;src:url(/static/fuente.woff2)}body{font-family:Mock,sans-serif}"
+            return self._enviar(200, datos, "text/css", (("Cache-Control", "max-age=3600"),))
+        tipo = {".png": "image/png", ".woff2": "font/woff2", ".js": "application/javascript"}.get(ruta[ruta.rfind("."):], "application/octet-stream")
+        # Cada miniatura es de otro producto (sin cache); fuente y analítica sí se cachean
+        cache = "no-store" if "/miniaturas/" in ruta else "max-age=3600"
+        self._enviar(200, b"/" * (self.estado.config.peso_kb * 1024), tipo, (("Cache-Control", cache),))
+
+    def _login(self, locale):
+        datos = parse_qs(self._leer_cuerpo().decode())
+        email = (datos.get("email") or [""])[0]
+        password = (datos.get("password") or [""])[0]
+        if (email, password) != (EMAIL_MOCK, PASSWORD_MOCK):
+            return self._html(200, _pagina_login("Usuario o contraseña incorrectos"))
+        return self._redirigir(f"/{locale}", (("Set-Cookie", f"session={TOKEN_SESION}; Path=/"),))
+
+    def _guardar_productos(self, pedido_id):
+        try:
+            cambios = json.loads(self._leer_cuerpo() or b"{}").get("cambios", [])
+        except ValueError:
+            return self._responder(400, {"error": "bad_json"})
+        falla = self.estado.falla()
+        with self.estado.lock:
+            self.estado.llamadas.append(("POST", pedido_id, cambios))
+            if pedido_id not in self.estado.pedidos:
+                return self._responder(404, {"error": "order_not_found"})
+            if falla:
+                return self._responder(500, {"error": "internal"})
+            for cambio in cambios:
+                self.estado.solicitudes.append((pedido_id, cambio.get("producto"), cambio.get("motivo"), cambio.get("cantidad")))
+        return self._responder(200, {"id": pedido_id, "cambios": len(cambios)})
+
+    def _escritura(self):
+        self.estado.demorar()
+        ruta = urlsplit(self.path).path
+
+        match = _RUTA_LOGIN.match(ruta)
+        if match and self.command == "POST":
+            return self._login(match.group(1))
+
+        if ruta == "/slack":
+            with self.estado.lock:
+                self.estado.slack.append(self._leer_cuerpo().decode(errors="replace"))
+            return self._enviar(200, b"ok", "text/plain")
+
+        match = _RUTA_PRODUCTOS.match(ruta)
+        if match and self.command == "POST":
+            if not self._autenticado():
+                return self._responder(401, {"error": "unauthorized"})
+            return self._guardar_productos(match.group(1))
+
+        match = _RUTA_ESTADO.match(ruta)
+        if not match:
+            return self._responder(404, {"error": "not_found"})
+        if not self._autenticado():
+            return self._responder(401, {"error": "unauthorized"})
+        return self._cambiar_estado(match.group(1))
+
+    def _cambiar_estado(self, pedido_id):
+        try:
+            cuerpo = json.loads(self._leer_cuerpo() or b"{}")
+        except ValueError:
+            return self._responder(400, {"error": "bad_json"})
+
+        falla = self.estado.falla()
+        with self.estado.lock:
+            self.estado.llamadas.append((self.command, pedido_id, cuerpo))
+            actual = self.estado.pedidos.get(pedido_id)
+            if actual is None:
+                return self._responder(404, {"error": "order_not_found"})
+            if actual == "canceled":
+                return self._responder(409, {"error": "already_canceled"})
+            if falla:
+                return self._responder(500, {"error": "internal"})
+            self.estado.pedidos[pedido_id] = cuerpo.get("status", actual)
+        return self._responder(200, {"id": pedido_id, "status": self.estado.pedidos[pedido_id]})
+
+    do_PATCH = _escritura
+    do_PUT = _escritura
+    do_POST = _escritura
+
+
+class _Servidor(ThreadingHTTPServer):
+    request_queue_size = 128
+    daemon_threads = True
+
+
+def iniciar_mock(pedidos=None, host="127.0.0.1", puerto=0, productos=None, config=None, paginas=None):
+    """Levanta el mock en un hilo. Devuelve (server, estado); la URL base es f"http://{host}:{server.server_port}"."""
+    estado = EstadoMock(pedidos, productos, config, paginas)
+    handler = type("Handler", (_Handler,), {"estado": estado})
+    server = _Servidor((host, puerto), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, estado
+
+
+def cookies_mock():
+    """Cookies con el formato de driver.get_cookies() para usar contra el mock."""
+    return [{"name": "session", "value": TOKEN_SESION, "path": "/"}]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backoffice de mentira para pruebas locales")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--pedidos", type=int, default=100, help="cantidad de pedidos 'pending' a generar")
+    parser.add_argument("--latencia-ms", type=int, default=0)
+    parser.add_argument("--jitter-ms", type=int, default=0)
+    parser.add_argument("--render-ms", type=int, default=0)
+    parser.add_argument("--tasa-error", type=float, default=0.0)
+    parser.add_argument("--combobox", choices=("email", "status", "alternado"), default="email")
+    parser.add_argument("--peso-kb", type=int, default=0, help="recursos simulados por pedido (miniaturas, fuente, analítica)")
+    args = parser.parse_args()
+
+    config = ConfigMock(
+        latencia_ms=args.latencia_ms,
+        jitter_ms=args.jitter_ms,
+        render_ms=args.render_ms,
+        tasa_error=args.tasa_error,
+        combobox=args.combobox,
+        peso_kb=args.peso_kb,
+    )
+    pedidos, productos = generar_pedidos(args.pedidos)
+    server, _ = iniciar_mock(pedidos, args.host, args.puerto, productos, config)
+    print(f"🧪 Mock del backoffice en http://{args.host}:{server.server_port}/es-AR/login ({len(pedidos)} pedidos)")
+    print(f"   usuario {EMAIL_MOCK} / contraseña {PASSWORD_MOCK}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
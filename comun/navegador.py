@@ -0,0 +1,201 @@
+"""Creación de drivers de Chrome y login en el backoffice."""
+import os
+import time
+from dataclasses import dataclass, field
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.chrome.service import Service as ChromeService
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.common.by import By
+
+from comun.chromedriver import ruta_chromedriver
+from comun.esperas import esperar, esperar_red_inactiva, registrar_tiempo
+from comun.trazas import tramo
+from comun.sesion import cache_disponible, cargar_sesion, guardar_sesion, inyectar_sesion, invalidar_sesion, ruta_cache_default
+
+
+def _env_bool(nombre, default="true"):
+    return os.getenv(nombre, default).strip().lower() == "true"
+
+
+# Lo que los bots nunca miran: imágenes, fuentes, video y analítica de terceros.
+# No incluye JS/CSS propios ni XHR del backoffice (la SPA los necesita para armar la página).
+BLOQUEOS_DEFAULT = (
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.mp4", "*.webm",
+    "*google-analytics.com*", "*googletagmanager.com*", "*hotjar*", "*segment.io*",
+    "*doubleclick.net*", "*facebook.net*", "*intercom*", "*clarity.ms*",
+)
+
+# Flags que un Chrome de bot no necesita (menos procesos y menos memoria por instancia)
+FLAGS_LIVIANO = (
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-notifications",
+    "--mute-audio",
+    "--no-first-run",
+    "--disable-features=Translate,MediaRouter,OptimizationHints,AutofillServerCommunication",
+)
+
+# Con precarga (comun/prefetch.py) las pestañas de fondo tienen que cargar y renderizar a ritmo normal
+FLAGS_PRECARGA = (
+    "--disable-background-timer-throttling",
+    "--disable-renderer-backgrounding",
+    "--disable-backgrounding-occluded-windows",
+)
+
+
+def _bloqueos_env():
+    valor = os.getenv("NAVEGADOR_BLOQUEAR")
+    if valor is None:
+        return BLOQUEOS_DEFAULT
+    return tuple(p.strip() for p in valor.split(",") if p.strip())
+
+
+@dataclass
+class ConfigNavegador:
+    """Todo lo necesario para levantar un Chrome logueado (picklable para los workers)."""
+    login_url: str
+    email: str
+    password: str = field(repr=False)
+    headless: bool = True
+    window_size: str = "1920,1080"
+    espera_login: int = 10  # tope en segundos para salir de /login tras INGRESAR
+    # Cache de sesión (se lee del entorno al construir, después de load_dotenv)
+    cache_sesion: bool = field(default_factory=lambda: _env_bool("SESSION_CACHE"))
+    ruta_cache_sesion: str = field(default_factory=lambda: os.getenv("SESSION_CACHE_PATH", ""))
+    clave_cache_sesion: str = field(default_factory=lambda: os.getenv("SESSION_CACHE_KEY", ""), repr=False)
+    ttl_sesion: int = field(default_factory=lambda: int(os.getenv("SESSION_CACHE_TTL", "28800")))  # 8 h
+    # chromedriver ya resuelto (el pool lo completa antes de lanzar workers)
+    ruta_driver: str = ""
+    # Modo liviano: sin imágenes/fuentes/analítica (bloqueo por CDP), carga "eager" y menos features de Chrome
+    liviano: bool = field(default_factory=lambda: _env_bool("NAVEGADOR_LIVIANO"))
+    bloquear: tuple = field(default_factory=_bloqueos_env)  # patrones de URL (comodín *), separados por coma en el env
+    estrategia_carga: str = field(default_factory=lambda: os.getenv("SELENIUM_PAGE_LOAD_STRATEGY", ""))  # normal | eager | none
+    # Pedidos siguientes que se precargan en pestañas de fondo (0 = sin precarga)
+    prefetch: int = field(default_factory=lambda: int(os.getenv("NAVEGADOR_PREFETCH", "0")))
+
+    @property
+    def base_url(self) -> str:
+        return self.login_url.replace("/login", "")
+
+    @property
+    def page_load_strategy(self) -> str:
+        # eager: driver.get vuelve en DOMContentLoaded; los scripts ya esperan los elementos que usan
+        return self.estrategia_carga or ("eager" if self.liviano else "normal")
+
+    @property
+    def bloqueos(self) -> tuple:
+        """Patrones a bloquear por CDP en cada pestaña (solo en modo liviano)."""
+        return self.bloquear if self.liviano else ()
+
+    @property
+    def usa_cache(self) -> bool:
+        return self.cache_sesion and cache_disponible()
+
+    @property
+    def ruta_cache(self) -> str:
+        return self.ruta_cache_sesion or ruta_cache_default(self.login_url, self.email)
+
+    @property
+    def clave_cache(self) -> str:
+        # Sin clave explícita se deriva de la contraseña: el cache no sirve sin las credenciales
+        return self.clave_cache_sesion or f"{self.email}:{self.password}"
+
+
+def crear_driver(config: ConfigNavegador):
+    options = Options()
+    options.add_argument(f"--window-size={config.window_size}")
+    if config.headless:
+        options.add_argument("--headless=new")  # Modo headless moderno
+    options.page_load_strategy = config.page_load_strategy
+    if config.liviano:
+        for flag in FLAGS_LIVIANO:
+            options.add_argument(flag)
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    if config.prefetch > 0:
+        for flag in FLAGS_PRECARGA:
+            options.add_argument(flag)
+    servicio = ChromeService(config.ruta_driver or ruta_chromedriver())
+    inicio = time.perf_counter()
+    with tramo("inicio_chrome", liviano=config.liviano, carga=config.page_load_strategy):
+        driver = webdriver.Chrome(service=servicio, options=options)
+        if config.bloqueos:
+            bloquear_recursos(driver, config.bloqueos)
+    registrar_tiempo("inicio_chrome", time.perf_counter() - inicio)
+    return driver
+
+
+def bloquear_recursos(driver, patrones):
+    """Bloquea por CDP las URLs que coinciden con `patrones` (vale para toda la pestaña, navegue a donde navegue)."""
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(patrones)})
+    except Exception as e:
+        print(f"⚠️ No se pudo activar el bloqueo de recursos: {e!r}")
+
+
+def click_button(driver, selector, by=By.CSS_SELECTOR, wait_time=10):
+    try:
+        button = WebDriverWait(driver, wait_time).until(
+            EC.element_to_be_clickable((by, selector))
+        )
+        button.click()
+        return True
+    except Exception as e:
+        print(f"❌ Error al hacer clic en el selector '{selector}': {e}")
+        return False
+
+
+def login_formulario(driver, config: ConfigNavegador):
+    driver.get(config.login_url)
+    esperar(driver, EC.presence_of_element_located((By.ID, "email")), 15, "login_formulario")
+    driver.find_element(By.ID, "email").send_keys(config.email)
+    driver.find_element(By.ID, "password").send_keys(config.password)
+    click_button(driver, "//button[text()='INGRESAR']", By.XPATH)
+    # Sale de /login cuando el backoffice aceptó las credenciales; espera_login queda como tope
+    esperar(driver, lambda d: "/login" not in d.current_url, config.espera_login, "login_ingreso", obligatoria=False)
+    esperar_red_inactiva(driver, timeout=config.espera_login)
+
+
+def iniciar_sesion(driver, config: ConfigNavegador):
+    """Reutiliza la sesión en cache; solo cae al formulario si no hay o el backoffice la rechaza."""
+    if config.usa_cache:
+        datos = cargar_sesion(config.ruta_cache, config.clave_cache)
+        if datos:
+            with tramo("login", via="cache") as t:
+                t["exito"] = inyectar_sesion(driver, datos, config.login_url)
+            if t["exito"]:
+                print("🔑 Sesión del backoffice reutilizada desde cache")
+                return
+            print("⚠️ Sesión en cache rechazada, login por formulario")
+            invalidar_sesion(config.ruta_cache)
+
+    with tramo("login", via="formulario"):
+        login_formulario(driver, config)
+    if config.usa_cache:
+        try:
+            guardar_sesion(driver, config.ruta_cache, config.clave_cache, config.ttl_sesion)
+        except Exception as e:
+            print(f"⚠️ No se pudo guardar la sesión en cache: {e!r}")
+
+
+def preparar_sesion(config: ConfigNavegador):
+    """Deja la sesión en cache antes de lanzar workers, para que hagan un solo login entre todos."""
+    if config.usa_cache and not cargar_sesion(config.ruta_cache, config.clave_cache):
+        crear_driver_logueado(config).quit()
+
+
+def crear_driver_logueado(config: ConfigNavegador):
+    driver = crear_driver(config)
+    try:
+        iniciar_sesion(driver, config)
+    except Exception:
+        driver.quit()
+        raise
+    return driver
@@ -0,0 +1,91 @@
+"""Trabajo repartido por país (AR / MX): cada país con su backoffice, sus credenciales y su Chrome.
+
+`config_pais(config, pais)` deriva la config del navegador de un país a partir
+de la general: la URL de login con el locale del país y, si están definidas,
+credenciales propias. `ejecutar_por_pais` corre cada partición en su hilo, así
+los dos mercados avanzan a la vez y uno lento (o con el login caído) no frena
+al otro; al final imprime avance y tiempo por país.
+
+    BACKOFFICE_URL_AR / BACKOFFICE_URL_MX              login del país (default: BACKOFFICE_URL con el locale del país)
+    BACKOFFICE_EMAIL_AR / BACKOFFICE_EMAIL_MX          usuario del país (default: BACKOFFICE_EMAIL)
+    BACKOFFICE_PASSWORD_AR / BACKOFFICE_PASSWORD_MX    contraseña del país (default: BACKOFFICE_PASSWORD)
+    PAISES_PARALELO                                    un hilo por país (default true; false = uno detrás del otro)
+
+Alcanza con hilos: cada país maneja su propio Chrome y el hilo pasa casi todo
+el tiempo esperando al navegador.
+"""
+import os
+import re
+import threading
+import time
+from dataclasses import replace
+
+from comun.trazas import tramo
+
+LOCALES = {"ar": "es-AR", "mx": "es-MX"}
+_LOCALE = re.compile(r"/[a-z]{2}-[A-Z]{2}(?=/|$)")
+
+
+def config_pais(config, pais):
+    """ConfigNavegador de `pais`: URL de login de su locale y credenciales propias si las hay."""
+    sufijo = pais.upper()
+    login_url = os.getenv(f"BACKOFFICE_URL_{sufijo}") or _LOCALE.sub(f"/{LOCALES[pais]}", config.login_url, count=1)
+    return replace(
+        config,
+        login_url=login_url,
+        email=os.getenv(f"BACKOFFICE_EMAIL_{sufijo}") or config.email,
+        password=os.getenv(f"BACKOFFICE_PASSWORD_{sufijo}") or config.password,
+    )
+
+
+def ejecutar_por_pais(particiones, config, trabajar, paralelo=None):
+    """Corre `trabajar(pais, config_del_pais, items)` para cada partición no vacía, un hilo por país.
+
+    `trabajar` devuelve cuántos items salieron bien. Si lanza, el error queda
+    en la partición de ese país y los demás siguen. Devuelve
+    {pais: {"items", "ok", "segundos", "error"}}.
+    """
+    if paralelo is None:
+        paralelo = os.getenv("PAISES_PARALELO", "true").strip().lower() == "true"
+    particiones = {pais: items for pais, items in particiones.items() if items}
+    configs = {pais: config_pais(config, pais) for pais in particiones}
+    resultados = {}
+
+    sesiones = {(c.login_url, c.email) for c in configs.values()}
+    if paralelo and len(sesiones) < len(configs):
+        # Mismo login para dos países = mismo Chrome del contexto: no se puede usar desde dos hilos
+        print("⚠️ Los países comparten URL de login y usuario: se procesan uno detrás del otro")
+        paralelo = False
+
+    def _correr(pais, items):
+        print(f"🌎 [{pais.upper()}] {len(items)} pedidos")
+        resultado = resultados[pais] = {"items": len(items), "ok": 0, "segundos": 0.0, "error": None}
+        inicio = time.perf_counter()
+        try:
+            with tramo("pais", pais=pais, pedidos=len(items)):
+                resultado["ok"] = trabajar(pais, configs[pais], items)
+        except Exception as e:
+            resultado["error"] = e
+            print(f"❌ [{pais.upper()}] se cortó: {e!r}")
+        finally:
+            resultado["segundos"] = time.perf_counter() - inicio
+
+    if paralelo and len(particiones) > 1:
+        hilos = [threading.Thread(target=_correr, args=(pais, items), name=f"pais-{pais}") for pais, items in particiones.items()]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+    else:
+        for pais, items in particiones.items():
+            _correr(pais, items)
+    return resultados
+
+
+def resumen_paises(resultados) -> str:
+    partes = []
+    for pais, r in resultados.items():
+        ritmo = f", {r['ok'] / (r['segundos'] / 60):.1f}/min" if r["segundos"] > 0 and r["ok"] else ""
+        error = " ⚠️ cortado" if r["error"] else ""
+        partes.append(f"{pais.upper()}: {r['ok']}/{r['items']} pedidos en {r['segundos']:.1f}s{ritmo}{error}")
+    return "🌎 Por país: " + (" | ".join(partes) if partes else "sin pedidos")
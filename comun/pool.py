@@ -0,0 +1,117 @@
+"""Ejecución de pedidos en serie o repartidos entre varios Chrome logueados (un proceso por worker).
+
+`funcion(driver, indice, pedido_id)` es la unidad de trabajo y debe devolver un
+objeto con atributo `indice` (p. ej. ResultadoPedido). Con `url_de(pedido_id)`
+y NAVEGADOR_PREFETCH, cada Chrome precarga los próximos pedidos en pestañas. Los resultados vuelven a
+un único colector que los entrega a `al_resultado` en el orden original, así la
+salida es la misma que en la corrida secuencial.
+"""
+import multiprocessing as mp
+import os
+import queue
+from dataclasses import replace
+from functools import partial
+
+from comun.cancelacion import ResultadoPedido
+from comun.chromedriver import ruta_chromedriver
+from comun.esperas import resumen_esperas
+from comun.gestor_driver import GestorDriver
+from comun.navegador import preparar_sesion
+from comun.prefetch import precargar
+from comun.reintentos import TRANSITORIA, clasificar
+
+
+def _resultado_fallido(indice, pedido_id, mensaje, falla=TRANSITORIA):
+    resultado = ResultadoPedido(indice, pedido_id, falla=falla)
+    resultado.registrar(mensaje, notificar=True)
+    return resultado
+
+
+def _url_de(url_de):
+    return (lambda trabajo: url_de(trabajo[1])) if url_de else None
+
+
+def _worker(lote, config, funcion, cola, url_de):
+    # Un Chrome por worker, reciclado cada tanto y reemplazado si se cae (la sesión sale del cache)
+    gestor = GestorDriver(config)
+    procesados = 0
+    try:
+        for driver, (indice, pedido_id) in precargar(lote, gestor.obtener, _url_de(url_de), config.prefetch, config.bloqueos):
+            procesados += 1
+            try:
+                cola.put(funcion(driver, indice, pedido_id))
+            except Exception as e:
+                cola.put(_resultado_fallido(indice, pedido_id, f"❌ Error procesando pedido {pedido_id}: {e}", clasificar(e)))
+    except Exception as e:
+        # No se pudo levantar Chrome: lo que queda del lote se reporta sin procesar
+        for indice, pedido_id in lote[procesados:]:
+            cola.put(_resultado_fallido(indice, pedido_id, f"⚠️ Worker sin sesión, no se procesó el pedido {pedido_id}: {e}"))
+    finally:
+        gestor.cerrar()
+        print(f"🧵 Worker {os.getpid()} terminado ({gestor.reinicios} reinicios de Chrome)\n{resumen_esperas()}")
+
+
+def _ejecutar_en_pool(trabajos, config, funcion, n_workers, al_resultado, url_de):
+    # Los workers reciben chromedriver ya resuelto: arrancan sin buscarlo de nuevo
+    config = replace(config, ruta_driver=config.ruta_driver or ruta_chromedriver())
+    preparar_sesion(config)
+
+    ctx = mp.get_context("spawn")
+    cola = ctx.Queue()
+    lotes = [trabajos[i::n_workers] for i in range(n_workers)]
+    procesos = [ctx.Process(target=_worker, args=(lote, config, funcion, cola, url_de), daemon=True) for lote in lotes if lote]
+    for p in procesos:
+        p.start()
+    print(f"🧵 {len(procesos)} workers procesando {len(trabajos)} pedidos")
+
+    pendientes = {}
+    recibidos = set()
+    orden = [indice for indice, _ in trabajos]
+    siguiente = 0
+
+    while len(recibidos) < len(trabajos):
+        try:
+            resultado = cola.get(timeout=1)
+        except queue.Empty:
+            if any(p.is_alive() for p in procesos):
+                continue
+            # Todos los workers murieron: lo que falte se reporta como error
+            for indice, pedido_id in trabajos:
+                if indice not in recibidos:
+                    recibidos.add(indice)
+                    pendientes[indice] = _resultado_fallido(indice, pedido_id, f"❌ El worker terminó sin procesar el pedido {pedido_id}")
+        else:
+            recibidos.add(resultado.indice)
+            pendientes[resultado.indice] = resultado
+
+        # Emitir en el orden original apenas esté disponible el siguiente
+        while siguiente < len(orden) and orden[siguiente] in pendientes:
+            al_resultado(pendientes.pop(orden[siguiente]))
+            siguiente += 1
+
+    for p in procesos:
+        p.join()
+
+
+def ejecutar_pedidos(trabajos, config, funcion, n_workers, al_resultado, obtener_driver=None, url_de=None):
+    """trabajos: lista de (indice, pedido_id). Con n_workers <= 1 corre en este proceso.
+
+    `obtener_driver(config)` permite usar un Chrome ya logueado (p. ej. el del
+    contexto compartido); se pide en cada pedido y no se cierra acá.
+    `url_de(pedido_id)` habilita la precarga en pestañas (tiene que ser picklable
+    para los workers, p. ej. partial(url_pedido, base_url)).
+    """
+    if not trabajos:
+        return
+    if n_workers > 1 and len(trabajos) > 1:
+        _ejecutar_en_pool(trabajos, config, funcion, min(n_workers, len(trabajos)), al_resultado, url_de)
+        return
+
+    gestor = None if obtener_driver else GestorDriver(config)
+    obtener = partial(obtener_driver, config) if obtener_driver else gestor.obtener
+    try:
+        for driver, (indice, pedido_id) in precargar(trabajos, obtener, _url_de(url_de), config.prefetch, config.bloqueos):
+            al_resultado(funcion(driver, indice, pedido_id))
+    finally:
+        if gestor:
+            gestor.cerrar()
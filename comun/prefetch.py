@@ -0,0 +1,130 @@
+"""Precarga de los próximos pedidos en pestañas de fondo del mismo Chrome.
+
+Mientras el bot edita el pedido actual, los K siguientes ya se están
+descargando y renderizando en otras pestañas; al pasar al próximo se cambia a
+su pestaña en vez de hacer `driver.get` y esperar la carga. No abre procesos
+nuevos: son pestañas del mismo navegador (cada una con su bloqueo de recursos
+por CDP, que es por pestaña).
+
+    NAVEGADOR_PREFETCH   pedidos a precargar (default 0 = desactivado; 2-3 suele alcanzar)
+
+Las unidades de trabajo abren el pedido con `navegar(driver, url)`: si la
+pestaña actual es la precargada para esa URL no vuelve a navegar. Qué URL
+tiene al frente cada driver se lleva acá, en un diccionario por driver (sin
+tocar el objeto de Selenium); un driver cerrado sale solo del diccionario.
+"""
+import threading
+import weakref
+from collections import deque
+
+from comun.esperas import esperar
+from comun.navegador import bloquear_recursos
+
+# driver -> URL de la pestaña precargada que tiene al frente; los hilos por país usan drivers distintos a la vez
+_precargadas = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def _marcar_precargada(driver, url=None):
+    with _lock:
+        if url is None:
+            _precargadas.pop(driver, None)
+        else:
+            _precargadas[driver] = url
+
+
+def _tomar_precargada(driver):
+    with _lock:
+        return _precargadas.pop(driver, None)
+
+
+def navegar(driver, url):
+    """driver.get(url), salvo que la pestaña actual ya sea la precarga de esa URL."""
+    if _tomar_precargada(driver) == url:
+        # Con carga eager driver.get volvería en DOMContentLoaded; acá se espera lo mismo
+        esperar(driver, lambda d: d.execute_script("return document.readyState") != "loading", 30, "precarga", obligatoria=False)
+        return
+    driver.get(url)
+
+
+def _abrir_pestana(driver, url, bloquear):
+    """Abre `url` en una pestaña nueva sin esperar la carga; vuelve a la pestaña actual."""
+    actual = driver.current_window_handle
+    driver.switch_to.new_window("tab")
+    try:
+        pestana = driver.current_window_handle
+        if bloquear:
+            bloquear_recursos(driver, bloquear)
+        # location.href no bloquea como driver.get: la carga sigue mientras el bot trabaja en la otra pestaña
+        driver.execute_script("window.location.href = arguments[0];", url)
+    finally:
+        driver.switch_to.window(actual)
+    return pestana
+
+
+def _cerrar_pestanas(driver, pestanas):
+    """Cierra precargas que no se van a usar y vuelve a la pestaña actual."""
+    try:
+        actual = driver.current_window_handle
+        for pestana in pestanas:
+            driver.switch_to.window(pestana)
+            driver.close()
+        driver.switch_to.window(actual)
+    except Exception:
+        pass  # navegador caído o pestaña ya cerrada: el gestor del driver se ocupa
+
+
+def precargar(items, obtener_driver, url_de, k, bloquear=()):
+    """Recorre `items` devolviendo (driver, item) con los próximos `k` ya cargándose en pestañas de fondo.
+
+    `obtener_driver()` se pide en cada item (puede devolver un Chrome nuevo si
+    el anterior se recicló o murió: las precargas de ese se descartan).
+    Con k <= 0 o sin `url_de` es un recorrido normal.
+    """
+    if k <= 0 or url_de is None:
+        for item in items:
+            yield obtener_driver(), item
+        return
+
+    items = list(items)
+    cola = deque()  # (posición, pestaña, url) de los próximos items, en orden
+    driver = None
+    siguiente = 0  # próximo item a precargar
+    try:
+        for posicion, item in enumerate(items):
+            nuevo = obtener_driver()
+            if nuevo is not driver:
+                driver, cola = nuevo, deque()
+                siguiente = posicion + 1
+            _marcar_precargada(driver)
+
+            if cola and cola[0][0] == posicion:
+                _, pestana, url = cola.popleft()
+                try:
+                    driver.close()  # la pestaña del pedido anterior ya no se usa
+                    driver.switch_to.window(pestana)
+                    _marcar_precargada(driver, url)
+                except Exception as e:
+                    print(f"⚠️ No se pudo pasar a la pestaña precargada ({e!r}); se abre el pedido de nuevo")
+                    cola.clear()
+                    siguiente = posicion + 1
+                    try:
+                        driver.switch_to.window(driver.window_handles[0])
+                        _cerrar_pestanas(driver, driver.window_handles[1:])
+                    except Exception:
+                        pass  # navegador caído: el próximo obtener_driver() levanta otro
+
+            while len(cola) < k and siguiente < len(items):
+                url = url_de(items[siguiente])
+                try:
+                    cola.append((siguiente, _abrir_pestana(driver, url, bloquear), url))
+                except Exception as e:
+                    print(f"⚠️ Precarga desactivada para este navegador: {e!r}")
+                    siguiente = len(items)
+                    break
+                siguiente += 1
+
+            yield driver, item
+    finally:
+        if driver is not None and cola:
+            _cerrar_pestanas(driver, [pestana for _, pestana, _ in cola])
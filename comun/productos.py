@@ -0,0 +1,104 @@
+"""Lectura de los productos de un pedido y búsqueda difusa del producto de la hoja.
+
+Antes se hacía un `find_element(...).text` por fila (un viaje a WebDriver por
+producto, y otra vuelta completa si la similitud no llegaba a 0.8). Ahora los
+nombres se leen en un solo `execute_script`, el matching corre en memoria y
+solo se pide al navegador la fila ganadora.
+"""
+import re
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+
+from comun.esperas import esperar
+
+CLASE_FILA = "css-1es96wk"
+
+_JS_NOMBRES = f"""
+return Array.from(document.getElementsByClassName('{CLASE_FILA}')).map(fila => {{
+    const span = fila.querySelector('span');
+    return span ? span.innerText.trim() : '';
+}});
+"""
+_JS_FILA = f"return document.getElementsByClassName('{CLASE_FILA}')[arguments[0]] || null;"
+
+
+def normalizar(texto):
+    """Elimina símbolos, convierte a minúsculas y separa palabras clave."""
+    texto = re.sub(r"[^a-zA-Z0-9áéíóúñü\s]", "", (texto or "").lower())
+    return set(texto.split())
+
+
+def leer_productos(driver, timeout=10):
+    """Nombres de todas las filas de producto en un solo viaje (espera a que haya al menos una).
+
+    Lanza TimeoutException si el pedido no muestra productos, como la espera original.
+    """
+    return esperar(driver, lambda d: d.execute_script(_JS_NOMBRES) or False, timeout, "productos_pedido")
+
+
+def fila_producto(driver, posicion):
+    """WebElement de la fila en `posicion` (la ganadora del matching)."""
+    return driver.execute_script(_JS_FILA, posicion)
+
+
+@dataclass
+class Coincidencia:
+    posicion: int
+    nombre: str
+    score: float
+    metodo: str  # "alias" | "similitud" | "parcial" | "mejor_similitud"
+
+
+def buscar_producto(buscado, nombres, umbral=0.8, umbral_parcial=0.5, aceptar_mejor=False, alias=None):
+    """Mismo criterio de siempre en una sola pasada sobre datos precalculados.
+
+    0) Con `alias` (AliasProductos), si el nombre ya conocido está en el pedido se usa directo.
+    1) Mayor SequenceMatcher.ratio() si llega a `umbral`.
+    2) Si no, el primer nombre que comparta `umbral_parcial` de las palabras buscadas.
+    3) Con `aceptar_mejor` (comportamiento histórico de Reclamos) se queda con el
+       de mayor similitud aunque no llegue al umbral.
+    """
+    if alias is not None:
+        conocido = alias.obtener(buscado)
+        if conocido and conocido[0] in nombres:
+            return Coincidencia(nombres.index(conocido[0]), conocido[0], conocido[1], "alias")
+
+    coincidencia = _buscar_difuso(buscado, nombres, umbral, umbral_parcial, aceptar_mejor)
+    # Solo se aprenden matches confiables, no el "mejor aunque no llegue" de Reclamos
+    if alias is not None and coincidencia and coincidencia.metodo in ("similitud", "parcial"):
+        alias.guardar(buscado, coincidencia.nombre, coincidencia.score)
+    return coincidencia
+
+
+def _buscar_difuso(buscado, nombres, umbral, umbral_parcial, aceptar_mejor):
+    buscado_lower = (buscado or "").lower()
+    palabras_buscadas = normalizar(buscado)
+
+    # Mismo orden de argumentos que antes (buscado, nombre): ratio() no es simétrico
+    matcher = SequenceMatcher(None)
+    matcher.set_seq1(buscado_lower)
+    mejor, mayor = None, 0.0
+    primera_parcial = None
+    for posicion, nombre in enumerate(nombres):
+        if primera_parcial is None and palabras_buscadas:
+            comunes = palabras_buscadas & normalizar(nombre)
+            if len(comunes) / len(palabras_buscadas) >= umbral_parcial:
+                primera_parcial = posicion
+
+        matcher.set_seq2((nombre or "").lower())
+        # Cotas superiores baratas: si ni así supera al mejor, no hace falta el ratio completo
+        if matcher.real_quick_ratio() <= mayor or matcher.quick_ratio() <= mayor:
+            continue
+        score = matcher.ratio()
+        if score > mayor:
+            mayor, mejor = score, posicion
+
+    if mejor is not None and mayor >= umbral:
+        return Coincidencia(mejor, nombres[mejor], mayor, "similitud")
+    if primera_parcial is not None:
+        nombre = nombres[primera_parcial]
+        score = SequenceMatcher(None, buscado_lower, (nombre or "").lower()).ratio()
+        return Coincidencia(primera_parcial, nombre, score, "parcial")
+    if aceptar_mejor and mejor is not None:
+        return Coincidencia(mejor, nombres[mejor], mayor, "mejor_similitud")
+    return None
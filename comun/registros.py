@@ -0,0 +1,145 @@
+"""Filas de las hojas como registros livianos, procesadas en streaming.
+
+Reemplaza los DataFrame de pandas que solo se usaban para envolver
+`get_all_values()` y recorrerlo con `iterrows()`. Cada etapa es un generador
+(parseo -> filtro de fecha -> filtro de tipo/estado) y los registros usan
+`__slots__`: nada de copiar la hoja entera en un frame ni de importar pandas.
+Mismos criterios que tenían los scripts (fecha día primero, fechas inválidas
+descartadas, cantidades no numéricas como 0).
+"""
+import re
+from datetime import datetime
+
+_FORMATOS_FECHA = (
+    "%d/%m/%Y", "%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M", "%d/%m/%y",
+    "%d-%m-%Y", "%Y-%m-%d", "%Y-%m-%d %H:%M:%S", "%Y/%m/%d",
+)
+_ID_PEDIDO = re.compile(r"\b[a-f0-9]{32}\b")
+
+
+def parsear_fecha(texto):
+    """date de una celda (día primero, como `pd.to_datetime(dayfirst=True)`), o None si no es fecha."""
+    texto = (texto or "").strip()
+    for formato in _FORMATOS_FECHA:
+        try:
+            return datetime.strptime(texto, formato).date()
+        except ValueError:
+            continue
+    return None
+
+
+def extraer_id(texto):
+    """Id de pedido (32 hex) dentro de un texto o URL, o None."""
+    match = _ID_PEDIDO.search(str(texto))
+    return match.group(0) if match else None
+
+
+def normalizar_id(texto):
+    """Id de pedido de una celda: los 32 hex si hay (aunque venga en una URL o en mayúsculas), si no el texto limpio."""
+    texto = str(texto or "").strip()
+    return extraer_id(texto.lower()) or texto
+
+
+def entero(texto):
+    """Cantidad de la hoja: solo dígitos cuentan, cualquier otra cosa es 0."""
+    texto = str(texto or "").strip()
+    return int(texto) if texto.isdigit() else 0
+
+
+def _celda(fila, indice, default=""):
+    return (fila[indice] if len(fila) > indice else default) or ""
+
+
+class Reclamo:
+    __slots__ = ("fila", "fecha", "estado", "url", "producto", "cantidad", "procesado")
+
+    def __init__(self, fila, fecha, estado, url, producto, cantidad, procesado):
+        self.fila = fila
+        self.fecha = fecha
+        self.estado = estado
+        self.url = url
+        self.producto = producto
+        self.cantidad = cantidad
+        self.procesado = procesado
+
+
+class Desvio:
+    __slots__ = ("fila", "fecha", "pais", "tipo", "pedido_id", "producto", "cantidad_original", "cantidad_modificada")
+
+    def __init__(self, fila, fecha, pais, tipo, pedido_id, producto, cantidad_original, cantidad_modificada):
+        self.fila = fila
+        self.pais = pais
+        self.fecha = fecha
+        self.tipo = tipo
+        self.pedido_id = pedido_id
+        self.producto = producto
+        self.cantidad_original = cantidad_original
+        self.cantidad_modificada = cantidad_modificada
+
+    @property
+    def cantidad_deseada(self):
+        """faltante_parcial: lo que faltó (original - modificada); faltante: todo lo original."""
+        if self.tipo.strip().lower() == "faltante_parcial":
+            return max(self.cantidad_original - self.cantidad_modificada, 0)
+        return self.cantidad_original
+
+
+def pedidos_de_columna(valores, columna=1):
+    """(indice, pedido_id normalizado) de cada fila de datos de `valores` (encabezado + filas)."""
+    for indice, fila in enumerate(valores[1:]):
+        yield indice, normalizar_id(_celda(fila, columna))
+
+
+def leer_reclamos(valores, fila_inicio=2, columna_procesado=13):
+    """Reclamo por cada fila con fecha válida (columnas de la hoja ReclamoAI)."""
+    for numero_fila, fila in enumerate(valores[1:], start=fila_inicio):
+        if len(fila) < 16 or not fila[0].strip():
+            continue
+        fecha = parsear_fecha(fila[0])
+        if fecha is None:
+            continue
+        yield Reclamo(
+            fila=numero_fila,
+            fecha=fecha,
+            estado=fila[8].strip(),
+            url=fila[15].strip(),
+            producto=fila[9].strip(),
+            cantidad=entero(fila[10]),
+            procesado=_celda(fila, columna_procesado - 1).strip(),
+        )
+
+
+def leer_desvios(valores, fila_inicio=2, paises=("ar", "mx")):
+    """Desvio por cada fila de los países pedidos con fecha válida (hoja check_nueva_info_desvios)."""
+    for numero_fila, fila in enumerate(valores[1:], start=fila_inicio):
+        if len(fila) < 12:
+            continue
+        pais = fila[1].strip().lower()
+        if pais not in paises:
+            continue
+        fecha = parsear_fecha(fila[0])
+        if fecha is None:
+            continue
+        yield Desvio(
+            fila=numero_fila,
+            fecha=fecha,
+            pais=pais,
+            tipo=fila[2],
+            pedido_id=extraer_id(fila[7]),
+            producto=fila[9].strip(),
+            cantidad_original=entero(fila[11]),
+            cantidad_modificada=entero(_celda(fila, 12, "0")),
+        )
+
+
+def del_dia(registros, fecha, marca=None):
+    """Deja pasar los registros de `fecha`.
+
+    Si se pasa `marca` (lista), le agrega la primera fila con fecha >= `fecha`:
+    es la marca de agua de LectorIncremental para la próxima corrida.
+    """
+    for registro in registros:
+        if marca is not None and not marca and registro.fecha >= fecha:
+            marca.append(registro.fila)
+        if registro.fecha == fecha:
+            yield registro
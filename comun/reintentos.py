@@ -0,0 +1,105 @@
+"""Segunda pasada para las fallas transitorias de la corrida.
+
+Cada falla se clasifica como transitoria (render lento, elemento que se
+re-renderizó, click tapado, Chrome o red que se cayeron: otro intento puede
+salir) o permanente (producto que no está, pedido sin ID, error de datos).
+Las transitorias van a una ColaReintentos que se drena al terminar la pasada
+principal, en rondas con espera exponencial y, si se pide, con un Chrome nuevo.
+El presupuesto de la corrida pone techo a los reintentos en un día malo.
+
+    REINTENTOS_PRESUPUESTO     reintentos por corrida (default 20; 0 = sin segunda pasada)
+    REINTENTOS_MAX             intentos extra por pedido (default 2)
+    REINTENTOS_ESPERA_S        espera antes de la primera ronda; se duplica en cada una (default 2)
+    REINTENTOS_DRIVER_NUEVO    cada ronda arranca con un Chrome nuevo (default true)
+"""
+import os
+import time
+from dataclasses import dataclass
+
+from selenium.common.exceptions import NoSuchElementException, TimeoutException, WebDriverException
+
+TRANSITORIA = "transitoria"
+PERMANENTE = "permanente"
+
+
+def clasificar(error) -> str:
+    """Transitoria si otro intento puede salir bien; permanente si no."""
+    if isinstance(error, TimeoutException):
+        return TRANSITORIA
+    if isinstance(error, NoSuchElementException):
+        return PERMANENTE  # ya pasaron las esperas: el elemento no está en la página
+    if isinstance(error, (WebDriverException, ConnectionError, TimeoutError)):
+        return TRANSITORIA  # stale, click interceptado, sesión o pestaña caída, red
+    return PERMANENTE
+
+
+@dataclass
+class ConfigReintentos:
+    presupuesto: int = 20
+    max_intentos: int = 2
+    espera_s: float = 2.0
+    driver_nuevo: bool = True
+
+    @classmethod
+    def desde_env(cls):
+        return cls(
+            presupuesto=int(os.getenv("REINTENTOS_PRESUPUESTO", "20")),
+            max_intentos=int(os.getenv("REINTENTOS_MAX", "2")),
+            espera_s=float(os.getenv("REINTENTOS_ESPERA_S", "2")),
+            driver_nuevo=os.getenv("REINTENTOS_DRIVER_NUEVO", "true").strip().lower() == "true",
+        )
+
+
+class ColaReintentos:
+    """Pendientes de reintento de una corrida: `agregar` en la pasada principal, `drenar` al final."""
+
+    def __init__(self, config=None):
+        self.config = config or ConfigReintentos.desde_env()
+        self.pendientes = []  # (clave, item)
+        self.intentos = {}  # clave -> veces encolada
+        self.usados = 0
+
+    def agregar(self, clave, item, falla) -> bool:
+        """Encola `item` si la falla es transitoria y le quedan intentos; devuelve si quedó encolado."""
+        if falla != TRANSITORIA or self.config.presupuesto <= 0:
+            return False
+        if self.intentos.get(clave, 0) >= self.config.max_intentos:
+            return False
+        self.intentos[clave] = self.intentos.get(clave, 0) + 1
+        self.pendientes.append((clave, item))
+        print(f"🔁 {clave}: falla transitoria, se reintenta al final (intento {self.intentos[clave]}/{self.config.max_intentos})")
+        return True
+
+    def drenar(self, reintentar, renovar_driver=None) -> list:
+        """Reintenta en rondas hasta vaciar la cola o agotar el presupuesto.
+
+        `reintentar(item)` hace el nuevo intento y, si vuelve a fallar de forma
+        transitoria, lo re-encola con `agregar` (igual que en la pasada
+        principal). Devuelve los items que quedaron sin reintentar por falta de
+        presupuesto, para reportarlos como fallados.
+        """
+        sin_presupuesto = []
+        ronda = 0
+        while self.pendientes:
+            lote, self.pendientes = self.pendientes, []
+            disponibles = max(self.config.presupuesto - self.usados, 0)
+            sin_presupuesto.extend(item for _, item in lote[disponibles:])
+            lote = lote[:disponibles]
+            if not lote:
+                break
+            espera = self.config.espera_s * 2 ** ronda
+            ronda += 1
+            print(f"🔁 Ronda de reintentos {ronda}: {len(lote)} pendientes (espera {espera:.0f}s, "
+                  f"presupuesto {self.usados}/{self.config.presupuesto})")
+            time.sleep(espera)
+            if renovar_driver and self.config.driver_nuevo:
+                try:
+                    renovar_driver()
+                except Exception as e:
+                    print(f"⚠️ No se pudo abrir un navegador nuevo para los reintentos: {e}")
+            for _, item in lote:
+                self.usados += 1
+                reintentar(item)
+        if sin_presupuesto:
+            print(f"⛔ Presupuesto de reintentos agotado: {len(sin_presupuesto)} quedan como fallados")
+        return sin_presupuesto
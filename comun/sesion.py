@@ -0,0 +1,123 @@
+"""Cache en disco de la sesión del backoffice (cookies + localStorage), cifrada y con vencimiento.
+
+El login por formulario cuesta ~15 s entre esperas fijas; con la sesión
+guardada un driver nuevo solo inyecta cookies y localStorage y sigue.
+Si `cryptography` no está instalado el cache queda deshabilitado y se hace
+el login de siempre.
+"""
+import base64
+import hashlib
+import json
+import os
+import time
+from urllib.parse import urlsplit
+
+from selenium.webdriver.common.by import By
+
+from comun.esperas import esperar, red_inactiva
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:  # dependencia opcional
+    Fernet = None
+    InvalidToken = Exception
+
+CACHE_DIR_DEFAULT = os.path.join(os.path.expanduser("~"), ".cache", "nilus-backoffice")
+
+
+def origen(url: str) -> str:
+    partes = urlsplit(url)
+    return f"{partes.scheme}://{partes.netloc}"
+
+
+def ruta_cache_default(login_url: str, email: str) -> str:
+    """Un archivo por usuario y URL de login, para no mezclar sesiones de otra cuenta o país."""
+    firma = hashlib.sha256(f"{email}|{login_url}".encode()).hexdigest()[:16]
+    return os.path.join(CACHE_DIR_DEFAULT, f"sesion-{firma}.bin")
+
+
+def cache_disponible() -> bool:
+    return Fernet is not None
+
+
+def _fernet(clave: str):
+    """Acepta una clave Fernet o cualquier secreto (se deriva con SHA-256)."""
+    if Fernet is None or not clave:
+        return None
+    try:
+        return Fernet(clave.encode())
+    except Exception:
+        return Fernet(base64.urlsafe_b64encode(hashlib.sha256(clave.encode()).digest()))
+
+
+def guardar_sesion(driver, ruta: str, clave: str, ttl: int):
+    fernet = _fernet(clave)
+    if fernet is None:
+        return False
+    datos = {
+        "expira": time.time() + ttl,
+        "cookies": driver.get_cookies(),
+        "local_storage": driver.execute_script("return Object.assign({}, window.localStorage);") or {},
+    }
+    os.makedirs(os.path.dirname(ruta) or ".", exist_ok=True)
+    tmp = f"{ruta}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(fernet.encrypt(json.dumps(datos).encode()))
+    os.chmod(tmp, 0o600)
+    os.replace(tmp, ruta)
+    print(f"💾 Sesión del backoffice guardada en cache ({ttl // 60} min)")
+    return True
+
+
+def cargar_sesion(ruta: str, clave: str):
+    """Devuelve la sesión guardada o None si no hay, venció o no se puede descifrar."""
+    fernet = _fernet(clave)
+    if fernet is None or not os.path.exists(ruta):
+        return None
+    try:
+        with open(ruta, "rb") as f:
+            datos = json.loads(fernet.decrypt(f.read()))
+    except (InvalidToken, ValueError, OSError) as e:
+        print(f"⚠️ Cache de sesión ilegible, se ignora: {e!r}")
+        return None
+    if datos.get("expira", 0) <= time.time():
+        return None
+    return datos
+
+
+def invalidar_sesion(ruta: str):
+    try:
+        os.remove(ruta)
+    except FileNotFoundError:
+        pass
+
+
+def inyectar_sesion(driver, datos, login_url: str, espera_validacion: int = 10) -> bool:
+    """Carga cookies y localStorage en el driver y verifica que el backoffice no pida login.
+
+    Aceptada apenas la URL queda fuera de /login con la red inactiva; rechazada
+    si aparece /login o el campo de contraseña. `espera_validacion` es solo el
+    tope: si no llega ninguna de las dos señales se toma como rechazada.
+    """
+    base = login_url.replace("/login", "")
+    driver.get(origen(login_url))  # hay que estar en el dominio para poder setear cookies
+    for cookie in datos.get("cookies", []):
+        cookie = {k: v for k, v in cookie.items() if k != "sameSite" or v in ("Strict", "Lax", "None")}
+        try:
+            driver.add_cookie(cookie)
+        except Exception:
+            pass
+    driver.execute_script(
+        "for (const [k, v] of Object.entries(arguments[0])) { window.localStorage.setItem(k, v); }",
+        datos.get("local_storage", {}),
+    )
+
+    driver.get(base)
+    inactiva = red_inactiva()
+
+    def _veredicto(d):
+        if "/login" in d.current_url or d.find_elements(By.ID, "password"):
+            return "rechazada"  # El backoffice volvió al formulario
+        return "aceptada" if inactiva(d) else False
+
+    return esperar(driver, _veredicto, espera_validacion, "sesion_cache", obligatoria=False) == "aceptada"
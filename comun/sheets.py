@@ -0,0 +1,149 @@
+"""Helpers de Google Sheets compartidos por los scripts."""
+import hashlib
+import json
+import os
+
+from gspread.utils import fill_gaps, rowcol_to_a1
+
+from comun.sesion import CACHE_DIR_DEFAULT
+from comun.trazas import tramo
+
+
+class EscrituraPorLotes:
+    """Acumula celdas a escribir y las manda en un solo `batch_update` por lote.
+
+    Reemplaza los `update_cell` de a uno (una llamada a la API por celda). Con
+    `tam_lote` se vacía periódicamente para no perder lo hecho si el script se
+    corta a mitad; `flush()` manda lo que quede.
+    """
+
+    def __init__(self, worksheet, tam_lote=50):
+        self.worksheet = worksheet
+        self.tam_lote = max(1, tam_lote)
+        self.pendientes = {}  # "M12" -> valor (la última escritura gana)
+        self.llamadas = 0
+
+    def marcar(self, fila, columna, valor):
+        self.pendientes[rowcol_to_a1(fila, columna)] = valor
+        if len(self.pendientes) >= self.tam_lote:
+            self.flush()
+
+    def flush(self):
+        if not self.pendientes:
+            return
+        datos = [{"range": celda, "values": [[valor]]} for celda, valor in self.pendientes.items()]
+        with tramo("sheets_escritura", celdas=len(datos)):
+            self.worksheet.batch_update(datos)
+        self.llamadas += 1
+        print(f"📝 {len(datos)} celdas escritas en la hoja en 1 llamada")
+        self.pendientes.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+        return False
+
+
+class LectorIncremental:
+    """Lee solo la cola nueva de una hoja en lugar de `get_all_values()` completo.
+
+    Guarda por hoja una marca de agua (primera fila que la próxima corrida
+    todavía necesita) y una huella de las filas previas a la marca. La próxima
+    lectura pide, en una sola llamada, el encabezado y desde `marca -
+    solapamiento` hasta el final. Si las filas del solapamiento cambiaron (la
+    hoja se borró o reordenó) se vuelve a la lectura completa.
+
+    `leer()` devuelve (valores, fila_inicio): `valores` tiene el mismo formato
+    que get_all_values() (encabezado + filas) y `fila_inicio` es el número real
+    de fila de valores[1], para que cada script conserve su mapeo de columnas.
+    """
+
+    def __init__(self, worksheet, trabajo, ruta=None, solapamiento=None, habilitado=None):
+        self.worksheet = worksheet
+        self.clave = f"{worksheet.spreadsheet.id}/{worksheet.title}/{trabajo}"
+        self.ruta = ruta or os.getenv("SHEETS_MARCAS_PATH") or os.path.join(CACHE_DIR_DEFAULT, "marcas_hojas.json")
+        self.solapamiento = int(solapamiento if solapamiento is not None else os.getenv("SHEETS_SOLAPAMIENTO", "50"))
+        self.habilitado = (os.getenv("SHEETS_INCREMENTAL", "true").strip().lower() == "true") if habilitado is None else habilitado
+        self._filas = {}  # número de fila -> valores, de la última lectura
+        self.fila_inicio = 2
+
+    # ---- persistencia de marcas ----
+    def _marcas(self):
+        try:
+            with open(self.ruta, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _huella(self, desde, hasta):
+        normalizadas = []
+        for n in range(desde, hasta):
+            fila = list(self._filas.get(n, []))
+            # Sin celdas vacías al final: get_all_values rellena, batch_get no
+            while fila and fila[-1] == "":
+                fila.pop()
+            normalizadas.append(fila)
+        return hashlib.sha256(json.dumps(normalizadas, ensure_ascii=False).encode()).hexdigest()
+
+    # ---- lectura ----
+    def leer(self):
+        with tramo("sheets_lectura", hoja=self.worksheet.title) as t:
+            marca = self._marcas().get(self.clave) if self.habilitado else None
+            t["incremental"] = False
+            if marca:
+                valores = self._leer_cola(marca)
+                if valores is not None:
+                    t["incremental"] = True
+                    t["filas"] = len(valores) - 1
+                    return valores, self.fila_inicio
+                print(f"↩️ La hoja {self.worksheet.title} cambió antes de la marca, lectura completa")
+            valores = self._leer_todo()
+            t["filas"] = len(valores) - 1
+            return valores, self.fila_inicio
+
+    def _leer_todo(self):
+        valores = self.worksheet.get_all_values()
+        self.fila_inicio = 2
+        self._filas = {n: fila for n, fila in enumerate(valores[1:], start=2)}
+        return valores
+
+    def _leer_cola(self, marca):
+        desde = max(2, marca["desde"])
+        encabezado, cola = self.worksheet.batch_get(["1:1", f"{desde}:{max(desde, self.worksheet.row_count)}"])
+        encabezado = encabezado[0] if encabezado else []
+        cola = list(cola)
+        self._filas = {n: fila for n, fila in enumerate(cola, start=desde)}
+        if self._huella(desde, marca["marca"]) != marca["huella"]:
+            return None
+
+        # Mismo formato rectangular que get_all_values()
+        ancho = max([len(encabezado)] + [len(fila) for fila in cola])
+        valores = fill_gaps([encabezado] + cola, cols=ancho) if cola else [encabezado + [""] * (ancho - len(encabezado))]
+        self.fila_inicio = desde
+        self._filas = {n: fila for n, fila in enumerate(valores[1:], start=desde)}
+        print(f"📥 {self.worksheet.title}: {len(cola)} filas leídas desde la fila {desde} (marca {marca['marca']})")
+        return valores
+
+    def confirmar(self, marca):
+        """Guarda `marca`: la primera fila que la próxima corrida todavía necesita.
+
+        Llamarlo al final, cuando lo leído ya se procesó.
+        """
+        if not self.habilitado:
+            return
+        # Nunca antes de lo que se leyó: esas filas ya las descartó la marca anterior
+        marca = max(self.fila_inicio, min(int(marca), self.ultima_fila + 1))
+        desde = max(self.fila_inicio, marca - self.solapamiento)
+        marcas = self._marcas()
+        marcas[self.clave] = {"desde": desde, "marca": marca, "huella": self._huella(desde, marca)}
+        os.makedirs(os.path.dirname(self.ruta) or ".", exist_ok=True)
+        tmp = f"{self.ruta}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(marcas, f, ensure_ascii=False)
+        os.replace(tmp, self.ruta)
+
+    @property
+    def ultima_fila(self):
+        return max(self._filas, default=1)
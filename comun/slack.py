@@ -0,0 +1,169 @@
+"""Notificador de Slack en segundo plano que agrupa los mensajes en resúmenes periódicos.
+
+Los scripts encolan (no bloquea) y un hilo manda cada `intervalo` segundos un
+solo mensaje con todo lo acumulado, más un conteo de pedidos ok/fallidos.
+La cola es acotada: si Slack está caído o limitando, se descartan los más
+viejos en lugar de frenar las cancelaciones. Al salir del proceso se manda
+lo pendiente.
+"""
+import atexit
+import os
+import queue
+import threading
+import time
+
+import requests
+
+from comun.trazas import tramo
+
+MAX_LINEAS = 25  # líneas de detalle por resumen; el resto se resume en "… y N más"
+MAX_IDS = 20
+
+
+def transporte_webhook(url, timeout=15):
+    """Incoming Webhook con una sesión HTTP reutilizada (Reclamos / Desvíos)."""
+    sesion = requests.Session()
+
+    def _enviar(texto):
+        resp = sesion.post(url, json={"text": texto}, timeout=timeout)
+        if resp.status_code == 429:
+            return float(resp.headers.get("Retry-After", "1"))
+        if resp.status_code != 200:
+            print(f"❌ Error Slack: {resp.status_code} - {resp.text}")
+        else:
+            print("Slack OK")
+        return 0
+    return _enviar
+
+
+def transporte_webclient(client, channel):
+    """chat_postMessage de slack_sdk (HomeDelivery / Prevención)."""
+    def _enviar(texto):
+        try:
+            resp = client.chat_postMessage(channel=channel, text=texto)
+        except Exception as e:
+            respuesta = getattr(e, "response", None)
+            if respuesta is not None and getattr(respuesta, "status_code", None) == 429:
+                return float(respuesta.headers.get("Retry-After", "1"))
+            raise
+        if not resp.get("ok", False):
+            print(f"❌ Slack error: {resp.get('error')}")
+        else:
+            print(f"Slack OK ts={resp.get('ts')}")
+        return 0
+    return _enviar
+
+
+class NotificadorSlack:
+    def __init__(self, enviar, intervalo=None, tam_cola=None):
+        """`enviar(texto)` hace el post real y devuelve los segundos a esperar si Slack pidió frenar (429)."""
+        self._enviar = enviar
+        self.intervalo = float(intervalo if intervalo is not None else os.getenv("SLACK_DIGEST_SEGUNDOS", "15"))
+        self._cola = queue.Queue(maxsize=int(tam_cola if tam_cola is not None else os.getenv("SLACK_COLA_MAX", "1000")))
+        self._hilo = None
+        self._lock = threading.Lock()
+        self._cerrado = threading.Event()
+        self.descartados = 0
+        self.enviados = 0
+        self.segundos_envio = 0.0
+
+    # ---- API para los scripts (no bloquea) ----
+    def notificar(self, mensaje: str):
+        self._encolar(("texto", mensaje))
+
+    def contar(self, pedido_id, ok: bool):
+        self._encolar(("pedido", (pedido_id, ok)))
+
+    def cerrar(self, timeout=30):
+        """Manda lo pendiente y termina el hilo."""
+        if self._hilo is None or self._cerrado.is_set():
+            return
+        self._cerrado.set()
+        self._hilo.join(timeout)
+
+    # ---- internos ----
+    def _encolar(self, item):
+        self._arrancar()
+        while True:
+            try:
+                self._cola.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self._cola.get_nowait()
+                    self.descartados += 1
+                except queue.Empty:
+                    pass
+
+    def _arrancar(self):
+        with self._lock:
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._bucle, name="notificador-slack", daemon=True)
+                self._hilo.start()
+                atexit.register(self.cerrar)
+
+    def _juntar_lote(self):
+        """Espera el primer mensaje y junta todo lo que llegue durante `intervalo`."""
+        lote = []
+        limite = None
+        while not self._cerrado.is_set():
+            timeout = 0.5 if limite is None else limite - time.monotonic()
+            if timeout <= 0:
+                return lote
+            try:
+                lote.append(self._cola.get(timeout=timeout))
+            except queue.Empty:
+                continue
+            if limite is None:
+                limite = time.monotonic() + self.intervalo
+        # Cerrando: se lleva todo lo que quede en la cola
+        while True:
+            try:
+                lote.append(self._cola.get_nowait())
+            except queue.Empty:
+                return lote
+
+    def _bucle(self):
+        while True:
+            lote = self._juntar_lote()
+            if lote:
+                self._publicar(formatear_resumen(lote, self.descartados))
+                self.descartados = 0
+            if self._cerrado.is_set() and self._cola.empty():
+                return
+
+    def _publicar(self, texto):
+        for _ in range(3):
+            inicio = time.perf_counter()
+            try:
+                with tramo("slack_envio"):
+                    espera = self._enviar(texto)
+            except Exception as e:
+                print(f"❌ Excepción enviando mensaje a Slack: {repr(e)}")
+                return
+            finally:
+                self.segundos_envio += time.perf_counter() - inicio
+            if not espera:
+                self.enviados += 1
+                return
+            time.sleep(espera)
+
+
+def formatear_resumen(lote, descartados=0) -> str:
+    textos = [dato for tipo, dato in lote if tipo == "texto"]
+    pedidos = [dato for tipo, dato in lote if tipo == "pedido"]
+
+    lineas = []
+    if pedidos:
+        fallidos = [pedido_id for pedido_id, ok in pedidos if not ok]
+        resumen = f"📊 {len(pedidos) - len(fallidos)} ok, {len(fallidos)} con error"
+        if fallidos:
+            ids = ", ".join(str(p) for p in fallidos[:MAX_IDS])
+            resumen += f": {ids}" + (f" … y {len(fallidos) - MAX_IDS} más" if len(fallidos) > MAX_IDS else "")
+        lineas.append(resumen)
+    lineas.extend(textos[:MAX_LINEAS])
+    if len(textos) > MAX_LINEAS:
+        lineas.append(f"… y {len(textos) - MAX_LINEAS} mensajes más")
+    if descartados:
+        lineas.append(f"⚠️ {descartados} mensajes descartados (cola de Slack llena)")
+    return "\n".join(lineas)
@@ -0,0 +1,86 @@
+import json
+import sys
+
+from comun import alias_productos
+from comun.alias_productos import AliasProductos, clave_alias
+from comun.productos import buscar_producto
+
+
+class AliasFijo:
+    def __init__(self, conocidos=None):
+        self.conocidos = dict(conocidos or {})
+        self.guardados = []
+
+    def obtener(self, texto):
+        return self.conocidos.get(texto)
+
+    def guardar(self, texto, nombre, score):
+        self.guardados.append((texto, nombre))
+
+
+def test_alias_tiene_prioridad_y_solo_aprende_matches_confiables():
+    nombres = ["Leche Entera 1L", "Arroz 500g"]
+    alias = AliasFijo({"la blanca": ("Arroz 500g", 0.9)})
+    coincidencia = buscar_producto("la blanca", nombres, alias=alias)
+    assert (coincidencia.posicion, coincidencia.metodo) == (1, "alias")
+
+    buscar_producto("leche entera 1l", nombres, alias=alias)
+    buscar_producto("azúcar", nombres, aceptar_mejor=True, alias=alias)
+    assert alias.guardados == [("leche entera 1l", "Leche Entera 1L")]
+
+
+def test_alias_que_ya_no_esta_en_el_pedido_cae_al_difuso():
+    alias = AliasFijo({"leche": ("Leche Descremada", 0.9)})
+    coincidencia = buscar_producto("leche entera", ["Leche Entera"], alias=alias)
+    assert coincidencia.metodo == "similitud"
+
+
+def test_clave_normalizada():
+    assert clave_alias("  Leche   ENTERA, 1L! ") == "leche entera 1l"
+    assert clave_alias(None) == ""
+
+
+def test_desalojo_lru_al_pasar_el_maximo(tmp_path):
+    alias = AliasProductos(str(tmp_path / "alias.json"), max_entradas=2)
+    alias.guardar("a", "A", 0.9)
+    alias.guardar("b", "B", 0.9)
+    assert alias.obtener("A ") == ("A", 0.9)  # "a" pasa a ser la más reciente
+    alias.guardar("c", "C", 0.9)
+    assert list(alias.entradas()) == ["a", "c"]
+    assert (alias.aciertos, alias.fallos) == (1, 0)
+    alias.persistir()
+
+    # El orden del archivo es el orden LRU: al recargar con un máximo menor sigue desalojando lo más viejo
+    recargado = AliasProductos(str(tmp_path / "alias.json"), max_entradas=1)
+    assert recargado.obtener("b") is None
+    recargado.guardar("d", "D", 0.85)
+    assert list(recargado.entradas()) == ["d"]
+
+
+def test_max_desde_el_entorno(tmp_path, monkeypatch):
+    monkeypatch.setenv("ALIAS_CACHE_MAX", "1")
+    alias = AliasProductos(str(tmp_path / "alias.json"))
+    alias.guardar("a", "A", 0.9)
+    alias.guardar("b", "B", 0.9)
+    assert list(alias.entradas()) == ["b"]
+
+
+def _cli(monkeypatch, ruta, *args):
+    monkeypatch.setattr(sys, "argv", ["alias_productos", "--ruta", ruta, *args])
+    alias_productos.main()
+    with open(ruta, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_cli_invalidar_y_limpiar(tmp_path, monkeypatch, capsys):
+    ruta = str(tmp_path / "alias.json")
+    alias = AliasProductos(ruta)
+    for texto in ("leche entera", "arroz", "yerba"):
+        alias.guardar(texto, texto.title(), 0.9)
+    alias.persistir()
+
+    assert list(_cli(monkeypatch, ruta, "--invalidar", "LECHE entera", "--invalidar", "fideos")) == ["arroz", "yerba"]
+    salida = capsys.readouterr().out
+    assert "🗑️ Invalidado: 'LECHE entera'" in salida and "No existe: 'fideos'" in salida
+
+    assert _cli(monkeypatch, ruta, "--limpiar") == {}
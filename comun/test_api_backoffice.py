@@ -0,0 +1,43 @@
+from comun.api_backoffice import NO_EXISTE, ConfigApi, _confirma_inexistente, prechequear_estados
+
+
+class Respuesta:
+    def __init__(self, cuerpo):
+        self.cuerpo = cuerpo
+
+    def json(self):
+        if self.cuerpo is None:
+            raise ValueError("no es JSON")
+        return self.cuerpo
+
+
+class ClienteFijo:
+    def __init__(self, estados):
+        self.config = ConfigApi(api_url="http://x/api", no_cancelables=("delivered",))
+        self.estados = estados
+
+    def consultar_estados(self, ids):
+        return {pedido_id: self.estados.get(pedido_id) for pedido_id in ids}
+
+
+def test_solo_un_404_del_pedido_confirma_que_no_existe():
+    assert _confirma_inexistente(Respuesta({"error": "order_not_found"}))
+    assert not _confirma_inexistente(Respuesta({"error": "not_found"}))
+    assert not _confirma_inexistente(Respuesta(None))
+
+
+def test_prechequeo_omite_cancelados_inexistentes_y_no_cancelables():
+    cliente = ClienteFijo({"a": "canceled", "b": NO_EXISTE, "c": "delivered", "d": "pending"})
+    avisos, ya_cancelados = [], []
+    trabajos = [(0, "a"), (1, "b"), (2, "c"), (3, "d"), (4, "e"), (5, "")]
+    assert prechequear_estados(trabajos, cliente, avisos.append, ya_cancelados.append) == [(3, "d"), (4, "e"), (5, "")]
+    assert ya_cancelados == ["a"]
+    assert len(avisos) == 1
+
+
+def test_prechequeo_desconfia_si_casi_todos_dan_404():
+    cliente = ClienteFijo({"a": NO_EXISTE, "b": NO_EXISTE, "c": "canceled"})
+    avisos = []
+    trabajos = [(0, "a"), (1, "b"), (2, "c")]
+    assert prechequear_estados(trabajos, cliente, avisos.append) == [(0, "a"), (1, "b")]
+    assert "mal configurado" in avisos[0]
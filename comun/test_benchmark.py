@@ -0,0 +1,33 @@
+from datetime import date, timedelta
+
+from comun.benchmark import HojaEnMemoria, filas_hoja
+from comun.registros import del_dia, leer_desvios, leer_reclamos, pedidos_de_columna
+from comun.sheets import EscrituraPorLotes, LectorIncremental
+
+HOY = date(2025, 2, 1)
+ID = "0123456789abcdef0123456789abcdef"
+TRABAJOS = [(ID, [("Arroz 1 kg", 2, "faltante"), ("Yerba 500 g", 1, "mal estado")])]
+
+
+def test_hoja_de_cancelacion():
+    valores = HojaEnMemoria(filas_hoja("homedelivery", TRABAJOS, HOY)).get_all_values()
+    assert list(pedidos_de_columna(valores, columna=1)) == [(0, ID)]
+
+
+def test_hoja_de_reclamos_la_leen_como_la_real_y_recibe_los_marcados():
+    hoja = HojaEnMemoria(filas_hoja("reclamos", TRABAJOS, HOY))
+    valores, fila_inicio = LectorIncremental(hoja, "reclamos", habilitado=False).leer()
+    reclamos = list(del_dia(leer_reclamos(valores, fila_inicio), HOY))
+    assert [(r.fila, r.url, r.producto, r.cantidad, r.estado) for r in reclamos] == [
+        (2, ID, "Arroz 1 kg", 2, "faltante"), (3, ID, "Yerba 500 g", 1, "mal estado")]
+
+    with EscrituraPorLotes(hoja) as escritura:
+        escritura.marcar(3, 13, "✅")
+    assert hoja.filas[2][12] == "✅"
+
+
+def test_hoja_de_desvios_con_los_de_ayer():
+    valores = HojaEnMemoria(filas_hoja("desvios", TRABAJOS, HOY)).get_all_values()
+    desvios = list(del_dia(leer_desvios(valores), HOY - timedelta(days=1)))
+    assert [(d.pedido_id, d.producto, d.cantidad_deseada, d.tipo) for d in desvios] == [
+        (ID, "Arroz 1 kg", 2, "faltante"), (ID, "Yerba 500 g", 1, "faltante")]
@@ -0,0 +1,79 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from comun import cancelacion, contexto
+from comun.cancelacion import ResultadoPedido, correr_job
+from comun.reintentos import PERMANENTE, TRANSITORIA
+
+
+class HojaFalsa:
+    spreadsheet = SimpleNamespace(id="planilla")
+    title = "Pedidos"
+
+    def __init__(self, ids):
+        self.filas = [["fecha", "pedido"]] + [["01/02/2025", pedido_id] for pedido_id in ids]
+        self.row_count = len(self.filas)
+
+    def get_all_values(self):
+        return [list(f) for f in self.filas]
+
+
+class ContextoFalso:
+    def driver(self, config):
+        return "chrome"
+
+    def renovar_driver(self, config):
+        return "chrome"
+
+
+class NotificadorFalso:
+    def __init__(self):
+        self.mensajes, self.conteo = [], []
+
+    def notificar(self, mensaje):
+        self.mensajes.append(mensaje)
+
+    def contar(self, pedido_id, ok):
+        self.conteo.append((pedido_id, ok))
+
+
+@pytest.fixture
+def entorno(tmp_path, monkeypatch):
+    monkeypatch.setenv("JOURNAL_PATH", str(tmp_path / "journal.sqlite"))
+    monkeypatch.setenv("SHEETS_MARCAS_PATH", str(tmp_path / "marcas.json"))
+    monkeypatch.setenv("SHEETS_SOLAPAMIENTO", "0")
+    monkeypatch.setenv("REINTENTOS_ESPERA_S", "0")
+    for variable in ("BACKOFFICE_API_URL", "BACKOFFICE_API_PRECHEQUEO"):
+        monkeypatch.delenv(variable, raising=False)
+    monkeypatch.setattr(contexto, "_actual", ContextoFalso())
+    return tmp_path
+
+
+def _correr(entorno, monkeypatch, fallas):
+    """Corre el job con un cancelar_pedido falso: `fallas` = {pedido_id: TRANSITORIA | PERMANENTE}."""
+    def cancelar(driver, indice, pedido_id, base_url, motivo, notificar_exito=False):
+        resultado = ResultadoPedido(indice, pedido_id, ok=pedido_id not in fallas, falla=fallas.get(pedido_id, ""))
+        resultado.registrar(f"{pedido_id} {'ok' if resultado.ok else resultado.falla}")
+        return resultado
+
+    monkeypatch.setattr(cancelacion, "cancelar_pedido", cancelar)
+    config = SimpleNamespace(base_url="https://backoffice.test", prefetch=0, bloqueos=())
+    notificador = NotificadorFalso()
+    correr_job("homedelivery", HojaFalsa(["a", "b", "c"]), config, "Motivo", notificador)
+    with open(entorno / "marcas.json", encoding="utf-8") as f:
+        marca, = json.load(f).values()
+    return marca["marca"], notificador.conteo
+
+
+def test_la_marca_pasa_las_fallas_permanentes(entorno, monkeypatch):
+    marca, conteo = _correr(entorno, monkeypatch, {"b": PERMANENTE})
+    assert conteo == [("a", True), ("b", False), ("c", True)]
+    assert marca == 5  # después de la última fila: el pedido no editable no se relee
+
+
+def test_la_marca_se_frena_en_la_primera_falla_transitoria(entorno, monkeypatch):
+    marca, conteo = _correr(entorno, monkeypatch, {"b": PERMANENTE, "c": TRANSITORIA})
+    assert conteo == [("a", True), ("b", False), ("c", False)]
+    assert marca == 4  # la fila de "c": la próxima corrida lo vuelve a intentar
@@ -0,0 +1,17 @@
+from comun.cuota_sheets import BaldeCompartido
+
+
+def test_rafaga_sin_espera_y_despues_al_ritmo_de_la_cuota(tmp_path):
+    ruta = str(tmp_path / "cuota.sqlite")
+    balde = BaldeCompartido(ruta, por_minuto=600, rafaga=2)  # 10 por segundo
+    assert balde.tomar("cuenta/lectura") == 0.0
+    assert balde.tomar("cuenta/lectura") == 0.0
+    assert 0.05 < balde.tomar("cuenta/lectura") < 0.5
+    # Otra clave tiene su propio balde; otro objeto sobre el mismo archivo ve los tokens ya usados
+    assert balde.tomar("cuenta/escritura") == 0.0
+    assert BaldeCompartido(ruta, por_minuto=600, rafaga=2).tomar("cuenta/lectura") > 0
+
+
+def test_cuota_cero_no_frena(tmp_path):
+    balde = BaldeCompartido(str(tmp_path / "cuota.sqlite"), por_minuto=0, rafaga=1)
+    assert all(balde.tomar("x") == 0.0 for _ in range(5))
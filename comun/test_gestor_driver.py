@@ -0,0 +1,92 @@
+from types import SimpleNamespace
+
+import pytest
+
+from comun import gestor_driver
+from comun.gestor_driver import GestorDriver, memoria_mb, sesion_viva
+
+
+class DriverFalso:
+    def __init__(self, numero):
+        self.numero = numero
+        self.vivo = True
+        self.cerrado = False
+        self.service = SimpleNamespace(process=SimpleNamespace(pid=1000 + numero))
+
+    @property
+    def current_url(self):
+        if not self.vivo:
+            raise ConnectionError("chrome no responde")
+        return "https://backoffice.test/es-AR"
+
+    def quit(self):
+        self.cerrado = True
+
+
+@pytest.fixture
+def creados(monkeypatch):
+    """Fábrica de drivers falsa en lugar de crear_driver_logueado; devuelve la lista de los creados."""
+    drivers = []
+
+    def crear(config):
+        drivers.append(DriverFalso(len(drivers)))
+        return drivers[-1]
+
+    monkeypatch.setattr(gestor_driver, "crear_driver_logueado", crear)
+    return drivers
+
+
+def _rss(monkeypatch, mb_por_pid):
+    """RSS falso: cada pid de `mb_por_pid` con sus MB; el 1º es chromedriver y los demás sus Chrome."""
+    raiz, *hijos = mb_por_pid
+    monkeypatch.setattr(gestor_driver, "_procesos_hijos", lambda: {raiz: hijos})
+    monkeypatch.setattr(gestor_driver, "_rss_kb", lambda pid: mb_por_pid.get(pid, 0) * 1024)
+
+
+def test_reutiliza_y_recicla_por_cantidad(creados):
+    gestor = GestorDriver(config=None, reciclar_cada=3, memoria_max_mb=0)
+    usados = [gestor.obtener() for _ in range(7)]
+    assert [d.numero for d in usados] == [0, 0, 0, 1, 1, 1, 2]
+    assert creados[0].cerrado and creados[1].cerrado and not creados[2].cerrado
+    assert gestor.reinicios == 2
+
+
+def test_recicla_por_memoria_cada_tanto(creados, monkeypatch):
+    _rss(monkeypatch, {1000: 300, 2000: 900, 2001: 400})  # 1600 MB entre chromedriver y sus Chrome
+    gestor = GestorDriver(config=None, reciclar_cada=0, memoria_max_mb=1500)
+    usados = [gestor.obtener() for _ in range(gestor_driver._MEDIR_CADA + 1)]
+    # Se mide cada _MEDIR_CADA pedidos: recién ahí ve que se pasó y lo cambia
+    assert [d.numero for d in usados] == [0] * gestor_driver._MEDIR_CADA + [1]
+    assert gestor.reinicios == 1
+
+
+def test_memoria_bajo_el_tope_no_recicla(creados, monkeypatch):
+    _rss(monkeypatch, {1000: 300, 2000: 400})
+    gestor = GestorDriver(config=None, reciclar_cada=0, memoria_max_mb=1500)
+    for _ in range(3 * gestor_driver._MEDIR_CADA):
+        gestor.obtener()
+    assert len(creados) == 1
+
+
+def test_memoria_mb_suma_el_arbol_de_procesos(monkeypatch):
+    _rss(monkeypatch, {1000: 100, 2000: 250, 2001: 50})
+    assert memoria_mb(DriverFalso(0)) == 400
+    assert memoria_mb(object()) is None  # sin service.process: no se puede medir
+
+
+def test_sesion_muerta_levanta_otro(creados):
+    gestor = GestorDriver(config=None, reciclar_cada=0, memoria_max_mb=0)
+    primero = gestor.obtener()
+    primero.vivo = False
+    assert not sesion_viva(primero)
+    segundo = gestor.obtener()
+    assert segundo is not primero and sesion_viva(segundo)
+    assert primero.cerrado and gestor.reinicios == 1 and gestor.pedidos == 1
+
+
+def test_renovar_y_cerrar(creados):
+    gestor = GestorDriver(config=None, reciclar_cada=0, memoria_max_mb=0)
+    gestor.obtener()
+    assert gestor.renovar() is creados[1]
+    gestor.cerrar()
+    assert creados[1].cerrado and gestor.driver is None
@@ -0,0 +1,81 @@
+import json
+
+from comun import grabacion
+from comun.grabacion import archivo_pagina, limpiar_html
+
+PAGINA = """<!DOCTYPE html>
+<html><head>
+<title>Pedido de Juana Pérez</title>
+<script>window.__TOKEN__ = "secreto-123"; fetch("https://analytics.example.com/t")</script>
+<style>.x { background: url(https://cdn.example.com/a.png) }</style>
+<link rel="stylesheet" href="https://cdn.example.com/app.css">
+</head><body>
+<h1>Cliente: Juana Pérez</h1>
+<p>Email juana.perez@gmail.com &amp; tel +54 9 11 4567-8901</p>
+<span data-x="juana@correo.com.ar">DNI 30123456</span>
+<a href="https://wa.me/5491145678901">WhatsApp</a> <a href="/es-AR/orders">Pedidos</a> <a href="//evil.example.com/x">x</a>
+<img src="https://cdn.example.com/foto.jpg" alt="Foto de Juana"> <img src="/static/logo.png">
+<input id="quantity" value="Av. Siempreviva 742" placeholder="Dirección" onclick="robar()">
+<iframe src="https://tracker.example.com"><p>dentro del iframe</p></iframe>
+<div role="combobox" id="status" aria-label="Estado de Juana">Pendiente</div>
+<div class="css-1es96wk fila"><p>Arroz largo fino 1 kg</p><button>Solicitar</button></div>
+<label for="q">Cantidad</label>
+</body></html>"""
+
+
+def test_no_queda_ningun_dato_personal():
+    limpio = limpiar_html(PAGINA)
+    for dato in ("Juana", "Pérez", "juana.perez@gmail.com", "juana@correo.com.ar", "30123456", "4567-8901",
+                 "5491145678901", "Siempreviva", "Dirección", "secreto-123"):
+        assert dato not in limpio, dato
+    # Los emails que hubieran quedado en atributos se reemplazan por uno de ejemplo
+    assert "correo@ejemplo.com" in limpio
+
+
+def test_scripts_estilos_iframes_y_recursos_externos_fuera():
+    limpio = limpiar_html(PAGINA)
+    for fuera in ("<script", "<style", "<link", "<iframe", "dentro del iframe", "example.com", "onclick", "robar()"):
+        assert fuera not in limpio, fuera
+    # Rutas del mismo sitio y anclas sí quedan (el mock las sirve)
+    assert 'href="/es-AR/orders"' in limpio and 'src="/static/logo.png"' in limpio
+
+
+def test_atributos_con_valores_fuera():
+    limpio = limpiar_html(PAGINA)
+    assert 'id="quantity"' in limpio
+    for atributo in ("value=", "placeholder=", "alt=", "aria-label=", "<title>Pedido"):
+        assert atributo not in limpio, atributo
+
+
+def test_conserva_lo_que_leen_los_bots_y_enmascara_el_resto():
+    limpio = limpiar_html(PAGINA)
+    for visible in ('id="status"', ">Pendiente<", "Arroz largo fino 1 kg", ">Solicitar<", ">Cantidad<", 'class="css-1es96wk fila"'):
+        assert visible in limpio, visible
+    # El texto libre conserva la forma (largo, dígitos -> 0) pero no el contenido
+    assert "<h1>xxxxxxx: xxxxx xxxxx</h1>" in limpio
+    assert "<!DOCTYPE html>" in limpio
+
+
+def test_html_mal_cerrado_no_rompe_ni_filtra():
+    limpio = limpiar_html("<div><p>Juan 1155667788<span>x</div></b><script>alert(1)")
+    assert "Juan" not in limpio and "1155667788" not in limpio and "alert" not in limpio
+    assert limpio.endswith("</div>")
+
+
+def test_grabar_y_cargar(tmp_path, monkeypatch):
+    monkeypatch.setenv("GRABACION_DIR", str(tmp_path))
+    carpeta = grabacion.iniciar("reclamos")
+    try:
+        grabacion.accion("producto", "abc/1", producto="Arroz", cantidad=2, estado="faltante")
+        grabacion.accion("guardar", "abc/1")
+        grabacion.accion("cancelar", "def", motivo="Cliente prófugo", ok=True)
+        with open(f"{carpeta}/paginas/{archivo_pagina('abc/1')}", "w", encoding="utf-8") as f:
+            f.write("<div>x</div>")
+    finally:
+        assert grabacion.finalizar() == carpeta
+    carga = grabacion.cargar(carpeta)
+    assert carga["trabajo"] == "reclamos"
+    assert carga["trabajos"] == [("abc/1", [("Arroz", 2, "faltante")]), ("def", [])]
+    assert carga["paginas"] == {"abc/1": "<div>x</div>"}
+    with open(f"{carpeta}/grabacion.json", encoding="utf-8") as f:
+        assert set(json.load(f)) == {"trabajo", "inicio"}  # ni cookies ni credenciales
@@ -0,0 +1,51 @@
+from datetime import date
+
+import pytest
+
+from comun.journal import Journal
+
+HOY = date(2025, 2, 1)
+
+
+@pytest.fixture
+def ruta(tmp_path):
+    return str(tmp_path / "journal.sqlite")
+
+
+def test_filtrar_pedidos_saltea_lo_confirmado(ruta):
+    journal = Journal("homedelivery", ruta=ruta)
+    journal.registrar("a")
+    journal.registrar("b", estado="ya_cancelado")
+    Journal("prevencion", ruta=ruta).registrar("c")
+
+    assert journal.filtrar_pedidos([(0, "a"), (1, "b"), (2, "c"), (3, ""), (4, "d")]) == [(2, "c"), (3, ""), (4, "d")]
+    assert journal.salteados == 2
+
+
+def test_reanudar_devuelve_la_lista_de_la_corrida_cortada(ruta):
+    cortada = Journal("desvios", ruta=ruta)
+    cortada.iniciar_corrida([{"pedido": "a"}, {"pedido": "b"}])
+    cortada.cerrar()
+
+    journal = Journal("desvios", ruta=ruta, reanudar=True)
+    assert journal.iniciar_corrida([{"pedido": "nuevo"}]) == [{"pedido": "a"}, {"pedido": "b"}]
+    journal.terminar_corrida()
+    assert Journal("desvios", ruta=ruta, reanudar=True).iniciar_corrida([{"pedido": "nuevo"}]) == [{"pedido": "nuevo"}]
+
+
+def test_deduplicar_repetidos_en_la_hoja(ruta):
+    journal = Journal("homedelivery", ruta=ruta)
+    trabajos = [(0, "a"), (1, "b"), (2, "a"), (3, ""), (4, "")]
+    assert journal.deduplicar(trabajos, fecha=HOY) == [(0, "a"), (1, "b"), (3, ""), (4, "")]
+
+
+def test_deduplicar_entre_jobs_el_primero_es_dueno(ruta):
+    homedelivery = Journal("homedelivery", ruta=ruta)
+    prevencion = Journal("prevencion", ruta=ruta)
+
+    assert homedelivery.deduplicar([(0, "a"), (1, "b")], fecha=HOY) == [(0, "a"), (1, "b")]
+    assert prevencion.deduplicar([(0, "b"), (1, "c")], fecha=HOY) == [(1, "c")]
+    # Re-corrida del dueño: lo sigue procesando
+    assert homedelivery.deduplicar([(5, "b")], fecha=HOY) == [(5, "b")]
+    # Otro día, el índice arranca de cero
+    assert prevencion.deduplicar([(0, "b")], fecha=date(2025, 2, 2)) == [(0, "b")]
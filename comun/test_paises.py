@@ -0,0 +1,79 @@
+import threading
+
+import pytest
+
+from comun.navegador import ConfigNavegador
+from comun.paises import config_pais, ejecutar_por_pais, resumen_paises
+
+LOGIN = "https://backoffice.test/es-AR/login"
+
+
+@pytest.fixture
+def config(monkeypatch):
+    for dato in ("URL", "EMAIL", "PASSWORD"):
+        for pais in ("AR", "MX"):
+            monkeypatch.delenv(f"BACKOFFICE_{dato}_{pais}", raising=False)
+    return ConfigNavegador(login_url=LOGIN, email="bot@nilus.test", password="clave")
+
+
+def test_config_pais_cambia_el_locale_y_toma_credenciales_propias(config, monkeypatch):
+    mx = config_pais(config, "mx")
+    assert (mx.login_url, mx.email, mx.password) == ("https://backoffice.test/es-MX/login", "bot@nilus.test", "clave")
+    assert mx.base_url == "https://backoffice.test/es-MX"
+    assert config_pais(config, "ar").login_url == LOGIN
+
+    monkeypatch.setenv("BACKOFFICE_URL_MX", "https://mx.backoffice.test/es-MX/login")
+    monkeypatch.setenv("BACKOFFICE_EMAIL_MX", "bot-mx@nilus.test")
+    monkeypatch.setenv("BACKOFFICE_PASSWORD_MX", "clave-mx")
+    mx = config_pais(config, "mx")
+    assert (mx.login_url, mx.email, mx.password) == ("https://mx.backoffice.test/es-MX/login", "bot-mx@nilus.test", "clave-mx")
+    assert config.email == "bot@nilus.test"  # la config general no se toca
+
+
+def test_un_hilo_por_pais_a_la_vez(config):
+    juntos = threading.Barrier(2, timeout=5)  # solo pasa si los dos países están corriendo al mismo tiempo
+    vistos = {}
+
+    def trabajar(pais, config_p, items):
+        vistos[pais] = (threading.current_thread().name, config_p.login_url)
+        juntos.wait()
+        return len(items)
+
+    resultados = ejecutar_por_pais({"ar": [1, 2], "mx": [3], "co": []}, config, trabajar, paralelo=True)
+    assert vistos == {"ar": ("pais-ar", LOGIN), "mx": ("pais-mx", "https://backoffice.test/es-MX/login")}
+    assert {p: (r["items"], r["ok"], r["error"]) for p, r in resultados.items()} == {"ar": (2, 2, None), "mx": (1, 1, None)}
+
+
+def test_mismo_login_en_dos_paises_va_en_serie(config, monkeypatch, capsys):
+    for pais in ("AR", "MX"):
+        monkeypatch.setenv(f"BACKOFFICE_URL_{pais}", LOGIN)
+    hilos = []
+
+    def trabajar(pais, config_p, items):
+        hilos.append(threading.current_thread())
+        return len(items)
+
+    ejecutar_por_pais({"ar": [1], "mx": [2]}, config, trabajar, paralelo=True)
+    assert hilos == [threading.main_thread()] * 2
+    assert "comparten URL de login y usuario" in capsys.readouterr().out
+
+
+def test_un_pais_que_falla_no_corta_al_otro(config):
+    def trabajar(pais, config_p, items):
+        if pais == "mx":
+            raise RuntimeError("login caído")
+        return len(items)
+
+    resultados = ejecutar_por_pais({"ar": [1, 2, 3], "mx": [4]}, config, trabajar, paralelo=True)
+    assert resultados["ar"]["ok"] == 3 and resultados["ar"]["error"] is None
+    assert isinstance(resultados["mx"]["error"], RuntimeError) and resultados["mx"]["ok"] == 0
+    resumen = resumen_paises(resultados)
+    assert "AR: 3/3 pedidos" in resumen and "MX: 0/1 pedidos" in resumen and resumen.endswith("⚠️ cortado")
+
+
+def test_paises_paralelo_false_desde_el_entorno(config, monkeypatch):
+    monkeypatch.setenv("PAISES_PARALELO", "false")
+    hilos = []
+    ejecutar_por_pais({"ar": [1], "mx": [2]}, config, lambda pais, c, items: hilos.append(threading.current_thread()) or 1)
+    assert hilos == [threading.main_thread()] * 2
+    assert resumen_paises({}) == "🌎 Por país: sin pedidos"
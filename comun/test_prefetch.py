@@ -0,0 +1,91 @@
+import gc
+
+from comun import prefetch
+from comun.prefetch import navegar, precargar
+
+
+class DriverFalso:
+    """Pestañas en memoria: `cargas` dice qué URL tiene cada una; `gets` registra los driver.get."""
+
+    def __init__(self):
+        self.pestanas = ["p0"]
+        self.actual = "p0"
+        self.cargas = {}
+        self.gets = []
+        self.switch_to = self
+
+    @property
+    def current_window_handle(self):
+        return self.actual
+
+    @property
+    def window_handles(self):
+        return list(self.pestanas)
+
+    def new_window(self, _tipo):
+        self.actual = f"p{len(self.pestanas) + len(self.cargas)}"
+        self.pestanas.append(self.actual)
+
+    def window(self, pestana):
+        self.actual = pestana
+
+    def close(self):
+        self.pestanas.remove(self.actual)
+
+    def execute_script(self, script, *args):
+        if "location.href" in script:
+            self.cargas[self.actual] = args[0]
+        return "complete"
+
+    def get(self, url):
+        self.gets.append(url)
+        self.cargas[self.actual] = url
+
+
+def _url(item):
+    return f"/orders/{item}"
+
+
+def test_con_la_pestana_precargada_no_hace_driver_get():
+    driver = DriverFalso()
+    for d, item in precargar(["a", "b", "c"], lambda: driver, _url, k=2):
+        navegar(d, _url(item))
+        assert d.cargas[d.actual] == _url(item)
+    assert driver.gets == ["/orders/a"]  # solo el primero; b y c ya estaban cargados en su pestaña
+    assert driver.pestanas == [driver.actual]  # no quedan pestañas abiertas
+    assert not hasattr(driver, "_precargada")  # el estado no se cuelga del driver
+
+
+def test_otra_url_que_la_precargada_navega_y_olvida_la_precarga():
+    driver = DriverFalso()
+    recorrido = precargar(["a", "b"], lambda: driver, _url, k=1)
+    next(recorrido)
+    d, item = next(recorrido)
+    navegar(d, "/orders/otro")
+    navegar(d, _url(item))  # la precarga ya se consumió: ahora sí hace get
+    assert driver.gets == ["/orders/otro", "/orders/b"]
+    recorrido.close()
+
+
+def test_driver_nuevo_descarta_las_precargas_del_anterior():
+    drivers = [DriverFalso(), DriverFalso()]
+    pedidos = iter([drivers[0], drivers[1]])
+    for d, item in precargar(["a", "b"], lambda: next(pedidos), _url, k=1):
+        navegar(d, _url(item))
+    assert drivers[1].gets == ["/orders/b"]
+
+
+def test_el_estado_se_va_con_el_driver():
+    antes = len(prefetch._precargadas)
+    driver = DriverFalso()
+    prefetch._marcar_precargada(driver, "/orders/a")
+    assert len(prefetch._precargadas) == antes + 1
+    del driver
+    gc.collect()  # el falso se referencia a sí mismo (switch_to)
+    assert len(prefetch._precargadas) == antes
+
+
+def test_sin_k_es_un_recorrido_normal():
+    driver = DriverFalso()
+    assert [item for _, item in precargar(["a", "b"], lambda: driver, _url, k=0)] == ["a", "b"]
+    assert driver.pestanas == ["p0"]
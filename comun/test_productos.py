@@ -0,0 +1,52 @@
+"""buscar_producto contra el criterio original de los scripts (dos recorridos de find_element + SequenceMatcher)."""
+import random
+from difflib import SequenceMatcher
+
+from comun.productos import buscar_producto, normalizar
+
+
+def _original(buscado, nombres, aceptar_mejor=False):
+    """Lo que hacían Desvios/Reclamos al recorrer las filas con find_element: posición elegida o None."""
+    def similitud(n1, n2):
+        return SequenceMatcher(None, (n1 or "").lower(), (n2 or "").lower()).ratio()
+
+    mejor, mayor = None, 0.0
+    for posicion, nombre in enumerate(nombres):
+        score = similitud(buscado, nombre)
+        if score > mayor:
+            mayor, mejor = score, posicion
+    if mejor is not None and mayor >= 0.8:
+        return mejor
+    palabras = normalizar(buscado)
+    for posicion, nombre in enumerate(nombres):
+        if palabras and len(palabras & normalizar(nombre)) / len(palabras) >= 0.5:
+            return posicion
+    return mejor if aceptar_mejor else None
+
+
+_PALABRAS = ["leche", "entera", "descremada", "1l", "500g", "arroz", "fideos", "yerba", "mate", "azúcar", "x6", "pack"]
+
+
+def _nombre(azar):
+    return " ".join(azar.choice(_PALABRAS) for _ in range(azar.randint(1, 4))).title()
+
+
+def test_igual_al_criterio_original_en_casos_al_azar():
+    azar = random.Random(7)
+    for _ in range(2000):
+        nombres = [_nombre(azar) for _ in range(azar.randint(1, 8))]
+        buscado = azar.choice(nombres + [_nombre(azar)])
+        if azar.random() < 0.3:
+            buscado = buscado.lower() + azar.choice(["", " x1", "!"])
+        for aceptar_mejor in (False, True):
+            coincidencia = buscar_producto(buscado, nombres, aceptar_mejor=aceptar_mejor)
+            assert (coincidencia.posicion if coincidencia else None) == _original(buscado, nombres, aceptar_mejor)
+
+
+def test_metodos():
+    nombres = ["Leche Entera 1L", "Arroz 500g", "Yerba Mate"]
+    assert buscar_producto("leche entera 1l", nombres).metodo == "similitud"
+    parcial = buscar_producto("yerba mate suave", nombres)
+    assert (parcial.posicion, parcial.metodo) == (2, "parcial")
+    assert buscar_producto("azúcar", nombres) is None
+    assert buscar_producto("azúcar", nombres, aceptar_mejor=True).metodo == "mejor_similitud"
@@ -0,0 +1,88 @@
+from datetime import date
+
+from comun.registros import del_dia, entero, extraer_id, leer_desvios, leer_reclamos, normalizar_id, parsear_fecha, pedidos_de_columna
+
+ID = "0123456789abcdef0123456789abcdef"
+
+
+def _fila_desvio(fecha, pais="ar", tipo="faltante", pedido=f"https://backoffice/orders/{ID}", producto=" Yerba ", original="5", modificada="2"):
+    fila = [fecha, pais, tipo, "", "", "", "", pedido, "", producto, "", original]
+    return fila + [modificada] if modificada is not None else fila
+
+
+def _fila_reclamo(fecha, estado="faltante", producto="Arroz", cantidad="3", url="https://b/orders/x", procesado=""):
+    return [fecha, "", "", "", "", "", "", "", estado, producto, cantidad, "", procesado, "", "", url]
+
+
+def test_parsear_fecha_dia_primero_y_descarta_invalidas():
+    assert parsear_fecha("03/04/2025") == date(2025, 4, 3)
+    assert parsear_fecha("03/04/2025 10:15") == date(2025, 4, 3)
+    assert parsear_fecha("2025-04-03") == date(2025, 4, 3)
+    assert parsear_fecha("mañana") is None
+    assert parsear_fecha("") is None
+
+
+def test_entero_solo_digitos():
+    assert entero(" 12 ") == 12
+    assert entero("3.5") == 0
+    assert entero(None) == 0
+
+
+def test_ids_de_pedido():
+    assert extraer_id(f"https://backoffice/es-AR/orders/{ID}?tab=1") == ID
+    assert extraer_id("sin id") is None
+    assert normalizar_id(f"  https://backoffice/orders/{ID.upper()} ") == ID
+    assert normalizar_id(" 12345 ") == "12345"
+    encabezado = ["fecha", "pedido"]
+    assert list(pedidos_de_columna([encabezado, ["", ID], ["", ""], ["x"]])) == [(0, ID), (1, ""), (2, "")]
+
+
+def test_leer_desvios_filtra_pais_fecha_y_columnas():
+    valores = [
+        ["encabezado"],
+        _fila_desvio("01/02/2025"),
+        _fila_desvio("01/02/2025", pais=" MX "),
+        _fila_desvio("01/02/2025", pais="co"),
+        _fila_desvio("no es fecha"),
+        _fila_desvio("01/02/2025")[:11],  # fila corta
+        _fila_desvio("01/02/2025", tipo="faltante_parcial", modificada=None),
+    ]
+    desvios = list(leer_desvios(valores, fila_inicio=10))
+    assert [(d.fila, d.pais) for d in desvios] == [(10, "ar"), (11, "mx"), (15, "ar")]
+    assert desvios[0].pedido_id == ID
+    assert desvios[0].producto == "Yerba"
+    assert desvios[0].cantidad_deseada == 5  # faltante: todo lo original
+    assert desvios[2].cantidad_deseada == 5  # faltante_parcial sin modificada: 5 - 0
+
+
+def test_cantidad_deseada_faltante_parcial():
+    desvio, = leer_desvios([["h"], _fila_desvio("01/02/2025", tipo="faltante_parcial", original="5", modificada="7")])
+    assert desvio.cantidad_deseada == 0
+    desvio, = leer_desvios([["h"], _fila_desvio("01/02/2025", tipo="faltante_parcial", original="5", modificada="2")])
+    assert desvio.cantidad_deseada == 3
+
+
+def test_leer_reclamos():
+    valores = [
+        ["h"],
+        _fila_reclamo("01/02/2025", cantidad="x", procesado="✅"),
+        _fila_reclamo(""),
+        _fila_reclamo("01/02/2025")[:15],
+        _fila_reclamo("31/12/2024 23:59"),
+    ]
+    reclamos = list(leer_reclamos(valores))
+    assert [(r.fila, r.fecha) for r in reclamos] == [(2, date(2025, 2, 1)), (5, date(2024, 12, 31))]
+    assert (reclamos[0].cantidad, reclamos[0].procesado, reclamos[0].url) == (0, "✅", "https://b/orders/x")
+
+
+def test_del_dia_y_marca_de_agua():
+    valores = [["h"]] + [_fila_desvio(f) for f in ("30/01/2025", "01/02/2025", "31/01/2025", "01/02/2025", "02/02/2025")]
+    marca = []
+    filtrados = list(del_dia(leer_desvios(valores), date(2025, 2, 1), marca))
+    assert [d.fila for d in filtrados] == [3, 5]
+    # Primera fila con fecha >= la pedida: desde ahí relee la próxima corrida
+    assert marca == [3]
+
+    marca = []
+    assert list(del_dia(leer_desvios(valores), date(2025, 3, 1), marca)) == []
+    assert marca == []
@@ -0,0 +1,62 @@
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, TimeoutException
+
+from comun.reintentos import PERMANENTE, TRANSITORIA, ColaReintentos, ConfigReintentos, clasificar
+
+
+def _cola(presupuesto=20, max_intentos=2, driver_nuevo=True):
+    return ColaReintentos(ConfigReintentos(presupuesto=presupuesto, max_intentos=max_intentos, espera_s=0, driver_nuevo=driver_nuevo))
+
+
+def test_clasificar():
+    assert clasificar(TimeoutException()) == TRANSITORIA
+    assert clasificar(StaleElementReferenceException()) == TRANSITORIA
+    assert clasificar(ConnectionError()) == TRANSITORIA
+    assert clasificar(NoSuchElementException()) == PERMANENTE
+    assert clasificar(ValueError()) == PERMANENTE
+
+
+def test_solo_encola_transitorias_con_intentos():
+    cola = _cola(max_intentos=1)
+    assert not cola.agregar("a", "a", PERMANENTE)
+    assert cola.agregar("a", "a", TRANSITORIA)
+    assert not cola.agregar("a", "a", TRANSITORIA)
+    assert not _cola(presupuesto=0).agregar("b", "b", TRANSITORIA)
+
+
+def test_drenar_en_rondas_hasta_que_sale():
+    cola = _cola()
+    intentos = []
+    renovaciones = []
+
+    def reintentar(item):
+        intentos.append(item)
+        if item == "lento" and intentos.count("lento") == 1:
+            cola.agregar(item, item, TRANSITORIA)  # vuelve a fallar: otra ronda
+
+    cola.agregar("lento", "lento", TRANSITORIA)
+    cola.agregar("rapido", "rapido", TRANSITORIA)
+    assert cola.drenar(reintentar, renovar_driver=lambda: renovaciones.append(1)) == []
+    assert intentos == ["lento", "rapido", "lento"]
+    assert len(renovaciones) == 2  # un Chrome nuevo por ronda
+    assert cola.usados == 3
+
+
+def test_drenar_respeta_el_presupuesto():
+    cola = _cola(presupuesto=2)
+    intentos = []
+    for clave in ("a", "b", "c"):
+        cola.agregar(clave, clave, TRANSITORIA)
+    assert cola.drenar(intentos.append) == ["c"]
+    assert intentos == ["a", "b"]
+
+
+def test_drenar_sigue_si_no_se_puede_renovar_el_driver():
+    cola = _cola()
+    intentos = []
+    cola.agregar("a", "a", TRANSITORIA)
+
+    def renovar():
+        raise RuntimeError("sin Chrome")
+
+    assert cola.drenar(intentos.append, renovar_driver=renovar) == []
+    assert intentos == ["a"]
@@ -0,0 +1,63 @@
+import time
+
+from comun.sesion import cargar_sesion, guardar_sesion, inyectar_sesion
+
+LOGIN = "https://backoffice.test/es-AR/login"
+
+
+class DriverFalso:
+    """Redirige a `destino` al abrir el backoffice; la red queda inactiva a los `red_en` segundos."""
+
+    def __init__(self, destino, red_en=0.0, password=False):
+        self.destino, self.red_en, self.password = destino, red_en, password
+        self.current_url = "about:blank"
+        self.cookies = []
+        self.abierto = None
+
+    def get(self, url):
+        self.current_url = self.destino if url.endswith("/es-AR") else url
+        self.abierto = time.perf_counter()
+
+    def add_cookie(self, cookie):
+        self.cookies.append(cookie)
+
+    def get_cookies(self):
+        return [{"name": "sid", "value": "abc"}]
+
+    def execute_script(self, script, *args):
+        if "performance" in script:
+            return ["complete", 1000 if time.perf_counter() - self.abierto >= self.red_en else 0]
+        if "localStorage);" in script:
+            return {"token": "t"}
+        return None
+
+    def find_elements(self, *_):
+        return ["input"] if self.password else []
+
+
+def test_sesion_aceptada_apenas_la_red_queda_inactiva():
+    driver = DriverFalso("https://backoffice.test/es-AR/orders", red_en=0.2)
+    inicio = time.perf_counter()
+    assert inyectar_sesion(driver, {"cookies": [{"name": "sid", "value": "x", "sameSite": "raro"}]}, LOGIN)
+    assert time.perf_counter() - inicio < 1.5  # sin la espera fija de antes
+    assert driver.cookies == [{"name": "sid", "value": "x"}]
+
+
+def test_sesion_rechazada_por_login_o_password():
+    assert not inyectar_sesion(DriverFalso(LOGIN), {}, LOGIN)
+    assert not inyectar_sesion(DriverFalso("https://backoffice.test/es-AR", password=True), {}, LOGIN)
+
+
+def test_sin_senal_se_toma_como_rechazada():
+    driver = DriverFalso("https://backoffice.test/es-AR/orders", red_en=60)
+    assert not inyectar_sesion(driver, {}, LOGIN, espera_validacion=0.3)
+
+
+def test_cache_cifrado_y_vencido(tmp_path):
+    ruta = str(tmp_path / "sesion.bin")
+    assert guardar_sesion(DriverFalso(LOGIN), ruta, "secreto", ttl=60)
+    datos = cargar_sesion(ruta, "secreto")
+    assert datos["cookies"] == [{"name": "sid", "value": "abc"}] and datos["local_storage"] == {"token": "t"}
+    assert cargar_sesion(ruta, "otra clave") is None
+    guardar_sesion(DriverFalso(LOGIN), ruta, "secreto", ttl=-1)
+    assert cargar_sesion(ruta, "secreto") is None
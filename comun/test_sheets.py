@@ -0,0 +1,136 @@
+from comun.sheets import EscrituraPorLotes, LectorIncremental
+
+
+class HojaFalsa:
+    def __init__(self):
+        self.lotes = []
+
+    def batch_update(self, datos):
+        self.lotes.append(datos)
+
+
+def test_escritura_en_lotes_de_tam_lote():
+    hoja = HojaFalsa()
+    escritura = EscrituraPorLotes(hoja, tam_lote=2)
+    escritura.marcar(2, 13, "✅")
+    assert hoja.lotes == []
+    escritura.marcar(3, 13, "❌")
+    assert hoja.lotes == [[{"range": "M2", "values": [["✅"]]}, {"range": "M3", "values": [["❌"]]}]]
+    escritura.marcar(4, 13, "✅")
+    escritura.flush()
+    assert len(hoja.lotes) == 2 and escritura.llamadas == 2
+    escritura.flush()  # sin pendientes no llama a la API
+    assert escritura.llamadas == 2
+
+
+def test_la_ultima_escritura_de_una_celda_gana_y_el_with_vacia_al_salir():
+    hoja = HojaFalsa()
+    with EscrituraPorLotes(hoja, tam_lote=10) as escritura:
+        escritura.marcar(5, 1, "a")
+        escritura.marcar(5, 1, "b")
+        escritura.marcar(6, 2, "c")
+    assert hoja.lotes == [[{"range": "A5", "values": [["b"]]}, {"range": "B6", "values": [["c"]]}]]
+
+
+def test_flush_final_aunque_el_bloque_se_corte():
+    hoja = HojaFalsa()
+    try:
+        with EscrituraPorLotes(hoja, tam_lote=0) as escritura:  # tam_lote mínimo 1
+            escritura.marcar(2, 1, "x")
+            escritura.pendientes["A3"] = "y"
+            raise RuntimeError("corte")
+    except RuntimeError:
+        pass
+    assert hoja.lotes == [[{"range": "A2", "values": [["x"]]}], [{"range": "A3", "values": [["y"]]}]]
+
+
+class HojaConFilas:
+    """Lo mínimo de gspread.Worksheet que usa LectorIncremental; batch_get recorta vacías como la API."""
+
+    def __init__(self, filas):
+        self.spreadsheet = type("Planilla", (), {"id": "planilla"})()
+        self.title = "Pedidos"
+        self.filas = filas
+        self.lecturas_completas = 0
+        self.rangos = []
+
+    @property
+    def row_count(self):
+        return len(self.filas) + 100
+
+    def get_all_values(self):
+        self.lecturas_completas += 1
+        ancho = max(len(f) for f in self.filas)
+        return [f + [""] * (ancho - len(f)) for f in self.filas]
+
+    def batch_get(self, rangos):
+        self.rangos.append(rangos)
+        resultado = []
+        for rango in rangos:
+            desde, hasta = (int(n) for n in rango.split(":"))
+            filas = [list(f) for f in self.filas[desde - 1:hasta]]
+            while filas and not any(filas[-1]):
+                filas.pop()
+            resultado.append(filas)
+        return resultado
+
+
+def _lector(hoja, tmp_path, **kw):
+    return LectorIncremental(hoja, "homedelivery", ruta=str(tmp_path / "marcas.json"), solapamiento=2, habilitado=True, **kw)
+
+
+def _hoja(n):
+    return HojaConFilas([["fecha", "pedido"]] + [[f"0{d}/02/2025", f"p{d}"] for d in range(2, n + 2)])
+
+
+def test_primera_lectura_completa_y_despues_solo_la_cola(tmp_path):
+    hoja = _hoja(6)  # filas 2..7
+    lector = _lector(hoja, tmp_path)
+    valores, fila_inicio = lector.leer()
+    assert (len(valores), fila_inicio, hoja.lecturas_completas) == (7, 2, 1)
+    lector.confirmar(6)  # la próxima corrida necesita desde la fila 6
+
+    hoja.filas.append(["08/02/2025", "p8", "extra"])
+    lector = _lector(hoja, tmp_path)
+    valores, fila_inicio = lector.leer()
+    assert hoja.lecturas_completas == 1
+    assert hoja.rangos[-1] == ["1:1", f"4:{hoja.row_count}"]  # marca - solapamiento
+    assert fila_inicio == 4
+    # Mismo formato que get_all_values: encabezado + filas, todas del mismo ancho
+    assert valores == [["fecha", "pedido", ""], ["04/02/2025", "p4", ""], ["05/02/2025", "p5", ""],
+                       ["06/02/2025", "p6", ""], ["07/02/2025", "p7", ""], ["08/02/2025", "p8", "extra"]]
+    assert lector.ultima_fila == 8
+
+
+def test_si_cambio_el_solapamiento_vuelve_a_leer_todo(tmp_path):
+    hoja = _hoja(6)
+    lector = _lector(hoja, tmp_path)
+    lector.leer()
+    lector.confirmar(6)
+
+    hoja.filas.pop(1)  # alguien borró una fila: todo se corre para arriba
+    valores, fila_inicio = _lector(hoja, tmp_path).leer()
+    assert (hoja.lecturas_completas, fila_inicio) == (2, 2)
+    assert valores[1] == ["03/02/2025", "p3"]
+
+
+def test_confirmar_no_retrocede_ni_pasa_el_final(tmp_path):
+    hoja = _hoja(6)
+    lector = _lector(hoja, tmp_path)
+    lector.leer()
+    lector.confirmar(6)
+    lector = _lector(hoja, tmp_path)
+    lector.leer()
+    lector.confirmar(1)  # antes de lo leído: queda en fila_inicio
+    assert lector._marcas()[lector.clave]["marca"] == 4
+    lector.confirmar(99)  # después del final: la fila siguiente a la última
+    assert lector._marcas()[lector.clave]["marca"] == 8
+
+
+def test_deshabilitado_siempre_lee_todo_y_no_guarda_marca(tmp_path):
+    hoja = _hoja(3)
+    lector = LectorIncremental(hoja, "homedelivery", ruta=str(tmp_path / "marcas.json"), habilitado=False)
+    lector.leer()
+    lector.confirmar(3)
+    assert not (tmp_path / "marcas.json").exists()
+    assert hoja.lecturas_completas == 1
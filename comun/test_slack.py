@@ -0,0 +1,76 @@
+from comun import slack
+from comun.slack import NotificadorSlack, formatear_resumen, transporte_webhook
+
+
+class TransporteFalso:
+    """Devuelve en orden las esperas de `respuestas` (segundos de Retry-After) y después 0."""
+
+    def __init__(self, *respuestas):
+        self.respuestas = list(respuestas)
+        self.llamadas = []
+
+    def __call__(self, texto):
+        self.llamadas.append(texto)
+        return self.respuestas.pop(0) if self.respuestas else 0
+
+
+def test_cola_llena_descarta_los_mas_viejos(monkeypatch):
+    notificador = NotificadorSlack(TransporteFalso(), intervalo=0, tam_cola=2)
+    monkeypatch.setattr(notificador, "_arrancar", lambda: None)  # sin hilo: la cola queda a la vista
+    for n in range(5):
+        notificador.notificar(f"m{n}")
+    assert [notificador._cola.get_nowait()[1] for _ in range(2)] == ["m3", "m4"]
+    assert notificador.descartados == 3
+
+
+def test_resumen_cuenta_ok_y_fallidos():
+    lote = [("pedido", ("a", True)), ("texto", "hola"), ("pedido", ("b", False)), ("pedido", ("c", True))]
+    assert formatear_resumen(lote, descartados=2).splitlines() == [
+        "📊 2 ok, 1 con error: b",
+        "hola",
+        "⚠️ 2 mensajes descartados (cola de Slack llena)",
+    ]
+    muchos = [("pedido", (n, False)) for n in range(slack.MAX_IDS + 3)]
+    assert formatear_resumen(muchos).endswith("… y 3 más")
+
+
+def test_un_solo_resumen_por_intervalo():
+    transporte = TransporteFalso()
+    notificador = NotificadorSlack(transporte, intervalo=5)
+    notificador.contar("a", True)
+    notificador.contar("b", False)
+    notificador.notificar("❌ b falló")
+    notificador.cerrar()
+    assert transporte.llamadas == ["📊 1 ok, 1 con error: b\n❌ b falló"]
+    assert notificador.enviados == 1
+
+
+def test_429_espera_retry_after_y_reintenta():
+    transporte = TransporteFalso(0.05)
+    notificador = NotificadorSlack(transporte, intervalo=0)
+    notificador._publicar("hola")
+    assert transporte.llamadas == ["hola", "hola"]
+    assert notificador.enviados == 1
+
+
+def test_webhook_devuelve_el_retry_after(monkeypatch):
+    class Respuesta:
+        def __init__(self, status_code, headers=None):
+            self.status_code, self.headers, self.text = status_code, headers or {}, ""
+
+    respuestas = [Respuesta(429, {"Retry-After": "7"}), Respuesta(200)]
+    monkeypatch.setattr(slack.requests.Session, "post", lambda self, url, **kw: respuestas.pop(0))
+    enviar = transporte_webhook("https://hooks.slack.test/x")
+    assert enviar("hola") == 7.0
+    assert enviar("hola") == 0
+
+
+def test_atexit_manda_lo_pendiente(monkeypatch):
+    al_salir = []
+    monkeypatch.setattr(slack.atexit, "register", al_salir.append)
+    transporte = TransporteFalso()
+    notificador = NotificadorSlack(transporte, intervalo=60)
+    notificador.notificar("último aviso")
+    assert al_salir == [notificador.cerrar]
+    al_salir[0]()  # lo que correría el intérprete al terminar
+    assert transporte.llamadas == ["último aviso"]
@@ -0,0 +1,203 @@
+"""Trazas por tramo (login, carga de pedido, combobox, guardado, Sheets, Slack) y reporte de la corrida.
+
+`with tramo("guardar_cambios", pedido_id=...) as t:` mide el paso y agrega una
+línea JSON al archivo de trazas de la corrida; el bloque puede sumar datos con
+`t["exito"] = ...`. Los workers heredan la ruta por entorno y escriben en el
+mismo archivo (append). `finalizar()` lee el archivo y escribe al lado un
+resumen JSON con n / p50 / p95 / máx por tramo y pedidos por minuto, pensado
+para subirlo como artifact y comparar entre corridas.
+
+    TRAZAS=false     desactiva todo (los tramos quedan en no-op)
+    TRAZAS_DIR       carpeta de salida (default: trazas/)
+
+Comparar dos corridas (p. ej. antes/después de un cambio):
+    python -m comun.trazas comparar trazas/base.resumen.json trazas/nuevo.resumen.json
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+_ENV_ARCHIVO = "TRAZAS_ARCHIVO"  # así los workers escriben en el mismo archivo
+_lock = threading.Lock()
+
+
+def activas() -> bool:
+    return os.getenv("TRAZAS", "true").strip().lower() == "true"
+
+
+def iniciar(trabajo):
+    """Abre el archivo de trazas de la corrida; devuelve su ruta (None si están desactivadas)."""
+    if not activas():
+        return None
+    directorio = os.getenv("TRAZAS_DIR") or "trazas"
+    os.makedirs(directorio, exist_ok=True)
+    ruta = os.path.abspath(os.path.join(directorio, f"{trabajo}-{datetime.now():%Y%m%d-%H%M%S}.jsonl"))
+    os.environ[_ENV_ARCHIVO] = ruta
+    return ruta
+
+
+def _escribir(registro):
+    ruta = os.environ.get(_ENV_ARCHIVO)
+    if not ruta:
+        return
+    linea = json.dumps(registro, ensure_ascii=False) + "\n"
+    with _lock, open(ruta, "a", encoding="utf-8") as f:
+        f.write(linea)
+
+
+@contextmanager
+def tramo(nombre, **atributos):
+    """Mide el bloque; si lanza, queda registrado como error y la excepción sigue su camino."""
+    if not os.environ.get(_ENV_ARCHIVO):
+        yield atributos
+        return
+    inicio = time.time()
+    t0 = time.perf_counter()
+    error = None
+    try:
+        yield atributos
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        registro = {"tramo": nombre, "inicio": round(inicio, 3), "duracion": round(time.perf_counter() - t0, 4), "ok": error is None, "pid": os.getpid()}
+        if error:
+            registro["error"] = error
+        registro.update(atributos)
+        _escribir(registro)
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    k = (len(ordenados) - 1) * p
+    bajo = int(k)
+    alto = min(bajo + 1, len(ordenados) - 1)
+    return ordenados[bajo] + (ordenados[alto] - ordenados[bajo]) * (k - bajo)
+
+
+def _es_pedido(registro):
+    # Cada pedido por navegador cuenta; por API solo los que salieron (los otros se reintentan en el navegador)
+    return registro["tramo"] == "pedido" or (registro["tramo"] == "pedido_api" and registro.get("exito"))
+
+
+def resumir(ruta) -> dict:
+    """Resumen de un archivo de trazas: n / p50 / p95 / máx por tramo y pedidos por minuto."""
+    por_tramo = {}
+    errores = {}
+    pedidos = 0
+    navegador = None
+    primero, ultimo = None, None
+    with open(ruta, encoding="utf-8") as f:
+        for linea in f:
+            if not linea.strip():
+                continue
+            r = json.loads(linea)
+            por_tramo.setdefault(r["tramo"], []).append(r["duracion"])
+            if not r.get("ok", True):
+                errores[r["tramo"]] = errores.get(r["tramo"], 0) + 1
+            pedidos += _es_pedido(r)
+            if navegador is None and r["tramo"] == "inicio_chrome" and "liviano" in r:
+                navegador = {"liviano": r["liviano"], "carga": r.get("carga")}
+            fin = r["inicio"] + r["duracion"]
+            primero = r["inicio"] if primero is None else min(primero, r["inicio"])
+            ultimo = fin if ultimo is None else max(ultimo, fin)
+
+    duracion = (ultimo - primero) if primero is not None else 0.0
+    return {
+        "archivo": os.path.basename(ruta),
+        "duracion_s": round(duracion, 2),
+        "pedidos": pedidos,
+        "pedidos_por_minuto": round(pedidos / (duracion / 60), 2) if duracion > 0 else None,
+        "navegador": navegador,
+        "tramos": {
+            nombre: {
+                "n": len(v),
+                "p50_ms": round(_percentil(v, 0.50) * 1000, 1),
+                "p95_ms": round(_percentil(v, 0.95) * 1000, 1),
+                "max_ms": round(max(v) * 1000, 1),
+                "total_s": round(sum(v), 2),
+                "errores": errores.get(nombre, 0),
+            }
+            for nombre, v in sorted(por_tramo.items())
+        },
+    }
+
+
+def formatear_resumen(resumen) -> str:
+    lineas = [f"📈 Trazas: {resumen['pedidos']} pedidos en {resumen['duracion_s']:.1f}s"
+              + (f" ({resumen['pedidos_por_minuto']:.1f} pedidos/min)" if resumen["pedidos_por_minuto"] else "")]
+    lineas.append("   tramo: n / p50 / p95 / máx / errores")
+    for nombre, t in resumen["tramos"].items():
+        lineas.append(f"   {nombre}: {t['n']} / {t['p50_ms']:.0f}ms / {t['p95_ms']:.0f}ms / {t['max_ms']:.0f}ms / {t['errores']}")
+    return "\n".join(lineas)
+
+
+def finalizar():
+    """Escribe <corrida>.resumen.json junto a las trazas, lo imprime y devuelve el resumen (o None)."""
+    ruta = os.environ.pop(_ENV_ARCHIVO, None)
+    if not ruta or not os.path.exists(ruta):
+        return None
+    resumen = resumir(ruta)
+    with open(ruta[:-len(".jsonl")] + ".resumen.json", "w", encoding="utf-8") as f:
+        json.dump(resumen, f, ensure_ascii=False, indent=2)
+    print(formatear_resumen(resumen))
+    return resumen
+
+
+def comparar(base, nuevo) -> str:
+    """Diferencias de p50/p95 por tramo y de pedidos/minuto entre dos resúmenes."""
+    def _delta(a, b):
+        if not a:
+            return "—"
+        return f"{(b - a) / a * 100:+.0f}%"
+
+    lineas = [f"pedidos/min: {base['pedidos_por_minuto']} -> {nuevo['pedidos_por_minuto']} "
+              f"({_delta(base['pedidos_por_minuto'], nuevo['pedidos_por_minuto'] or 0)})"]
+    modos = [_modo_navegador(r.get("navegador")) for r in (base, nuevo)]
+    if modos[0] != modos[1]:
+        lineas.append(f"navegador: {modos[0]} -> {modos[1]}")
+    for nombre in sorted(set(base["tramos"]) | set(nuevo["tramos"])):
+        a, b = base["tramos"].get(nombre), nuevo["tramos"].get(nombre)
+        if not a or not b:
+            lineas.append(f"   {nombre}: solo en {'la nueva' if b else 'la base'}")
+            continue
+        lineas.append(f"   {nombre}: p50 {a['p50_ms']:.0f} -> {b['p50_ms']:.0f}ms ({_delta(a['p50_ms'], b['p50_ms'])})"
+                      f", p95 {a['p95_ms']:.0f} -> {b['p95_ms']:.0f}ms ({_delta(a['p95_ms'], b['p95_ms'])})")
+    return "\n".join(lineas)
+
+
+def _modo_navegador(navegador):
+    if not navegador:
+        return "sin dato"
+    return f"{'liviano' if navegador['liviano'] else 'completo'} ({navegador.get('carga') or 'normal'})"
+
+
+def _cargar_resumen(ruta):
+    if ruta.endswith(".jsonl"):
+        return resumir(ruta)
+    with open(ruta, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resumir y comparar trazas de corridas")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p_resumir = sub.add_parser("resumir", help="resumen de un archivo .jsonl")
+    p_resumir.add_argument("trazas")
+    p_comparar = sub.add_parser("comparar", help="base vs nueva (.resumen.json o .jsonl)")
+    p_comparar.add_argument("base")
+    p_comparar.add_argument("nuevo")
+    args = parser.parse_args()
+
+    if args.comando == "resumir":
+        print(formatear_resumen(resumir(args.trazas)))
+    else:
+        print(comparar(_cargar_resumen(args.base), _cargar_resumen(args.nuevo)))
+
+
+if __name__ == "__main__":
+    main()